@@ -0,0 +1,161 @@
+# benchmarks/bench_async_http.py
+"""
+Sync vs async backend access under N concurrent chat sessions.
+
+Both arms run the same tool code on the same calls, with the response cache
+off so every call reaches the backend:
+
+sync  : a 40-worker threadpool (what the old `def chat` + `requests.get`
+        tools ran on) sharing one blocking httpx.Client; each send blocks
+        its worker thread. Every worker runs the tools on its own
+        long-lived event loop, so the arm pays no loop or client setup
+        per call.
+async : the async tools on one event loop over the pooled per-host httpx
+        clients.
+
+Both arms use the pool's connection limits and no per-service budgets, and
+a session's latency counts from when all sessions are submitted.
+
+Usage: python -m benchmarks.bench_async_http --sessions 200 --latency 0.02
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from benchmarks.stub_backends import StubBackend
+
+STARLETTE_THREADPOOL_SIZE = 40
+# Headers that no longer describe a body httpx has already decoded
+_DECODED = {"content-encoding", "transfer-encoding", "content-length"}
+
+
+class RequestCounter:
+    """StubBackend.fault hook that only counts requests."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, method: str, path: str):
+        self.count += 1
+        return None
+
+
+class BlockingClient:
+    """The pooled client's interface over one shared blocking httpx.Client."""
+
+    def __init__(self):
+        from config.settings import HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS, HTTP_KEEPALIVE_EXPIRY
+
+        # The same connection limits as the pooled async clients
+        self.client = httpx.Client(limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ))
+
+    def build_request(self, *args, **kwargs) -> httpx.Request:
+        return self.client.build_request(*args, **kwargs)
+
+    async def send(self, request: httpx.Request, stream: bool = False) -> httpx.Response:
+        # Blocks the worker thread, like requests.get; the body is read whole
+        response = self.client.send(request)
+        headers = [(k, v) for k, v in response.headers.items() if k.lower() not in _DECODED]
+        return httpx.Response(response.status_code, headers=headers, content=response.content, request=request)
+
+
+def _report(name: str, latencies: list, elapsed: float, requests: int):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{name:>5}: {len(latencies) / elapsed:8.1f} req/s  p50={p50 * 1000:7.1f} ms  "
+          f"p99={p99 * 1000:7.1f} ms  backend requests={requests}")
+
+
+def run_sync(calls: list, sessions: int, counter: RequestCounter):
+    from client import backend
+
+    blocking = BlockingClient()
+    local, loops = threading.local(), []
+
+    def run(coroutine):
+        loop = getattr(local, "loop", None)
+        if loop is None:
+            loop = local.loop = asyncio.new_event_loop()
+            loops.append(loop)
+        return loop.run_until_complete(coroutine)
+
+    def session(start: float):
+        # Timed from submission, so waiting for a free worker counts like waiting on the event loop
+        for tool, args in calls:
+            run(tool.ainvoke(args))
+        return time.perf_counter() - start
+
+    get_client = backend.get_client
+    backend.get_client = lambda url: blocking
+    counter.count = 0
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=STARLETTE_THREADPOOL_SIZE) as pool:
+            latencies = list(pool.map(session, [start] * sessions))
+        _report("sync", latencies, time.perf_counter() - start, counter.count)
+    finally:
+        backend.get_client = get_client
+        for loop in loops:
+            loop.close()
+        blocking.client.close()
+
+
+async def run_async(calls: list, sessions: int, counter: RequestCounter):
+    from client.http_pool import close_clients
+
+    async def session(start: float):
+        for tool, args in calls:
+            await tool.ainvoke(args)
+        return time.perf_counter() - start
+
+    counter.count = 0
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(session(start) for _ in range(sessions)))
+    _report("async", latencies, time.perf_counter() - start, counter.count)
+    await close_clients()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="stub backend latency in seconds")
+    args = parser.parse_args()
+
+    with StubBackend(latency=args.latency) as stub:
+        os.environ.update(stub.service_env())
+        from client.cache import response_cache
+        from tools.student_tool import get_courses_by_student_id
+        from tools.professor import get_professor_for_course
+        from tools.webflux_api_product import get_all_products
+
+        from client import backend
+
+        # Every call reaches the backend in both arms, and only the threadpool or the event loop bounds
+        # concurrency (the per-service budgets are asyncio semaphores, which belong to one event loop)
+        response_cache.get = lambda key: None
+        backend.BACKEND_MAX_CONCURRENCY = {}
+        counter = stub.fault = RequestCounter()
+        calls = [
+            (get_courses_by_student_id, {"student_id": 1}),
+            (get_professor_for_course, {"course_id": 1}),
+            (get_all_products, {}),
+        ]
+
+        print(f"{args.sessions} concurrent sessions, {len(calls)} backend calls each, {args.latency * 1000:.0f} ms backend latency")
+        run_sync(calls, args.sessions, counter)
+        asyncio.run(run_async(calls, args.sessions, counter))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# benchmarks/bench_bulk_tools.py
+"""
+Model steps, backend requests and latency for a question about N students.
+
+"Get courses for students 1, 2, ..., N" is sent to /chat with a scripted
+model (`--llm-latency` seconds per call) that answers it four ways:
+
+one per step : get_courses_by_student_id for one id per model step (N+1 steps)
+parallel     : N get_courses_by_student_id calls in one step
+bulk         : one get_courses_for_students call, fanned out per id
+bulk (batch) : the same, served by the stub's batch endpoint in one request
+
+followed by the bulk query again with the per-id responses still cached.
+
+Every answer must cover all N students, and the one-per-step plan must take
+its N+1 model calls: direct return may only end a turn whose query one tool
+call answers (the bulk call here), never the first step of a longer plan.
+
+Usage: python -m benchmarks.bench_bulk_tools [--ids 10] [--llm-latency 0.6]
+"""
+import argparse
+import asyncio
+import os
+import re
+import tempfile
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from benchmarks.fake_llm import ScriptedChatModel
+from benchmarks.stub_backends import StubBackend
+
+
+class OnePerStep(ScriptedChatModel):
+    """Works through the ids one tool call per model step."""
+
+    ids: list = []
+
+    def _respond(self, messages) -> AIMessage:
+        start = max(i for i, m in enumerate(messages) if isinstance(m, HumanMessage))
+        results = [str(m.content) for m in messages[start:] if isinstance(m, ToolMessage)]
+        if len(results) == len(self.ids):
+            return AIMessage(content="\n".join(results))
+        return AIMessage(content="", tool_calls=[{
+            "name": "get_courses_by_student_id", "args": {"student_id": self.ids[len(results)]},
+            "id": f"call_{len(results)}",
+        }])
+
+
+def covered_ids(answer: str) -> set:
+    """Student ids with a row in a per-id ("Courses enrolled by student 3: ...") or bulk ("3 | ...") answer."""
+    return {int(i) for i in re.findall(r"^(?:Courses enrolled by student )?(\d+)(?::| \|)", answer, re.M)}
+
+
+class RequestCounter:
+    """StubBackend.fault hook that only counts requests."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, method: str, path: str):
+        self.count += 1
+        return None
+
+
+async def run(stub: StubBackend, ids: list, llm_latency: float):
+    import httpx
+    import main
+    from client import bulk
+    from client.backend import backend_get
+    from client.cache import response_cache
+    from graph import agent_graph
+
+    query = "Get courses for students " + ", ".join(map(str, ids))
+    pattern = re.escape(query.lower())
+    bulk_rule = [(pattern, "get_courses_for_students", {"student_ids": ",".join(map(str, ids))})]
+    batch_url = f"{stub.service_env()['STUDENT_SERVICE']}/courses/by-ids"
+    strategies = [
+        ("one per step", OnePerStep(ids=ids, latency=llm_latency), None, True),
+        ("parallel", ScriptedChatModel(rules=[(r"students ([\d, ]+)", "get_courses_by_student_id", ("student_id",))], latency=llm_latency), None, True),
+        ("bulk", ScriptedChatModel(rules=bulk_rule, latency=llm_latency), None, True),
+        ("bulk (batch)", ScriptedChatModel(rules=bulk_rule, latency=llm_latency), batch_url, True),
+        ("bulk, ids cached", ScriptedChatModel(rules=bulk_rule, latency=llm_latency), None, False),
+    ]
+
+    requests = RequestCounter()
+    stub.fault = requests
+    main.FAST_PATH_ENABLED = False
+    print(f"{len(ids)} students, {llm_latency * 1000:.0f} ms per model call, {stub.latency * 1000:.0f} ms backend latency")
+    print(f"{'strategy':<18}{'model calls':>12}{'backend reqs':>14}{'latency':>12}{'students':>10}")
+    problems = []
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+            # Warm the pooled connections so every strategy runs against a hot pool
+            await asyncio.gather(*(backend_get(f"{stub.url}/students/{i}/courses") for i in ids))
+            for number, (name, llm, endpoint, clear) in enumerate(strategies):
+                if clear:
+                    response_cache.clear()
+                if endpoint:
+                    bulk.BULK_ENDPOINTS["get_courses_for_students"] = endpoint
+                else:
+                    bulk.BULK_ENDPOINTS.pop("get_courses_for_students", None)
+                agent_graph.llm = llm
+                requests.count = 0
+                start = time.perf_counter()
+                response = await client.post("/chat", params={"session_id": f"bulk-{number}"}, json={"query": query})
+                elapsed = time.perf_counter() - start
+                response.raise_for_status()
+                covered = covered_ids(response.json()["answer"]) & set(ids)
+                print(f"{name:<18}{llm.calls:>12}{requests.count:>14}{elapsed * 1000:>9.0f} ms{len(covered):>10}")
+                if len(covered) != len(ids):
+                    problems.append(f"{name}: answer misses students {sorted(set(ids) - covered)}")
+                if isinstance(llm, OnePerStep) and llm.calls != len(ids) + 1:
+                    problems.append(f"{name}: {llm.calls} model calls, expected {len(ids) + 1}")
+    for problem in problems:
+        print("FAIL", problem)
+    print("FAIL" if problems else "PASS")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ids", type=int, default=10)
+    parser.add_argument("--llm-latency", type=float, default=0.6, help="scripted model latency per call, seconds")
+    parser.add_argument("--backend-latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-offline")
+    os.environ["LANGCHAIN_TRACING_V2"] = "false"
+    os.environ["MCP_TRANSPORT"] = "local"
+    os.environ["ANSWER_CACHE_ENABLED"] = "false"
+    os.environ["CHECKPOINT_DB"] = os.path.join(tempfile.mkdtemp(), "bulk.db")
+
+    with StubBackend(latency=args.backend_latency) as stub:
+        os.environ.update(stub.service_env())
+        asyncio.run(run(stub, list(range(1, args.ids + 1)), args.llm_latency))
+
+
+if __name__ == "__main__":
+    main()
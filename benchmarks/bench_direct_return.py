@@ -0,0 +1,174 @@
+# benchmarks/bench_direct_return.py
+"""
+Latency and model calls of example queries, with direct return off and on,
+under the default settings (fast path, answer cache, admission control on).
+
+The queries are the README's examples plus paraphrases that the fast path
+leaves to the agent. Each is sent to /chat `--repeat` times per mode, each
+time with other ids so the answer cache does not serve it, through a
+scripted model that sleeps `--llm-latency` seconds per call and, like a
+faithful summary, echoes the tool output. Every repeat is one session taking
+the queries as consecutive turns. Prints which path answered each query,
+checks that both modes give the same answers and that the direct answers
+are stored in the session history like model answers.
+
+With direct return on, it also runs multi-step plans whose first call is a
+direct-return tool that does not answer the query alone (one id of several
+per step, a chain of two tools), and checks that every step still runs.
+
+Usage: python -m benchmarks.bench_direct_return [--llm-latency 0.6] [--repeat 5]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.stub_backends import StubBackend
+
+# The example queries of the README ("Test the chatbot"), then paraphrases the fast path does not match;
+# {n} is the repeat number, so every repeat asks about other ids
+QUERIES = [
+    "Get courses for student {n}",
+    "Enroll student {n} in course 3",
+    "Show products below price {price}",
+    "Which classes is student {n} taking?",
+    "Who is the professor teaching course {n}?",
+    "What movie has track id {n}?",
+]
+RULES = [
+    (r"courses? for student (\d+)", "get_courses_by_student_id", ("student_id",)),
+    (r"classes is student (\d+) taking", "get_courses_by_student_id", ("student_id",)),
+    (r"enroll student (\d+) in course (\d+)", "enroll_student_in_course", ("student_id", "course_id")),
+    (r"products below price (\d+(?:\.\d+)?)", "get_products_below_price", ("price",)),
+    (r"professor teaching course (\d+)", "get_professor_for_course", ("course_id",)),
+    (r"movie has track id (\d+)", "get_movie_by_track_id", ("track_id",)),
+]
+
+# Plans whose first step alone must not end the turn; the queries are ones the fast path leaves to the agent
+PLANS = [
+    ("Which classes are students 1, 2 and 3 taking?", [("get_courses_by_student_id", {"student_id": i}) for i in (1, 2, 3)]),
+    ("Who teaches the courses of student 1?", [
+        ("get_courses_by_student_id", {"student_id": 1}),
+        ("get_professors_for_courses", {"course_ids": "1,2,3"}),
+    ]),
+]
+
+
+def _query(template: str, number: int) -> str:
+    return template.format(n=number, price=100 + number)
+
+
+async def check_plans(client, llm_latency: float) -> list:
+    from graph import agent_graph
+    from benchmarks.fake_llm import PlannedChatModel
+    from langchain_core.messages import ToolMessage
+
+    problems = []
+    for number, (query, plan) in enumerate(PLANS):
+        model = agent_graph.llm = PlannedChatModel(plan=plan, latency=llm_latency)
+        session_id = f"plan-{number}"
+        response = await client.post("/chat", params={"session_id": session_id}, json={"query": query})
+        response.raise_for_status()
+        state = await agent_graph.agent_with_memory.aget_state({"configurable": {"thread_id": session_id}})
+        steps = [m.name for m in state.values["messages"] if isinstance(m, ToolMessage)]
+        if model.calls != len(plan) + 1 or steps != [tool_name for tool_name, _ in plan]:
+            problems.append(f"plan {query!r}: ran {steps} with {model.calls} model calls, "
+                            f"expected {len(plan)} steps and {len(plan) + 1} calls")
+    return problems
+
+
+async def run_mode(direct: bool, repeat: int, llm_latency: float) -> dict:
+    import httpx
+    import main
+    from graph import agent_graph
+    from benchmarks.fake_llm import ScriptedChatModel
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    agent_graph.DIRECT_RETURN_ENABLED = direct
+    main.answer_cache.clear()
+    model = agent_graph.llm = ScriptedChatModel(rules=RULES, latency=llm_latency)
+    results = {template: {"seconds": [], "calls": [], "answers": [], "paths": set()} for template in QUERIES}
+    problems = []
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+            # Warm-up: imports, pooled connections and the checkpoint database
+            for template in QUERIES:
+                await client.post("/chat", params={"session_id": f"warm-{direct}"}, json={"query": _query(template, 20)})
+            for number in range(1, repeat + 1):
+                session_id = f"{'direct' if direct else 'model'}-{number}"
+                answers = []
+                for template in QUERIES:
+                    calls, start = model.calls, time.perf_counter()
+                    response = await client.post("/chat", params={"session_id": session_id}, json={"query": _query(template, number)})
+                    elapsed = time.perf_counter() - start
+                    response.raise_for_status()
+                    result = results[template]
+                    result["seconds"].append(elapsed)
+                    result["calls"].append(model.calls - calls)
+                    result["answers"].append(response.json()["answer"])
+                    result["paths"].add("fast path" if response.headers.get("X-Fast-Path") == "hit"
+                                        else "answer cache" if response.headers.get("X-Answer-Cache") == "hit" else "agent")
+                    answers.append(response.json()["answer"])
+
+                state = await agent_graph.agent_with_memory.aget_state({"configurable": {"thread_id": session_id}})
+                messages = state.values["messages"]
+                turns = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+                if len(turns) != len(QUERIES):
+                    problems.append(f"{session_id}: {len(turns)} turns stored, expected {len(QUERIES)}")
+                for end, template, answer in zip(turns[1:] + [len(messages)], QUERIES, answers):
+                    last = messages[end - 1]
+                    if not isinstance(last, AIMessage) or last.content != answer:
+                        problems.append(f"{session_id}: turn {template!r} has no stored answer")
+            if direct:
+                problems += await check_plans(client, llm_latency)
+    return {"results": results, "problems": problems}
+
+
+async def run(repeat: int, llm_latency: float):
+    off = await run_mode(False, repeat, llm_latency)
+    on = await run_mode(True, repeat, llm_latency)
+    return off, on
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm-latency", type=float, default=0.6, help="scripted model latency per call, seconds")
+    parser.add_argument("--backend-latency", type=float, default=0.02)
+    parser.add_argument("--repeat", type=int, default=5, help="sessions per mode, at most 19 (ids 1..repeat)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-offline")
+    os.environ["LANGCHAIN_TRACING_V2"] = "false"
+    os.environ["MCP_TRANSPORT"] = "local"
+    os.environ["CHECKPOINT_DB"] = os.path.join(tempfile.mkdtemp(), "direct_return.db")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    with StubBackend(latency=args.backend_latency) as stub:
+        os.environ.update(stub.service_env())
+        off, on = asyncio.run(run(args.repeat, args.llm_latency))
+
+    print(f"{'query':<44}{'path':>12}{'model calls':>13}{'ms, direct off':>16}{'ms, direct on':>15}")
+    problems = off["problems"] + on["problems"]
+    total_off = total_on = 0.0
+    for template in QUERIES:
+        before, after = off["results"][template], on["results"][template]
+        off_ms, on_ms = statistics.mean(before["seconds"]) * 1000, statistics.mean(after["seconds"]) * 1000
+        total_off, total_on = total_off + off_ms, total_on + on_ms
+        calls = f"{statistics.mean(before['calls']):.0f} -> {statistics.mean(after['calls']):.0f}"
+        path = "/".join(sorted(before["paths"] | after["paths"]))
+        print(f"{template:<44}{path:>12}{calls:>13}{off_ms:>16.1f}{on_ms:>15.1f}")
+        if before["answers"] != after["answers"]:
+            problems.append(f"{template!r}: answers differ between modes")
+    print(f"{'all queries':<44}{'':>12}{'':>13}{total_off:>16.1f}{total_on:>15.1f}"
+          f"  ({(total_off - total_on) / total_off:.0%} less)")
+
+    for problem in problems:
+        print("FAIL", problem)
+    print("FAIL" if problems else "PASS")
+
+
+if __name__ == "__main__":
+    main()
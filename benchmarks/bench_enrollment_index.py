@@ -0,0 +1,188 @@
+# benchmarks/bench_enrollment_index.py
+"""
+Set-query tools answered by the backend vs the local enrollment index.
+
+A synthetic enrollment graph (`--students` students, `--courses` courses,
+0-`--max-courses` courses per student, `--professors` professors) is served
+by the in-process stub: the collections the index loads from, plus the
+answer of each query endpoint, precomputed with plain Python sets (so the
+backend side costs only serialization and transfer, not a database query).
+
+Each tool runs `--repeat` times over HTTP (response cache cleared each time)
+and from the index, and must give the same output both ways. A second
+index whose load fails must fall back to the backend without retrying the
+load on the next query. Prints the
+index load time and size, and per tool the median latency both ways and of
+the index query alone (the rest is tool invocation and formatting).
+
+Usage: python -m benchmarks.bench_enrollment_index [--students 100000 --courses 2000 --repeat 20]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+
+def dataset(args) -> tuple:
+    """Stub payloads and the tool calls to compare."""
+    rng = random.Random(7)
+    students = [{"id": i, "name": f"Student {i}"} for i in range(1, args.students + 1)]
+    courses = {c: [] for c in range(1, args.courses + 1)}
+    for student in students:
+        for c in rng.sample(range(1, args.courses + 1), rng.randint(0, args.max_courses)):
+            courses[c].append(student)
+    professor_of = {c: rng.randint(1, args.professors) for c in courses}
+
+    by_course = {c: {s["id"] for s in members} for c, members in courses.items()}
+    name = {s["id"]: s for s in students}
+    enrolled_in = {}
+    for c, members in by_course.items():
+        for s in members:
+            enrolled_in.setdefault(s, set()).add(c)
+
+    def rows(ids):
+        return [name[i] for i in sorted(ids)]
+
+    anchor = next(s for s, cs in enrolled_in.items() if len(cs) >= 2)
+    pair = sorted(enrolled_in[anchor])[:2]
+    three = [1, 2, 3]
+    sharing = set().union(*(by_course[c] for c in enrolled_in[anchor])) - {anchor}
+    common = set().union(*(m for m in by_course.values() if len(m) > 1))
+    taught = {}
+    for c, p in professor_of.items():
+        taught.setdefault(p, []).append(c)
+
+    payloads = {
+        "/courses/with-students": [{"id": c, "name": f"Course {c}", "students": members} for c, members in courses.items()],
+        "/courses/with-professors": [
+            {"id": c, "name": f"Course {c}", "professor": {"id": p, "name": f"Professor {p}"}} for c, p in professor_of.items()
+        ],
+        "/students/by-courses": rows(set().union(*(by_course[c] for c in three))),
+        "/students/by-all-courses": rows(by_course[pair[0]] & by_course[pair[1]]),
+        f"/students/{anchor}/similar-students": rows(sharing),
+        "/students/common-courses": rows(common),
+        "/students/students-with-no-courses": rows(set(name) - set(enrolled_in)),
+        "/professors/multiple-courses": [{"id": p, "name": f"Professor {p}"} for p in sorted(taught) if len(taught[p]) > 1],
+    }
+    # (tool, its arguments, the index query it makes)
+    calls = [
+        ("get_students_by_courses", {"ids": ",".join(map(str, three))}, "students_in_any_course"),
+        ("get_students_in_all_courses", {"ids": ",".join(map(str, pair))}, "students_in_all_courses"),
+        ("get_students_shares_atleast_one_course", {"student_id": str(anchor)}, "students_sharing_course"),
+        ("get_students_with_common_courses", {}, "students_with_common_courses"),
+        ("get_students_with_no_courses", {}, "students_without_courses"),
+        ("get_professors_with_multiple_courses", {}, "professors_with_multiple_courses"),
+    ]
+    return payloads, calls
+
+
+async def check_backoff(stub) -> list:
+    """After a failed load, queries within the staleness bound go to the backend without reloading."""
+    from client.enrollment_index import EnrollmentIndex
+
+    loads = []
+
+    def fail_load(method, path):
+        if path == "/courses/with-students":
+            loads.append(path)
+            return 0, 500
+        return None
+
+    index = EnrollmentIndex(enabled=True, max_staleness=3600)
+    stub.fault = fail_load
+    try:
+        answered = [await index.ready() for _ in range(3)]
+    finally:
+        stub.fault = None
+    if any(answered) or len(loads) != 1:
+        return [f"failed load: ready() gave {answered} with {len(loads)} load attempts, expected all False and 1"]
+    return []
+
+
+async def run(args, calls: list, stub) -> dict:
+    from client.cache import response_cache
+    from client.enrollment_index import enrollment_index, refresh_seconds
+    from client.http_pool import open_clients, close_clients
+    from tools.student_tool import student_tools
+    from tools.professor import professor_tools
+
+    tools = {tool.name: tool for tool in student_tools + professor_tools}
+    open_clients(*stub.service_env().values())
+    results = {}
+    try:
+        for mode in ("backend", "index"):
+            enrollment_index.enabled = mode == "index"
+            if mode == "index":
+                await enrollment_index.ready()
+                results["load seconds"] = refresh_seconds.total()[0]
+            for name, arguments, query in calls:
+                if mode == "index":
+                    method = getattr(enrollment_index, query)
+                    timings = []
+                    for _ in range(args.repeat):
+                        start = time.perf_counter()
+                        method(*arguments.values())
+                        timings.append(time.perf_counter() - start)
+                    results[("query", name)] = statistics.median(timings)
+                timings, output = [], None
+                for _ in range(args.repeat):
+                    response_cache.clear()
+                    start = time.perf_counter()
+                    output = await tools[name].ainvoke(arguments)
+                    timings.append(time.perf_counter() - start)
+                results[(mode, name)] = (statistics.median(timings), output)
+        results["problems"] = await check_backoff(stub)
+    finally:
+        await close_clients()
+    results["index"] = enrollment_index
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--courses", type=int, default=2000)
+    parser.add_argument("--max-courses", type=int, default=5, help="courses per student are 0..this, uniformly")
+    parser.add_argument("--professors", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ["ENROLLMENT_INDEX_MAX_STALENESS"] = "3600"
+    from benchmarks.stub_backends import StubBackend
+
+    payloads, calls = dataset(args)
+    with StubBackend(payloads=payloads) as stub:
+        os.environ.update(stub.service_env())
+        results = asyncio.run(run(args, calls, stub))
+
+    index = results["index"]
+    enrollments = sum(map(len, index.student_courses))
+    array_bytes = sum(members.itemsize * len(members) for members in index.course_students)
+    print(f"{len(index.student_ids)} students, {len(index.course_students)} courses, {enrollments} enrollments")
+    print(f"index load {results['load seconds'] * 1000:.0f} ms, course arrays {array_bytes / 1024 / 1024:.1f} MiB\n")
+    print(f"{'tool':<40}{'rows':>7}{'backend ms':>12}{'index ms':>10}{'speedup':>9}{'query us':>10}  same")
+    differ = False
+    for name, _, _ in calls:
+        backend, backend_output = results[("backend", name)]
+        local, local_output = results[("index", name)]
+        same = backend_output == local_output
+        differ |= not same
+        rows = local_output.count(", ") + 1 if ": " in local_output else 0
+        print(f"{name:<40}{rows:>7}{backend * 1000:>12.2f}{local * 1000:>10.2f}{backend / local:>8.0f}x"
+              f"{results[('query', name)] * 1e6:>10.0f}  {'yes' if same else 'NO'}")
+    print()
+    if differ:
+        print("FAIL index and backend answers differ")
+    for problem in results["problems"]:
+        print("FAIL", problem)
+    failed = differ or bool(results["problems"])
+    print("FAIL" if failed else "PASS")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
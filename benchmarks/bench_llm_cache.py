@@ -0,0 +1,110 @@
+# benchmarks/bench_llm_cache.py
+"""
+Record/replay of model calls through the on-disk LLM cache.
+
+Backends are in-process stubs and the model is a scripted fake with
+`--llm-latency` seconds per call; the fast path and the answer cache are
+off, so every turn goes through the agent. The same `--sessions`
+conversations of `--turns` queries run three times, each on new session ids:
+
+- record: empty cache, every model call is made and recorded,
+- record again: every call is served from the cache,
+- replay: a fresh model and cache object in replay mode, as in an offline
+  run; a call that was not recorded would fail.
+
+Prints wall time and model calls per phase and exits non-zero unless the
+replay made no model calls and gave the recorded answers.
+
+Usage: python -m benchmarks.bench_llm_cache [--sessions 20 --turns 3 --llm-latency 0.2]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.load_test import QUERIES, RULES
+from benchmarks.stub_backends import StubBackend
+
+
+async def conversations(client, args, label: str) -> list:
+    async def session(number: int) -> list:
+        answers = []
+        for turn in range(args.turns):
+            n = number * args.turns + turn
+            query = QUERIES[n % len(QUERIES)].format(n=n % 20 + 1, m=(n + 1) % 20 + 1, k=(n + 2) % 20 + 1)
+            response = await client.post("/chat", params={"session_id": f"{label}-{number}"}, json={"query": query})
+            answers.append(response.json().get("response") if response.status_code == 200 else response.status_code)
+        return answers
+
+    return await asyncio.gather(*(session(i) for i in range(args.sessions)))
+
+
+async def run(args, cache_path: str) -> dict:
+    import httpx
+    import main
+    from graph import agent_graph
+    from graph.llm_cache import LLMCache
+    from benchmarks.fake_llm import ScriptedChatModel
+
+    main.FAST_PATH_ENABLED = False
+    main.ANSWER_CACHE_ENABLED = False
+    results = {}
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+            recorder = ScriptedChatModel(rules=RULES, latency=args.llm_latency, cache=LLMCache(cache_path, "record"))
+            for label, model in (
+                ("record", recorder),
+                ("record again", recorder),
+                ("replay", ScriptedChatModel(rules=RULES, latency=args.llm_latency, cache=LLMCache(cache_path, "replay"))),
+            ):
+                agent_graph.llm = model
+                calls = model.calls
+                start = time.perf_counter()
+                answers = await conversations(client, args, label.replace(" ", "-"))
+                results[label] = {
+                    "seconds": time.perf_counter() - start,
+                    "calls": model.calls - calls,
+                    "answers": answers,
+                }
+    results["cache bytes"] = recorder.cache.size
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="scripted model latency per call, seconds")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ.setdefault("OPENAI_API_KEY", "sk-offline")
+    os.environ["MCP_TRANSPORT"] = "local"
+    os.environ["CHECKPOINT_DB"] = os.path.join(workdir, "checkpoints.db")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    with StubBackend(latency=0.005) as stub:
+        os.environ.update(stub.service_env())
+        results = asyncio.run(run(args, os.path.join(workdir, "llm_cache.db")))
+
+    print(f"{args.sessions} sessions x {args.turns} turns, model latency {args.llm_latency * 1000:.0f} ms\n")
+    print(f"{'phase':<14}{'seconds':>9}{'model calls':>13}")
+    for label in ("record", "record again", "replay"):
+        r = results[label]
+        print(f"{label:<14}{r['seconds']:>9.2f}{r['calls']:>13}")
+    print(f"\nrecorded responses: {results['cache bytes'] / 1024:.0f} KiB")
+
+    failed = []
+    if results["replay"]["calls"] or results["record again"]["calls"]:
+        failed.append("cached phases called the model")
+    if results["replay"]["answers"] != results["record"]["answers"]:
+        failed.append("replayed answers differ from the recorded ones")
+    print("\nFAIL: " + "; ".join(failed) if failed else "\nPASS")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
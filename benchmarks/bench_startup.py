@@ -0,0 +1,167 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start cost of the service: import time and time to first response.
+
+Each measurement runs in a fresh interpreter:
+
+- import: `import main`, the work a worker does before it can serve,
+- MCP server import: importing one MCP server module (mcp + its tools),
+  most of what starting a stdio server process costs,
+- first response: import, the FastAPI lifespan (MCP tool discovery or
+  opening the server sessions, checkpointer, model client and tokenizer
+  warm-up) and the first /chat answered by the agent, against stub backends
+  with a scripted model swapped in after startup.
+
+The first response is measured for each MCP transport in `--transports`:
+`stdio` (the default deployment, which spawns the MCP server processes),
+once with a cold and once with a warm schema cache (`.mcp_tool_cache.json`,
+as for a first and for a later worker), and `local` (tools in-process).
+
+Medians over `--runs` runs are compared with `--max-import-ms`,
+`--max-server-start-ms` and `--max-first-response-ms`; the command exits
+non-zero when a target is missed. Under `stdio` the lifespan also starts
+one process per MCP server. They start concurrently, but each is CPU-bound
+(mostly imports), so a machine runs about one per CPU at a time. The stdio
+target is therefore `--max-first-response-ms` plus `--max-server-start-ms`
+for each round of `ceil(servers / CPUs)`.
+
+Usage: python -m benchmarks.bench_startup [--runs 5] [--max-import-ms 1500] [--transports stdio,local]
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.stub_backends import StubBackend
+
+IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+import main
+print(time.perf_counter() - start)
+"""
+
+SERVER_IMPORT_SCRIPT = """
+import importlib, sys, time
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+print(time.perf_counter() - start)
+"""
+
+FIRST_RESPONSE_SCRIPT = """
+import asyncio, json, time
+start = time.perf_counter()
+
+async def first_response():
+    import httpx
+    import main
+    from graph import agent_graph
+    from benchmarks.fake_llm import ScriptedChatModel
+
+    imported = time.perf_counter()
+    async with main.lifespan(main.app):
+        started = time.perf_counter()
+        main.FAST_PATH_ENABLED = False
+        agent_graph.llm = ScriptedChatModel(latency=0, rules=[(r"student (\\d+)", "get_courses_by_student_id", ("student_id",))])
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/chat", json={"query": "Get courses for student 1"})
+            response.raise_for_status()
+        answered = time.perf_counter()
+    return {"import": imported - start, "lifespan": started - imported, "first_response": answered - start}
+
+print(json.dumps(asyncio.run(first_response())))
+"""
+
+
+def run_script(script: str, env: dict, *args) -> str:
+    result = subprocess.run([sys.executable, "-c", script, *args], env=env, capture_output=True, text=True, check=True)
+    return result.stdout.strip().splitlines()[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=1500, help="target for the median import time")
+    parser.add_argument("--max-first-response-ms", type=float, default=5000,
+                        help="target for the median time from interpreter start to the first /chat answer")
+    parser.add_argument("--max-server-start-ms", type=float, default=1800,
+                        help="target for the median import of one MCP server module; added to the stdio target")
+    parser.add_argument("--transports", default="stdio,local", help="comma-separated MCP transports to start with")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.getcwd(),
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "sk-offline"),
+        "MCP_TRANSPORT": "local",
+        "ANSWER_CACHE_ENABLED": "false",
+        "LOG_LEVEL": "WARNING",
+    }
+
+    from config.settings import MCP_SERVERS
+
+    imports = []
+    for _ in range(args.runs):
+        imports.append(float(run_script(IMPORT_SCRIPT, env)))
+    server_imports = {
+        config["module"]: [float(run_script(SERVER_IMPORT_SCRIPT, env, config["module"])) for _ in range(args.runs)]
+        for config in MCP_SERVERS.values()
+    }
+    rounds = math.ceil(len(MCP_SERVERS) / (os.cpu_count() or 1))
+    targets = {"stdio": args.max_first_response_ms + rounds * args.max_server_start_ms}
+
+    modes = []
+    for transport in args.transports.split(","):
+        if transport == "stdio":
+            modes += [("stdio, cold schema cache", "stdio", False), ("stdio, warm schema cache", "stdio", True)]
+        else:
+            modes.append((transport, transport, True))
+
+    phases = {}
+    with StubBackend() as stub:
+        env.update(stub.service_env())
+        for label, transport, warm in modes:
+            env["MCP_TRANSPORT"] = transport
+            cache = os.path.join(workdir, f"schemas-{transport}.json")
+            if warm:
+                # One unmeasured start fills the schema cache, as an earlier worker would have
+                env.update(MCP_SCHEMA_CACHE=cache, CHECKPOINT_DB=os.path.join(workdir, f"warm-{transport}.db"))
+                run_script(FIRST_RESPONSE_SCRIPT, env)
+            times = phases[label] = {"import": [], "lifespan": [], "first_response": []}
+            for number in range(args.runs):
+                env["CHECKPOINT_DB"] = os.path.join(workdir, f"startup-{transport}-{warm}-{number}.db")
+                if not warm:
+                    env["MCP_SCHEMA_CACHE"] = os.path.join(workdir, f"schemas-cold-{number}.json")
+                for name, seconds in json.loads(run_script(FIRST_RESPONSE_SCRIPT, env)).items():
+                    times[name].append(seconds)
+
+    import_ms = statistics.median(imports) * 1000
+    print(f"{'phase':<40}{'median ms':>10}{'max ms':>10}")
+    print(f"{'import main':<40}{import_ms:>10.0f}{max(imports) * 1000:>10.0f}")
+    failed = []
+    if import_ms > args.max_import_ms:
+        failed.append(f"import {import_ms:.0f} ms > {args.max_import_ms:.0f} ms")
+    for module, times in server_imports.items():
+        server_ms = statistics.median(times) * 1000
+        print(f"{'import ' + module.rsplit('.', 1)[-1]:<40}{server_ms:>10.0f}{max(times) * 1000:>10.0f}")
+        if server_ms > args.max_server_start_ms:
+            failed.append(f"import {module} {server_ms:.0f} ms > {args.max_server_start_ms:.0f} ms")
+    for (label, transport, _), times in zip(modes, phases.values()):
+        target = targets.get(transport, args.max_first_response_ms)
+        print(f"[{label}, target {target:.0f} ms]")
+        for name, row in (("import", "  import"), ("lifespan", "  lifespan"), ("first_response", "  first response")):
+            print(f"{row:<40}{statistics.median(times[name]) * 1000:>10.0f}{max(times[name]) * 1000:>10.0f}")
+        first_ms = statistics.median(times["first_response"]) * 1000
+        if first_ms > target:
+            failed.append(f"first response ({label}) {first_ms:.0f} ms > {target:.0f} ms")
+    print("\nFAIL: " + "; ".join(failed) if failed else "\nPASS")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
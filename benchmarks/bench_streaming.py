@@ -0,0 +1,114 @@
+# benchmarks/bench_streaming.py
+"""
+Peak memory of collection tools, buffered `response.json()` vs streamed parsing.
+
+The stub generates arrays of N movies (JSON array) and N products (NDJSON when
+asked for it, like WebFlux) on the fly, so the payload is never held in the
+benchmark process either. Peak Python memory is measured with tracemalloc
+around each tool call; `offset` near the end forces the streamed path to
+parse the whole body.
+
+Usage: python -m benchmarks.bench_streaming [--items 100000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import tracemalloc
+
+from benchmarks.stub_backends import StubBackend
+
+BATCH = 500
+
+
+def movie(i: int) -> dict:
+    return {
+        "wrapperType": "track", "kind": "feature-movie", "trackId": i, "artistName": f"Director {i % 37}",
+        "collectionName": f"Collection {i // 4}", "trackName": f"Movie Title {i}",
+        "trackViewUrl": f"https://itunes.apple.com/us/movie/movie-title-{i}/id{i}?uo=4",
+        "artworkUrl100": f"https://is1-ssl.mzstatic.com/image/thumb/Video/v4/{i:06x}/source/100x100bb.jpg",
+        "collectionPrice": round(4.99 + i % 15, 2), "trackPrice": round(3.99 + i % 10, 2),
+        "releaseDate": "2019-05-15T07:00:00Z", "primaryGenreName": "Action & Adventure", "currency": "USD",
+    }
+
+
+def product(i: int) -> dict:
+    return {"id": str(i), "name": f"Product {i}", "data": {"price": 10.0 + i % 500, "color": "black", "capacity": "128 GB"}}
+
+
+def json_array(make, count: int):
+    yield b"["
+    for start in range(0, count, BATCH):
+        items = (json.dumps(make(i)) for i in range(start, min(start + BATCH, count)))
+        yield (b"," if start else b"") + ",".join(items).encode()
+    yield b"]"
+
+
+def ndjson(make, count: int):
+    for start in range(0, count, BATCH):
+        yield "".join(json.dumps(make(i)) + "\n" for i in range(start, min(start + BATCH, count))).encode()
+
+
+def payloads(count: int) -> dict:
+    def movies(accept):
+        return "application/json", json_array(movie, count)
+
+    def products(accept):
+        if "application/x-ndjson" in accept:
+            return "application/x-ndjson", ndjson(product, count)
+        return "application/json", json_array(product, count)
+
+    return {"/api/movies": movies, "/api/products": products}
+
+
+async def measure(name: str, call):
+    from client.cache import response_cache
+
+    response_cache.clear()
+    tracemalloc.start()
+    start = time.perf_counter()
+    output = await call()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<44} peak {peak / 2**20:8.1f} MiB  {elapsed:6.2f} s  ({len(output)} chars out)")
+
+
+async def run(url: str, count: int):
+    from client.http_pool import get_client, close_clients
+    from client.shaping import RowPage
+    from tools.json_to_java import get_all_movies, MOVIE_FIELDS
+    from tools.webflux_api_product import get_all_products
+
+    async def buffered(path: str):
+        # What the tools did before: read and decode the whole body, then project
+        response = await get_client(url).get(f"{url}{path}")
+        rows = response.json()
+        page = RowPage("get_all_movies", MOVIE_FIELDS)
+        for row in rows[:25]:
+            page.add(row)
+        return page.render("All movies", total=len(rows))
+
+    last = count - 5
+    print(f"{count} items per collection")
+    await measure("movies, buffered response.json()", lambda: buffered("/api/movies"))
+    await measure("movies, streamed JSON array, first page", lambda: get_all_movies.ainvoke({}))
+    await measure(f"movies, streamed JSON array, offset={last}", lambda: get_all_movies.ainvoke({"offset": last}))
+    await measure(f"products, streamed NDJSON, offset={last}", lambda: get_all_products.ainvoke({"offset": last}))
+    await close_clients()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100_000)
+    args = parser.parse_args()
+
+    os.environ["LANGCHAIN_TRACING_V2"] = "false"
+    with StubBackend(payloads=payloads(args.items)) as stub:
+        os.environ.update(stub.service_env())
+        asyncio.run(run(stub.url, args.items))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# benchmarks/bench_tool_outputs.py
+"""
+Prompt tokens per tool result, raw payload dump vs shaped output.
+
+"before" is the previous `f"...: {payload}"` rendering, "after" is the first
+page the tool returns now (client/shaping.py), and "all pages" is the cost of
+paging through the whole result. Payloads are synthetic but shaped like
+the real services: iTunes-style movie records and JPA-style courses whose
+students carry their own nested course lists.
+
+Usage: python -m benchmarks.bench_tool_outputs [--rows 200]
+"""
+import argparse
+import asyncio
+import os
+import re
+
+from benchmarks.stub_backends import StubBackend
+
+
+def movie(i: int) -> dict:
+    return {
+        "wrapperType": "track", "kind": "feature-movie", "trackId": 1000 + i, "artistName": f"Director {i % 37}",
+        "collectionName": f"Collection {i // 4}", "trackName": f"Movie Title {i}",
+        "collectionCensoredName": f"Collection {i // 4}", "trackCensoredName": f"Movie Title {i}",
+        "collectionArtistId": 180000 + i, "collectionViewUrl": f"https://itunes.apple.com/us/movie/collection-{i}/id{50000 + i}?uo=4",
+        "trackViewUrl": f"https://itunes.apple.com/us/movie/movie-title-{i}/id{1000 + i}?uo=4",
+        "previewUrl": f"https://video-ssl.itunes.apple.com/itunes-assets/Video/v4/{i:04x}/mzvf_{i}.640x354.h264lc.U.p.m4v",
+        "artworkUrl30": f"https://is1-ssl.mzstatic.com/image/thumb/Video/v4/{i:04x}/source/30x30bb.jpg",
+        "artworkUrl60": f"https://is1-ssl.mzstatic.com/image/thumb/Video/v4/{i:04x}/source/60x60bb.jpg",
+        "artworkUrl100": f"https://is1-ssl.mzstatic.com/image/thumb/Video/v4/{i:04x}/source/100x100bb.jpg",
+        "collectionPrice": round(4.99 + (i % 15), 2), "trackPrice": round(3.99 + (i % 10), 2),
+        "collectionHdPrice": round(7.99 + (i % 15), 2), "trackHdPrice": round(5.99 + (i % 10), 2),
+        "releaseDate": f"20{i % 24:02d}-0{1 + i % 9}-15T07:00:00Z", "collectionExplicitness": "notExplicit",
+        "trackExplicitness": "notExplicit", "discCount": 1, "discNumber": 1, "trackCount": 4, "trackNumber": 1 + i % 4,
+        "trackTimeMillis": 5400000 + i * 1000, "country": "USA", "currency": "USD", "primaryGenreName": "Action & Adventure",
+        "contentAdvisoryRating": "PG-13", "longDescription": "A long synopsis of the movie. " * 6, "hasITunesExtras": True,
+    }
+
+
+def student(i: int) -> dict:
+    return {
+        "id": i, "name": f"Student {i}", "email": f"student{i}@university.edu",
+        "courses": [{"id": c, "name": f"Course {c}", "credits": 3} for c in range(1 + i % 7, 4 + i % 7)],
+    }
+
+
+def course(i: int, students_per_course: int) -> dict:
+    return {
+        "id": i, "name": f"Course {i}", "credits": 3, "description": f"Course {i} covers fundamentals and practice.",
+        "students": [student(i * 7 + k) for k in range(students_per_course)],
+    }
+
+
+def professor(i: int) -> dict:
+    return {"id": i, "name": f"Professor {i}", "email": f"prof{i}@university.edu", "department": "Science"}
+
+
+def fixtures(rows: int) -> dict:
+    courses = [course(i, 30) for i in range(1, max(rows // 10, 1) + 1)]
+    movies = [movie(i) for i in range(1, rows + 1)]
+    return {
+        "/courses/with-students": courses,
+        "/courses/with-professors": [dict(c, students=None, professor=professor(c["id"] % 9 + 1)) for c in courses],
+        "/api/movies": movies,
+        "/api/movies/titles": [{"trackName": m["trackName"], "collectionName": m["collectionName"]} for m in movies],
+        "/api/movies/filter/price": [m for m in movies if m["collectionPrice"] < 12],
+        "/api/movies/1001": movies[0],
+    }
+
+
+NEXT_OFFSET = re.compile(r"call again with offset=(\d+)")
+
+# tool name, arguments, stub path, previous output prefix
+CASES = [
+    ("get_all_courses_with_students", {}, "/courses/with-students", "Courses with students"),
+    ("get_courses_with_professors", {}, "/courses/with-professors", "Courses with professors"),
+    ("get_all_movies", {}, "/api/movies", "All movies"),
+    ("get_titles", {}, "/api/movies/titles", "Titles"),
+    ("get_movies_by_price_less_than", {"max_price": 12.0}, "/api/movies/filter/price", "Movies with price less than 12.0"),
+    ("get_movie_by_track_id", {"track_id": 1001}, "/api/movies/1001", "Movie"),
+]
+
+
+async def run(payloads: dict):
+    from client.http_pool import close_clients
+    from client.multi_client import MultiServerMCPClient, register_local_servers
+    from client.tokens import count_text_tokens
+
+    client = MultiServerMCPClient()
+    register_local_servers(client)
+    tools = {t.name: t for t in client.get_all_tools()}
+
+    print(f"{'tool':<32} {'before':>8} {'after':>7} {'saved':>7} {'all pages':>10}")
+    total_before = total_after = 0
+    for name, args, path, prefix in CASES:
+        before = count_text_tokens(f"{prefix}: {payloads[path]}")
+        output = await tools[name].ainvoke(args)
+        after = pages = count_text_tokens(output)
+        # Follow the paging hints to the end, as a model reading everything would
+        while (match := NEXT_OFFSET.search(output)) is not None:
+            output = await tools[name].ainvoke({**args, "offset": int(match.group(1))})
+            pages += count_text_tokens(output)
+        total_before += before
+        total_after += after
+        print(f"{name:<32} {before:>8} {after:>7} {1 - after / before:>7.1%} {pages:>10}")
+    print(f"{'total':<32} {total_before:>8} {total_after:>7} {1 - total_after / total_before:>7.1%}")
+
+    page = await tools["get_all_movies"].ainvoke({})
+    print("\nget_all_movies, first page:\n" + "\n".join(page.splitlines()[:4]) + "\n...\n" + page.splitlines()[-1])
+    await close_clients()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200, help="movies in the fixture (courses = rows / 10)")
+    args = parser.parse_args()
+
+    os.environ["LANGCHAIN_TRACING_V2"] = "false"
+    payloads = fixtures(args.rows)
+    with StubBackend(payloads=payloads) as stub:
+        os.environ.update(stub.service_env())
+        asyncio.run(run(payloads))
+
+
+if __name__ == "__main__":
+    main()
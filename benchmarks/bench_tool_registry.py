@@ -0,0 +1,70 @@
+# benchmarks/bench_tool_registry.py
+"""
+Tool schema overhead per MCP server, and the cost of binding tools per turn.
+
+Prints the schema tokens every server adds to a prompt that carries all its
+tools, largest tools first, so the expensive schemas are easy to prune.
+
+Then routes every query of the routing file (`--repeat` times) and binds the
+selected tools to a ChatOpenAI client (no request is sent) two ways:
+`bind_tools` on every turn, converting each tool's schema again, and
+`ToolRegistry.bind`, which reuses one binding per distinct tool subset.
+
+Usage: python -m benchmarks.bench_tool_registry [--top 5] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+from client.multi_client import MultiServerMCPClient, register_local_servers
+from graph.router import ToolRouter
+from graph.tool_registry import ToolRegistry, bindings_total
+
+DEFAULT_QUERIES = Path(__file__).parent / "data" / "routing_queries.jsonl"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", default=str(DEFAULT_QUERIES))
+    parser.add_argument("--top", type=int, default=5, help="largest tool schemas listed per server")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from langchain_openai import ChatOpenAI
+
+    client = MultiServerMCPClient()
+    register_local_servers(client)
+    registry = ToolRegistry(client.servers)
+    report = registry.report()
+    print(f"{'server':<28}{'tools':>6}{'schema tokens':>15}")
+    for server, usage in report.items():
+        print(f"{server:<28}{len(usage['tools']):>6}{usage['tokens']:>15}")
+        for name, tokens in list(usage["tools"].items())[: args.top]:
+            print(f"    {name:<36}{tokens:>9}")
+    print(f"{'all servers':<28}{len(registry.tools):>6}{registry.tokens(registry.tools):>15}\n")
+
+    router = ToolRouter(registry.servers)
+    queries = [json.loads(line)["query"] for line in Path(args.queries).read_text().splitlines() if line.strip()]
+    subsets = [router.route(query)[0] for query in queries] * args.repeat
+    model = ChatOpenAI(model="gpt-4o-mini", api_key=os.environ.get("OPENAI_API_KEY", "sk-offline"))
+
+    start = time.perf_counter()
+    for tools in subsets:
+        model.bind_tools(tools)
+    per_turn = (time.perf_counter() - start) / len(subsets)
+
+    start = time.perf_counter()
+    for tools in subsets:
+        registry.bind(model, tools)
+    cached = (time.perf_counter() - start) / len(subsets)
+
+    distinct = bindings_total.get(result="miss")
+    print(f"{len(subsets)} turns, {distinct:.0f} distinct tool subsets")
+    print(f"bind_tools every turn:   {per_turn * 1e6:>8.0f} us/turn")
+    print(f"registry binding:        {cached * 1e6:>8.0f} us/turn ({per_turn / cached:.0f}x less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# benchmarks/check_answer_cache.py
+"""
+Checks of which turns graph/answer_cache.py stores and which queries it
+serves from them. Prints PASS/FAIL per check.
+
+Usage: python -m benchmarks.check_answer_cache
+"""
+import os
+import sys
+
+
+def turn(tool_name: str, content: str, status: str = "success") -> list:
+    from langchain_core.messages import ToolMessage
+
+    return [ToolMessage(content, name=tool_name, tool_call_id="call-1", status=status)]
+
+
+def main():
+    os.environ["LANGCHAIN_TRACING_V2"] = "false"
+    from graph.answer_cache import AnswerCache
+
+    failures = 0
+
+    def check(name: str, ok: bool, detail: str):
+        nonlocal failures
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'}  {name}: {detail}")
+
+    cache = AnswerCache()
+    cache.observe_turn("Get courses for student 1", "Courses of student 1: Math", turn("get_courses_by_student_id", "Math"))
+    answer = cache.lookup("Which classes is student 1 taking?")
+    check("paraphrase", answer is not None, f"-> {answer!r}")
+    answer = cache.lookup("Get courses for student 2")
+    check("numbers", answer is None, f"-> {answer!r}")
+
+    # Quantifiers select different rows: "all" is an intersection, "any" a union
+    cache.clear()
+    cache.observe_turn("Students in all courses 1,2", "Students in all of 1, 2: Ann",
+                       turn("get_students_in_all_courses", "Ann"))
+    answer = cache.lookup("Students in any of courses 1,2")
+    check("quantifiers", answer is None,
+          f"keys {AnswerCache.canonicalize('Students in all courses 1,2')} / "
+          f"{AnswerCache.canonicalize('Students in any of courses 1,2')} -> {answer!r}")
+
+    # A backend failure reported as text must not be served to later paraphrases
+    cache.clear()
+    stored = cache.observe_turn("Get courses for student 3", "The student service is down.",
+                                turn("get_courses_by_student_id", "Error fetching courses for student 3: 503"))
+    answer = cache.lookup("Which classes is student 3 taking?")
+    check("failed turn", not stored and answer is None, f"stored={stored} -> {answer!r}")
+
+    print("all checks passed" if not failures else f"{failures} check(s) FAILED")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/check_mcp_retry.py
+"""
+Checks of when client/multi_client.py sends an MCP tool call again after
+its session failed. Read tools are retried after any failure; write tools
+only when the request never left the client. Prints PASS/FAIL per check.
+
+Usage: python -m benchmarks.check_mcp_retry
+"""
+import asyncio
+import logging
+import os
+import sys
+from types import SimpleNamespace
+
+
+class FlakySession:
+    """Stands in for a ClientSession: the first call raises `error`, later ones answer."""
+
+    def __init__(self, server, error):
+        self.server = server
+        self.error = error
+
+    async def call_tool(self, name, arguments, meta=None):
+        self.server.sent.append(name)
+        if self.server.fail:
+            self.server.fail = False
+            raise self.error
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text=f"{name} ok")], isError=False)
+
+
+async def call(name: str, error: BaseException):
+    """(output or exception, times the request reached the session) for one call whose first attempt fails."""
+    from client.multi_client import MCPServerConnection
+
+    connection = MCPServerConnection("stub", {}, "stdio")
+    connection.sent, connection.fail = [], True
+
+    async def session():
+        return FlakySession(connection, error)
+
+    connection.session = session
+    try:
+        output = await connection.call_tool(name, {})
+    except Exception as e:
+        output = e
+    return output, len(connection.sent)
+
+
+async def run() -> int:
+    import anyio
+    from mcp.shared.exceptions import McpError
+    from mcp.types import CONNECTION_CLOSED, ErrorData
+
+    failures = 0
+
+    def check(name: str, ok: bool, detail: str):
+        nonlocal failures
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'}  {name}: {detail}")
+
+    closed = McpError(ErrorData(code=CONNECTION_CLOSED, message="Connection closed"))
+
+    # The server died with the request in flight: it may have run the tool
+    output, sent = await call("create_course", closed)
+    check("write, ambiguous failure", isinstance(output, McpError) and sent == 1, f"sent {sent}x -> {output!r}")
+
+    # The stream was already closed, so the send failed and nothing reached the server
+    output, sent = await call("create_course", anyio.ClosedResourceError())
+    check("write, not sent", output == "create_course ok" and sent == 2, f"sent {sent}x -> {output!r}")
+
+    output, sent = await call("get_all_courses", closed)
+    check("read, ambiguous failure", output == "get_all_courses ok" and sent == 2, f"sent {sent}x -> {output!r}")
+    return failures
+
+
+def main():
+    os.environ["LANGCHAIN_TRACING_V2"] = "false"
+    # The reconnect warnings are expected here
+    logging.getLogger("client.multi_client").setLevel(logging.ERROR)
+    failures = asyncio.run(run())
+    print("all checks passed" if not failures else f"{failures} check(s) FAILED")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
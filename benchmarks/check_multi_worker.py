@@ -0,0 +1,185 @@
+# benchmarks/check_multi_worker.py
+"""
+Runs the service as several worker processes sharing one checkpoint store
+and checks that every session keeps its whole history.
+
+Each worker is a separate `uvicorn` process (stub backends, scripted model
+with `--llm-latency` seconds per call). Without `--affinity`, the turns of a
+session go to the workers round-robin, so almost every follow-up lands on a
+different worker than the turn before; with it, a session always goes to
+the same worker. After the run the stored history of every session is read
+back from the store and must hold all `--turns` turns, in order.
+
+Runs each backend in `--backends` with 1 worker and with `--workers`
+workers and reports requests/s and latency, so the scaling is visible.
+The redis backend runs against the in-process stand-in in
+`benchmarks/stub_redis.py` (needs the `redis` client package).
+
+Usage: python -m benchmarks.check_multi_worker [--workers 4] [--backends sqlite,redis] [--affinity]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+
+from benchmarks.load_same_session import check_history
+from benchmarks.load_test import QUERIES, RULES, percentile
+from benchmarks.stub_backends import StubBackend
+
+
+def serve(port: int, llm_latency: float):
+    """Worker process entry point."""
+    import uvicorn
+    import main
+    from graph import agent_graph
+    from benchmarks.fake_llm import ScriptedChatModel
+
+    agent_graph.llm = ScriptedChatModel(rules=RULES, latency=llm_latency)
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_workers(count: int, env: dict, llm_latency: float) -> tuple:
+    ports = [free_port() for _ in range(count)]
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-c", f"from benchmarks.check_multi_worker import serve; serve({port}, {llm_latency})"],
+            env=env,
+        )
+        for port in ports
+    ]
+    return ports, processes
+
+
+async def wait_ready(client, ports: list, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    for port in ports:
+        while True:
+            try:
+                if (await client.get(f"http://127.0.0.1:{port}/")).status_code == 200:
+                    break
+            except Exception:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"worker on port {port} did not start")
+            await asyncio.sleep(0.1)
+
+
+async def drive(ports: list, args, run_id: str) -> dict:
+    import httpx
+
+    latencies, errors = [], 0
+    gate = asyncio.Semaphore(args.concurrency)
+
+    async def session(client, number: int):
+        nonlocal errors
+        async with gate:
+            for turn in range(args.turns):
+                n = number * args.turns + turn
+                query = QUERIES[n % len(QUERIES)].format(n=n % 20 + 1, m=(n + 1) % 20 + 1, k=(n + 2) % 20 + 1)
+                worker = number if args.affinity else number + turn
+                url = f"http://127.0.0.1:{ports[worker % len(ports)]}/chat"
+                start = time.perf_counter()
+                response = await client.post(url, params={"session_id": f"{run_id}-{number}"}, json={"query": query})
+                latencies.append(time.perf_counter() - start)
+                errors += response.status_code != 200
+
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(timeout=None, limits=limits) as client:
+        await wait_ready(client, ports)
+        start = time.perf_counter()
+        await asyncio.gather(*(session(client, i) for i in range(args.sessions)))
+        elapsed = time.perf_counter() - start
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": percentile(latencies, 0.95) * 1000,
+        "errors": errors,
+    }
+
+
+async def verify(args, run_id: str, env: dict) -> list:
+    """Problems found in the stored history of every session of the run."""
+    from graph.checkpointer import open_checkpointer
+
+    problems = []
+    async with open_checkpointer(env["CHECKPOINT_DB"], env["CHECKPOINT_BACKEND"], env.get("CHECKPOINT_URL")) as saver:
+        for number in range(args.sessions):
+            found = await saver.aget_tuple({"configurable": {"thread_id": f"{run_id}-{number}"}})
+            messages = found.checkpoint["channel_values"].get("messages", []) if found else []
+            problems += [f"session {number}: {p}" for p in check_history(messages, args.turns)]
+    return problems
+
+
+def run_backend(backend: str, workers: int, args, env: dict) -> tuple:
+    run_id = f"{backend}-{workers}"
+    env = {**env, "CHECKPOINT_BACKEND": backend}
+    ports, processes = start_workers(workers, env, args.llm_latency)
+    try:
+        results = asyncio.run(drive(ports, args, run_id))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+    return results, asyncio.run(verify(args, run_id, env))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--backends", default="sqlite,redis")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=3, help="queries per session, sent one after another")
+    parser.add_argument("--concurrency", type=int, default=32, help="sessions in flight at once")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="scripted model latency per call, seconds")
+    parser.add_argument("--affinity", action="store_true", help="pin each session to one worker (CHECKPOINT_AFFINITY=true)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.getcwd(),
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "sk-offline"),
+        "MCP_TRANSPORT": "local",
+        "FAST_PATH_ENABLED": "false",
+        "ANSWER_CACHE_ENABLED": "false",
+        "CHECKPOINT_AFFINITY": "true" if args.affinity else "false",
+        "CHECKPOINT_DB": os.path.join(workdir, "multi.db"),
+        "LOG_LEVEL": "WARNING",
+    }
+
+    failed = False
+    print(f"{'backend':<8}{'workers':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'errors':>8}  history")
+    with ExitStack() as stack:
+        stub = stack.enter_context(StubBackend(latency=0.005))
+        env.update(stub.service_env())
+        for backend in args.backends.split(","):
+            if backend == "redis":
+                from benchmarks.stub_redis import StubRedis
+
+                env["CHECKPOINT_URL"] = stack.enter_context(StubRedis()).url
+            for workers in sorted({1, args.workers}):
+                results, problems = run_backend(backend, workers, args, env)
+                failed |= bool(problems) or results["errors"] > 0
+                print(f"{backend:<8}{workers:>8}{results['rps']:>9.1f}{results['p50']:>9.0f}{results['p95']:>9.0f}"
+                      f"{results['errors']:>8}  {'ok' if not problems else f'{len(problems)} problems'}")
+                for problem in problems[:5]:
+                    print(f"    {problem}")
+    print("\nFAIL" if failed else "\nPASS")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
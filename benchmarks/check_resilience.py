@@ -0,0 +1,151 @@
+# benchmarks/check_resilience.py
+"""
+Fault-injection checks for client/backend.py against the stub backends.
+
+Scenarios: a hung service (timeouts), a flaky one (GET retries, POST not
+retried), a failing one (circuit breaker opens, fails fast, recovers, also
+after a cancelled probe) and a slow first response (hedging). Prints
+PASS/FAIL per check.
+
+Usage: python -m benchmarks.check_resilience
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from benchmarks.stub_backends import StubBackend
+
+
+class Faults:
+    """Per-(method, path prefix) fault scripts for StubBackend.fault."""
+
+    def __init__(self):
+        self.rules = {}  # (method, prefix) -> list of (delay, status), consumed in order; last one repeats
+        self.hits = Counter()
+        self.lock = threading.Lock()
+
+    def set(self, method: str, prefix: str, *script):
+        with self.lock:
+            self.rules[(method, prefix)] = list(script)
+
+    def clear(self):
+        with self.lock:
+            self.rules.clear()
+            self.hits.clear()
+
+    def __call__(self, method: str, path: str):
+        with self.lock:
+            for (rule_method, prefix), script in self.rules.items():
+                if rule_method == method and path.startswith(prefix):
+                    self.hits[(method, prefix)] += 1
+                    return script.pop(0) if len(script) > 1 else script[0]
+        return None
+
+
+async def timed(tool, args: dict):
+    start = time.perf_counter()
+    output = await tool.ainvoke(args)
+    return output, time.perf_counter() - start
+
+
+async def run(stub: StubBackend) -> int:
+    from client import backend
+    from client.http_pool import close_clients
+    from tools.course import create_course
+    from tools.json_to_java import get_movie_by_track_id
+    from tools.professor import get_professor_for_course
+    from tools.student_tool import get_students_with_no_courses
+    from tools.webflux_api_product import get_products_by_name
+
+    # Short read timeouts so the hung-service check finishes quickly
+    backend.HTTP_READ_TIMEOUTS.update({service: 0.3 for service in backend.BACKEND_SERVICES})
+    faults = Faults()
+    stub.fault = faults
+    failures = 0
+
+    def check(name: str, ok: bool, detail: str):
+        nonlocal failures
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'}  {name}: {detail}")
+
+    # Hung service: every attempt hits the read timeout, the tool answers with an error in bounded time
+    faults.set("GET", "/students", (5, None))
+    output, elapsed = await timed(get_students_with_no_courses, {})
+    check("timeout", "did not respond" in output and elapsed < 3,
+          f"{elapsed:.2f}s, {faults.hits[('GET', '/students')]} attempts -> {output!r}")
+    faults.clear()
+
+    # Flaky GET: two 503s then success
+    faults.set("GET", "/professors", (0, 503), (0, 503), (0, None))
+    output, elapsed = await timed(get_professor_for_course, {"course_id": 1})
+    check("retry GET", output.startswith("Professor for course 1") and faults.hits[("GET", "/professors")] == 3,
+          f"{faults.hits[('GET', '/professors')]} attempts -> {output!r}")
+    faults.clear()
+
+    # POSTs are not idempotent and must not be retried
+    faults.set("POST", "/courses", (0, 503), (0, None))
+    output, _ = await timed(create_course, {"name": "Algorithms"})
+    check("no POST retry", output.startswith("Error") and faults.hits[("POST", "/courses")] == 1,
+          f"{faults.hits[('POST', '/courses')]} attempt(s) -> {output!r}")
+    faults.clear()
+
+    # Failing service: the breaker opens, then rejects without calling the backend
+    faults.set("GET", "/api/products", (0, 500))
+    for _ in range(backend.BREAKER_FAILURE_THRESHOLD):
+        await get_products_by_name.ainvoke({"name": "phone"})
+    calls = faults.hits[("GET", "/api/products")]
+    output, elapsed = await timed(get_products_by_name, {"name": "phone"})
+    check("circuit opens", "currently unavailable" in output and faults.hits[("GET", "/api/products")] == calls,
+          f"failed fast in {elapsed * 1000:.1f} ms -> {output!r}")
+
+    # After the reset timeout one probe goes through and closes the breaker
+    faults.clear()
+    await asyncio.sleep(backend.BREAKER_RESET_SECONDS)
+    output, _ = await timed(get_products_by_name, {"name": "phone"})
+    check("circuit recovers", output.startswith("Products with name") and backend.breaker_for("webflux").state == "closed",
+          f"state={backend.breaker_for('webflux').state}")
+
+    # A cancelled probe (tool timeout, client gone) must not hold the half-open slot forever
+    faults.set("GET", "/api/products", (0, 500))
+    for _ in range(backend.BREAKER_FAILURE_THRESHOLD):
+        await get_products_by_name.ainvoke({"name": "phone"})
+    await asyncio.sleep(backend.BREAKER_RESET_SECONDS)
+    faults.set("GET", "/api/products", (5, None))
+    probe = asyncio.create_task(get_products_by_name.ainvoke({"name": "phone"}))
+    await asyncio.sleep(0.1)
+    probe.cancel()
+    await asyncio.gather(probe, return_exceptions=True)
+    faults.clear()
+    await asyncio.sleep(backend.BREAKER_RESET_SECONDS)
+    output, _ = await timed(get_products_by_name, {"name": "phone"})
+    check("cancelled probe", output.startswith("Products with name") and backend.breaker_for("webflux").state == "closed",
+          f"probing={backend.breaker_for('webflux').probing}, state={backend.breaker_for('webflux').state} -> {output[:60]!r}")
+
+    # Hedging: the first request stalls, the hedge sent after 0.1 s answers
+    backend.HEDGE_DELAYS["jsontojava"] = 0.1
+    faults.set("GET", "/api/movies", (1.5, None), (0, None))
+    output, elapsed = await timed(get_movie_by_track_id, {"track_id": 3})
+    check("hedging", output.startswith("Movie:") and elapsed < 1.0,
+          f"{elapsed:.2f}s with a 1.5s primary -> {output!r}")
+    backend.HEDGE_DELAYS.pop("jsontojava")
+
+    await close_clients()
+    return failures
+
+
+def main():
+    os.environ["LANGCHAIN_TRACING_V2"] = "false"
+    os.environ.setdefault("RETRY_BACKOFF_BASE", "0.01")
+    os.environ.setdefault("BREAKER_RESET_SECONDS", "0.5")
+    with StubBackend() as stub:
+        os.environ.update(stub.service_env())
+        failures = asyncio.run(run(stub))
+    print("all checks passed" if not failures else f"{failures} check(s) FAILED")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
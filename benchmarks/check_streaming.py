@@ -0,0 +1,71 @@
+# benchmarks/check_streaming.py
+"""
+Checks that client/streaming.py parses a body the same way wherever the
+network splits it: every body is fed in two chunks at every byte offset,
+then one byte at a time, and compared with `json.loads` of the whole body.
+Prints PASS/FAIL per body.
+
+Usage: python -m benchmarks.check_streaming
+"""
+import asyncio
+import json
+import sys
+
+BODIES = {
+    "numbers": b"[1.5, -2, 3e2, 4.25E-1, -0.5e+3, 0, 12345678901234567890, 6.0]",
+    "literals": b"[true, false, null, 1, true]",
+    "strings": '["café", "漢字", "a \\"quoted\\" ]", "", "1.5"]'.encode(),
+    "objects": b'[{"id": 1, "price": 9.99, "tags": ["a", "b"]}, {"id": 2, "price": 1e3, "data": {"x": -0.25}}]',
+    "nested arrays": b"[[1.5, 2], [], [[3e1]]]",
+    "blank and separators": b"  \n[ 1 ,\n 2.5 ,\t\"x\" ]  ",
+    "empty": b"[]",
+    "top-level number": b"12.5e3",
+    "top-level object": b'{"price": 1.25}',
+}
+
+
+async def parse(chunks: list) -> list:
+    from client.streaming import iter_json_array
+
+    async def source():
+        for chunk in chunks:
+            yield chunk
+
+    return [item async for item in iter_json_array(source())]
+
+
+def splits(body: bytes):
+    """Two chunks at every offset, then one byte per chunk."""
+    for cut in range(len(body) + 1):
+        yield [body[:cut], body[cut:]]
+    yield [body[i:i + 1] for i in range(len(body))]
+
+
+async def run() -> int:
+    failures = 0
+    for name, body in BODIES.items():
+        expected = json.loads(body)
+        if not isinstance(expected, list):
+            expected = [expected]
+        wrong = []
+        for chunks in splits(body):
+            try:
+                items = await parse(chunks)
+            except ValueError as e:
+                items = e
+            if items != expected:
+                wrong.append((chunks, items))
+        failures += bool(wrong)
+        detail = "all splits agree" if not wrong else f"{len(wrong)} split(s) differ, e.g. {wrong[0][0][:2]} -> {wrong[0][1]!r}"
+        print(f"{'FAIL' if wrong else 'PASS'}  {name}: {detail}")
+    return failures
+
+
+def main():
+    failures = asyncio.run(run())
+    print("all checks passed" if not failures else f"{failures} check(s) FAILED")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
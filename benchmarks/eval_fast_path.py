@@ -0,0 +1,145 @@
+# benchmarks/eval_fast_path.py
+"""
+Fast-path hit rate and latency saved, over the labelled routing queries.
+
+Every query is sent to /chat once with the fast path on. Queries it answers
+are sent again with the fast path off, through the agent with a scripted
+model (`--llm-latency` seconds per call) that picks the same tool, so the
+difference is the cost of the model round trips (one when the tool's output
+is returned directly, two otherwise).
+
+Then checks that a fast-path call whose tool fails, or returns only the first
+page of its rows, falls back to the agent instead of becoming the answer.
+
+Usage: python -m benchmarks.eval_fast_path [--llm-latency 0.6]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.stub_backends import StubBackend
+
+DEFAULT_QUERIES = Path(__file__).parent / "data" / "routing_queries.jsonl"
+
+
+async def check_fallbacks(client, stub: StubBackend) -> list:
+    import main
+    from benchmarks.fake_llm import ScriptedChatModel
+    from client.cache import response_cache
+    from graph import agent_graph
+
+    def fail_backend():
+        stub.fault = lambda method, path: (0, 500)
+
+    def many_products():
+        stub.payloads["/api/products"] = [
+            {"id": str(i), "name": f"Product {i}", "data": {"price": 1.0 * i, "color": "black"}} for i in range(1, 1001)
+        ]
+
+    cases = [
+        ("tool error", "Get students with no courses", "get_students_with_no_courses", {}, fail_backend),
+        ("more rows", "Show all products", "get_all_products", {}, many_products),
+    ]
+    problems = []
+    main.FAST_PATH_ENABLED = True
+    for number, (name, query, tool_name, args, setup) in enumerate(cases):
+        intent = agent_graph.fast_path.match(query)
+        if intent is None or intent[0].name != tool_name:
+            problems.append(f"{name}: {query!r} does not take the fast path")
+            continue
+        response_cache.clear()
+        setup()
+        model = agent_graph.llm = ScriptedChatModel(rules=[(re.escape(query.lower()), tool_name, args)])
+        try:
+            response = await client.post("/chat", params={"session_id": f"fallback-{number}"}, json={"query": query})
+        finally:
+            stub.fault = None
+            stub.payloads.clear()
+        response.raise_for_status()
+        if response.headers.get("X-Fast-Path") == "hit" or model.calls != 2:
+            problems.append(f"{name}: answered by the fast path ({model.calls} model calls), expected the agent")
+    return problems
+
+
+async def run(samples: list, llm_latency: float, stub: StubBackend):
+    import httpx
+    import main
+    from graph import agent_graph
+    from benchmarks.fake_llm import ScriptedChatModel
+
+    async def ask(client, query: str, session_id: str):
+        start = time.perf_counter()
+        response = await client.post("/chat", params={"session_id": session_id}, json={"query": query})
+        response.raise_for_status()
+        return response, time.perf_counter() - start
+
+    wrong, fast, agent, calls = [], [], [], []
+    async with main.lifespan(main.app):
+        matched = [(sample, agent_graph.fast_path.match(sample["query"])) for sample in samples]
+        matched = [(sample, intent) for sample, intent in matched if intent is not None]
+        # Warm every backend connection so both modes are timed against hot pools
+        for _, (tool, args) in matched:
+            await tool.ainvoke(args)
+
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+            for number, (sample, (tool, args)) in enumerate(matched):
+                query = sample["query"]
+                if tool.name not in sample["tools"]:
+                    wrong.append(f"{query!r} -> {tool.name}")
+
+                main.FAST_PATH_ENABLED = True
+                response, elapsed = await ask(client, query, f"fast-{number}")
+                assert response.headers.get("X-Fast-Path") == "hit"
+                fast.append(elapsed)
+
+                main.FAST_PATH_ENABLED = False
+                model = agent_graph.llm = ScriptedChatModel(
+                    rules=[(re.escape(query.lower()), tool.name, args)], latency=llm_latency
+                )
+                _, elapsed = await ask(client, query, f"agent-{number}")
+                agent.append(elapsed)
+                calls.append(model.calls)
+            problems = await check_fallbacks(client, stub)
+    return len(matched), wrong, fast, agent, calls, problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", default=str(DEFAULT_QUERIES))
+    parser.add_argument("--llm-latency", type=float, default=0.6, help="scripted model latency per call, seconds")
+    parser.add_argument("--backend-latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-offline")
+    os.environ["LANGCHAIN_TRACING_V2"] = "false"
+    os.environ["MCP_TRANSPORT"] = "local"
+    os.environ["ANSWER_CACHE_ENABLED"] = "false"
+    os.environ["CHECKPOINT_DB"] = os.path.join(tempfile.mkdtemp(), "fast_path.db")
+    samples = [json.loads(line) for line in open(args.queries) if line.strip()]
+
+    with StubBackend(latency=args.backend_latency) as stub:
+        os.environ.update(stub.service_env())
+        hits, wrong, fast, agent, calls, problems = asyncio.run(run(samples, args.llm_latency, stub))
+
+    for miss in wrong:
+        print("WRONG TOOL", miss)
+    print(f"queries:          {len(samples)}")
+    print(f"fast-path hits:   {hits} ({hits / len(samples):.1%}), wrong tool: {len(wrong)}")
+    if hits:
+        fast_ms, agent_ms = statistics.mean(fast) * 1000, statistics.mean(agent) * 1000
+        print(f"latency per hit:  {fast_ms:.1f} ms fast path vs {agent_ms:.1f} ms agent "
+              f"({agent_ms - fast_ms:.1f} ms saved, {statistics.mean(calls):.1f} model calls avoided)")
+    for problem in problems:
+        print("FAIL", problem)
+    print(f"fallback on tool errors and cut pages: {'FAIL' if problems else 'PASS'}")
+
+
+if __name__ == "__main__":
+    main()
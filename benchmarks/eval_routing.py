@@ -0,0 +1,53 @@
+# benchmarks/eval_routing.py
+"""
+Offline evaluation of graph/router.py over a labelled query file.
+
+Each line of the query file is {"query": ..., "tools": [acceptable tool names]}.
+A query is routed correctly when at least one acceptable tool is bound.
+
+Usage: python -m benchmarks.eval_routing [--queries benchmarks/data/routing_queries.jsonl]
+"""
+import argparse
+import json
+from pathlib import Path
+
+from client.multi_client import MultiServerMCPClient, register_local_servers
+from graph.router import ToolRouter
+from graph.tool_registry import ToolRegistry
+
+DEFAULT_QUERIES = Path(__file__).parent / "data" / "routing_queries.jsonl"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", default=str(DEFAULT_QUERIES))
+    args = parser.parse_args()
+
+    client = MultiServerMCPClient()
+    register_local_servers(client)
+    registry = ToolRegistry(client.servers)
+    router = ToolRouter(registry.servers)
+    full_tokens = registry.tokens(registry.tools)
+    samples = [json.loads(line) for line in Path(args.queries).read_text().splitlines() if line.strip()]
+
+    correct = fallbacks = routed_tokens = 0
+    for sample in samples:
+        tools, confident = router.route(sample["query"])
+        names = [t.name for t in tools]
+        hit = any(name in names for name in sample["tools"])
+        correct += hit
+        fallbacks += not confident
+        routed_tokens += registry.tokens(tools)
+        if not hit:
+            print(f"MISS  {sample['query']!r}: expected {sample['tools']}, got {names}")
+
+    n = len(samples)
+    print(f"queries:            {n}")
+    print(f"routing accuracy:   {correct / n:.1%}")
+    print(f"fallback rate:      {fallbacks / n:.1%}")
+    print(f"schema tokens/turn: {routed_tokens / n:.0f} routed vs {full_tokens} full "
+          f"({1 - routed_tokens / (n * full_tokens):.1%} saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/fake_llm.py
+"""
+Offline stand-in for ChatOpenAI with scripted tool calls.
+
+A user message matching one of `rules` is answered with the corresponding
+tool call(s); once tool results are in, the model "summarizes" them by
+echoing their content. Every call sleeps `latency` seconds to model the
+round trip to the API.
+"""
+import asyncio
+import re
+import uuid
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# (pattern, tool name, argument names filled from the numeric groups, or a dict of fixed args)
+DEFAULT_RULES = [
+    (r"courses? for students? ([\d, and]+)", "get_courses_by_student_id", ("student_id",)),
+    (r"enroll student (\d+) in course (\d+)", "enroll_student_in_course", ("student_id", "course_id")),
+    (r"professors? with multiple courses", "get_professors_with_multiple_courses", ()),
+    (r"professor for course (\d+)", "get_professor_for_course", ("course_id",)),
+    (r"products below price (\d+(?:\.\d+)?)", "get_products_below_price", ("price",)),
+    (r"all products", "get_all_products", ()),
+    (r"all movies", "get_all_movies", ()),
+    (r"courses with students", "get_all_courses_with_students", ()),
+]
+
+
+def _number(text: str):
+    return float(text) if "." in text else int(text)
+
+
+class ScriptedChatModel(BaseChatModel):
+    rules: list = DEFAULT_RULES
+    latency: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model_name": "scripted", "latency": self.latency}
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _respond(self, messages) -> AIMessage:
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            results = []
+            for message in reversed(messages):
+                if not isinstance(message, ToolMessage):
+                    break
+                results.insert(0, str(message.content))
+            return AIMessage(content="\n".join(results))
+        if isinstance(last, HumanMessage):
+            text = str(last.content).lower()
+            for pattern, tool_name, arg_names in self.rules:
+                match = re.search(pattern, text)
+                if not match:
+                    continue
+                if isinstance(arg_names, dict):
+                    args_list = [arg_names]
+                elif arg_names and len(arg_names) == 1 and match.groups():
+                    # "students 1, 2 and 3" fans out into one call per id
+                    values = [_number(v) for v in re.findall(r"\d+(?:\.\d+)?", match.group(1))]
+                    args_list = [{arg_names[0]: v} for v in values]
+                else:
+                    args_list = [dict(zip(arg_names, (_number(g) for g in match.groups())))]
+                return AIMessage(content="", tool_calls=[
+                    {"name": tool_name, "args": args, "id": f"call_{uuid.uuid4().hex[:12]}"} for args in args_list
+                ])
+        return AIMessage(content=f"You said: {getattr(last, 'content', '')}")
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+
+class PlannedChatModel(ScriptedChatModel):
+    """Follows `plan`, one (tool name, args) call per model step, then echoes every result."""
+
+    plan: list = []
+
+    def _respond(self, messages) -> AIMessage:
+        start = max(i for i, m in enumerate(messages) if isinstance(m, HumanMessage))
+        results = [str(m.content) for m in messages[start:] if isinstance(m, ToolMessage)]
+        if len(results) >= len(self.plan):
+            return AIMessage(content="\n".join(results))
+        tool_name, args = self.plan[len(results)]
+        return AIMessage(content="", tool_calls=[
+            {"name": tool_name, "args": args, "id": f"call_{uuid.uuid4().hex[:12]}"}
+        ])
@@ -0,0 +1,139 @@
+# benchmarks/load_overload.py
+"""
+Overload test of /chat with and without admission control.
+
+Requests arrive open-loop at `--rate` per second for `--duration` seconds,
+each on its own session, whatever the service manages to answer, like real
+users during a spike. Backends are in-process stubs and the model is a
+scripted fake with `--llm-latency` seconds per call; the fast path and the
+answer cache are off, so every request is a full agent run.
+
+The same arrival schedule runs twice, with ADMISSION_ENABLED off and on,
+and prints for each how many requests were answered, shed (429/503) or
+timed out after `--client-timeout`, the latency of answered requests, and
+the admission metrics. Exits non-zero if, with admission on, the p99
+latency of answered requests exceeds `--max-p99`.
+
+Usage: python -m benchmarks.load_overload --rate 200 --duration 10 [--max-in-flight 16 --queue-timeout 1]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from benchmarks.load_test import QUERIES, RULES, percentile
+from benchmarks.stub_backends import StubBackend
+
+
+async def phase(client, args, label: str) -> dict:
+    latencies, outcomes = [], Counter()
+
+    async def one(number: int):
+        query = QUERIES[number % len(QUERIES)].format(n=number % 20 + 1, m=(number + 1) % 20 + 1, k=(number + 2) % 20 + 1)
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(
+                client.post("/chat", params={"session_id": f"{label}-{number}"}, json={"query": query}),
+                args.client_timeout,
+            )
+        except asyncio.TimeoutError:
+            outcomes["timeout"] += 1
+            return
+        if response.status_code == 200:
+            latencies.append(time.perf_counter() - start)
+            outcomes["ok"] += 1
+        else:
+            outcomes[str(response.status_code)] += 1
+            if "Retry-After" not in response.headers:
+                outcomes["missing Retry-After"] += 1
+
+    tasks = []
+    start = time.perf_counter()
+    for number in range(int(args.rate * args.duration)):
+        await asyncio.sleep(max(0.0, start + number / args.rate - time.perf_counter()))
+        tasks.append(asyncio.create_task(one(number)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    return {
+        "sent": len(tasks),
+        "outcomes": outcomes,
+        "goodput": outcomes["ok"] / elapsed,
+        "p50": percentile(latencies, 0.5) * 1000 if latencies else float("nan"),
+        "p99": percentile(latencies, 0.99) * 1000 if latencies else float("nan"),
+    }
+
+
+async def run(args) -> dict:
+    import httpx
+    import main
+    from graph import agent_graph
+    from benchmarks.fake_llm import ScriptedChatModel
+
+    agent_graph.llm = ScriptedChatModel(rules=RULES, latency=args.llm_latency)
+    main.FAST_PATH_ENABLED = False
+    main.ANSWER_CACHE_ENABLED = False
+    results = {}
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+            for enabled in (False, True):
+                main.ADMISSION_ENABLED = enabled
+                label = "admission on" if enabled else "admission off"
+                results[label] = await phase(client, args, label.replace(" ", "-"))
+            metrics = (await client.get("/metrics")).text
+    results["metrics"] = [line for line in metrics.splitlines() if line.startswith("chat_admission_shed_total")]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rate", type=float, default=200, help="arrivals per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of arrivals")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="scripted model latency per call, seconds")
+    parser.add_argument("--client-timeout", type=float, default=30)
+    parser.add_argument("--max-in-flight", type=int, default=16)
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--queue-timeout", type=float, default=1)
+    parser.add_argument("--max-p99", type=float, default=3000, help="p99 target (ms) for answered requests with admission on")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-offline")
+    os.environ["MCP_TRANSPORT"] = "local"
+    os.environ["CHECKPOINT_DB"] = os.path.join(tempfile.mkdtemp(), "overload.db")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.update(
+        ADMISSION_MAX_IN_FLIGHT=str(args.max_in_flight),
+        ADMISSION_QUEUE_SIZE=str(args.queue_size),
+        ADMISSION_QUEUE_TIMEOUT=str(args.queue_timeout),
+    )
+
+    with StubBackend(latency=0.005) as stub:
+        os.environ.update(stub.service_env())
+        results = asyncio.run(run(args))
+
+    print(f"{args.rate:.0f} req/s for {args.duration:.0f}s, client timeout {args.client_timeout:.0f}s\n")
+    print(f"{'mode':<15}{'sent':>6}{'ok':>6}{'429':>6}{'503':>6}{'timeout':>9}{'ok/s':>8}{'p50 ms':>9}{'p99 ms':>9}")
+    for label in ("admission off", "admission on"):
+        r = results[label]
+        o = r["outcomes"]
+        print(f"{label:<15}{r['sent']:>6}{o['ok']:>6}{o['429']:>6}{o['503']:>6}{o['timeout']:>9}"
+              f"{r['goodput']:>8.1f}{r['p50']:>9.0f}{r['p99']:>9.0f}")
+    print()
+    for line in results["metrics"]:
+        print(line)
+
+    on = results["admission on"]
+    failed = []
+    if not on["p99"] <= args.max_p99:
+        failed.append(f"p99 {on['p99']:.0f} ms > {args.max_p99:.0f} ms")
+    if on["outcomes"]["timeout"] or on["outcomes"]["missing Retry-After"]:
+        failed.append("requests timed out or were shed without Retry-After")
+    print("\nFAIL: " + "; ".join(failed) if failed else "\nPASS")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/load_same_session.py
+"""
+Fires concurrent /chat requests at one session_id and checks the stored
+history is still a clean sequence of whole turns (no interleaving, no loss).
+
+Usage: python -m benchmarks.load_same_session --requests 50 [--coalesce]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.stub_backends import StubBackend
+
+
+def check_history(messages, expected_turns: int) -> list:
+    """Return a list of problems found in the stored message sequence."""
+    problems = []
+    turns = []
+    for message in messages:
+        if message.type == "human":
+            turns.append([])
+        elif not turns:
+            problems.append(f"{message.type} message before any user message")
+            continue
+        turns[-1].append(message)
+    if len(turns) != expected_turns:
+        problems.append(f"expected {expected_turns} turns, found {len(turns)}")
+    for number, turn in enumerate(turns, 1):
+        pending = set()
+        for message in turn:
+            if message.type == "ai":
+                if pending:
+                    problems.append(f"turn {number}: model answered before tool results arrived")
+                pending = {c["id"] for c in message.tool_calls}
+            elif message.type == "tool":
+                if message.tool_call_id not in pending:
+                    problems.append(f"turn {number}: tool result without matching call")
+                pending.discard(message.tool_call_id)
+        if not turn or turn[-1].type != "ai" or turn[-1].tool_calls:
+            problems.append(f"turn {number}: does not end with a final answer")
+    return problems
+
+
+async def run(requests: int, coalesce: bool, latency: float) -> int:
+    import httpx
+    import main
+    from graph import agent_graph
+    from benchmarks.fake_llm import ScriptedChatModel
+
+    main.session_locks.coalesce = coalesce
+    agent_graph.llm = ScriptedChatModel(latency=latency)
+    session_id = "load-test"
+
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+            # With coalescing every request asks the same question, otherwise each is distinct
+            queries = ["show all products" if coalesce else f"show all products (request {i})" for i in range(requests)]
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(
+                client.post("/chat", params={"session_id": session_id}, json={"query": q}) for q in queries
+            ))
+            elapsed = time.perf_counter() - start
+
+        failed = [r for r in responses if r.status_code != 200]
+        state = await agent_graph.agent_with_memory.aget_state({"configurable": {"thread_id": session_id}})
+        executed_turns = sum(1 for m in state.values["messages"] if m.type == "human")
+        expected = executed_turns if coalesce else requests
+        problems = check_history(state.values["messages"], expected)
+
+    print(f"{requests} concurrent requests on one session in {elapsed:.2f}s")
+    print(f"failed responses: {len(failed)}")
+    print(f"agent turns executed: {executed_turns}" + (" (coalesced)" if coalesce else ""))
+    print(f"model calls: {agent_graph.llm.calls}")
+    print(f"locks still held: {len(main.session_locks)}")
+    for problem in problems:
+        print("PROBLEM:", problem)
+    print("history consistent" if not problems and not failed else "history INCONSISTENT")
+    return 1 if problems or failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.01, help="fake model latency in seconds")
+    parser.add_argument("--coalesce", action="store_true")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-offline")
+    os.environ["LANGCHAIN_TRACING_V2"] = "false"
+    os.environ["MCP_TRANSPORT"] = "local"
+    os.environ["CHECKPOINT_DB"] = os.path.join(tempfile.mkdtemp(), "load_test.db")
+    # Keep every turn in state so the full history can be checked
+    os.environ["HISTORY_SUMMARY_TRIGGER"] = str(10**9)
+    with StubBackend() as stub:
+        os.environ.update(stub.service_env())
+        sys.exit(asyncio.run(run(args.requests, args.coalesce, args.latency)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# benchmarks/load_test.py
+"""
+Offline load test of `main.app`: throughput, latency, memory and time split.
+
+All five backend URLs point at in-process stubs and the model is a scripted
+fake with `--llm-latency` seconds per call, so no Java service or API key is
+needed. `--sessions` sessions each send `--turns` queries one after another,
+with at most `--concurrency` sessions in flight. Reported:
+
+- requests/s and p50/p95/p99 latency of /chat,
+- resident memory growth per session,
+- seconds spent in model calls, tool calls, backend requests and
+  checkpointing (summed from the /metrics histograms, so concurrent work
+  can add up to more than the wall time).
+
+`--json FILE` writes the results; `--baseline FILE` prints the change
+against an earlier run and exits non-zero if a metric regressed by more
+than `--tolerance`.
+
+Usage: python -m benchmarks.load_test --sessions 200 --concurrency 50 --turns 3 --json out.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.stub_backends import StubBackend
+
+# One query per tool family; {n} varies the ids per session and turn
+QUERIES = [
+    "Get courses for student {n}",
+    "Who is the professor for course {n}?",
+    "Show all products",
+    "Show products below price {n}0",
+    "Show all movies",
+    "Show all courses with their students",
+    "Get courses for students {n}, {m} and {k}",
+]
+RULES = [
+    (r"courses for students ([\d, and]+)", "get_courses_for_students", {"student_ids": "1,2,3"}),
+    (r"courses? for student (\d+)", "get_courses_by_student_id", ("student_id",)),
+    (r"professor for course (\d+)", "get_professor_for_course", ("course_id",)),
+    (r"products below price (\d+(?:\.\d+)?)", "get_products_below_price", ("price",)),
+    (r"all products", "get_all_products", ()),
+    (r"all movies", "get_all_movies", ()),
+    (r"courses with their students", "get_all_courses_with_students", ()),
+]
+# Lower is better for every compared metric except throughput
+HIGHER_IS_BETTER = {"rps"}
+
+
+def rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def time_split() -> dict:
+    from telemetry.metrics import _registry
+
+    split = {}
+    for name, key in (("llm_call_seconds", "llm"), ("tool_call_seconds", "tools"),
+                      ("backend_request_seconds", "backend"), ("checkpoint_seconds", "checkpoint")):
+        metric = _registry.get(name)
+        split[key] = round(metric.total()[0], 3) if metric is not None else 0.0
+    return split
+
+
+async def run(args) -> dict:
+    import httpx
+    import main
+    from graph import agent_graph
+    from benchmarks.fake_llm import ScriptedChatModel
+
+    agent_graph.llm = ScriptedChatModel(rules=RULES, latency=args.llm_latency)
+    main.FAST_PATH_ENABLED = args.fast_path
+    main.ANSWER_CACHE_ENABLED = args.answer_cache
+    latencies, errors = [], 0
+    gate = asyncio.Semaphore(args.concurrency)
+
+    async def session(client, number: int):
+        nonlocal errors
+        async with gate:
+            for turn in range(args.turns):
+                n = number * args.turns + turn
+                query = QUERIES[n % len(QUERIES)].format(n=n % 20 + 1, m=(n + 1) % 20 + 1, k=(n + 2) % 20 + 1)
+                start = time.perf_counter()
+                response = await client.post("/chat", params={"session_id": f"load-{number}"}, json={"query": query})
+                latencies.append(time.perf_counter() - start)
+                errors += response.status_code != 200
+
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+            # Warm-up: imports, pooled connections and the checkpoint database
+            await asyncio.gather(*(session(client, -1 - i) for i in range(min(args.concurrency, 5))))
+            latencies.clear()
+            before_split, rss_before = time_split(), rss_bytes()
+            start = time.perf_counter()
+            await asyncio.gather(*(session(client, i) for i in range(args.sessions)))
+            elapsed = time.perf_counter() - start
+            rss_after = rss_bytes()
+            after_split = time_split()
+
+    requests = len(latencies)
+    return {
+        "config": {
+            "sessions": args.sessions, "turns": args.turns, "concurrency": args.concurrency,
+            "llm_latency": args.llm_latency, "backend_latency": args.backend_latency,
+            "fast_path": args.fast_path, "answer_cache": args.answer_cache,
+            "python": platform.python_version(),
+        },
+        "requests": requests,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(requests / elapsed, 2),
+        "latency_ms": {
+            "p50": round(statistics.median(latencies) * 1000, 1),
+            "p95": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99": round(percentile(latencies, 0.99) * 1000, 1),
+        },
+        "rss_growth_per_session_kb": round((rss_after - rss_before) / 1024 / args.sessions, 1),
+        "time_s": {k: round(after_split[k] - before_split[k], 3) for k in after_split},
+    }
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        if key == "config":
+            continue
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Print each metric against the baseline; return the names that regressed."""
+    regressed = []
+    current, previous = flatten(results), flatten(baseline)
+    print(f"\n{'metric':<30}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, value in current.items():
+        old = previous.get(name)
+        if old is None:
+            continue
+        if old:
+            change = (value - old) / old
+        else:
+            change = float("inf") if value > old else 0.0
+        worse = -change if name.split(".")[0] in HIGHER_IS_BETTER else change
+        flag = ""
+        if worse > tolerance and name not in ("requests", "elapsed_s") and not name.startswith("time_s."):
+            regressed.append(name)
+            flag = "  REGRESSED"
+        print(f"{name:<30}{old:>12}{value:>12}{change:>+9.1%}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=3, help="queries per session, sent one after another")
+    parser.add_argument("--concurrency", type=int, default=20, help="sessions in flight at once")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="scripted model latency per call, seconds")
+    parser.add_argument("--backend-latency", type=float, default=0.005)
+    parser.add_argument("--fast-path", action="store_true", help="let the fast path answer simple lookups")
+    parser.add_argument("--answer-cache", action="store_true", help="let the answer cache answer repeated queries")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare against the results of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed regression against the baseline")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-offline")
+    os.environ["LANGCHAIN_TRACING_V2"] = "false"
+    os.environ["MCP_TRANSPORT"] = "local"
+    os.environ["CHECKPOINT_DB"] = os.path.join(tempfile.mkdtemp(), "load.db")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    with StubBackend(latency=args.backend_latency) as stub:
+        os.environ.update(stub.service_env())
+        results = asyncio.run(run(args))
+
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressed = compare(results, json.load(f), args.tolerance)
+        if regressed:
+            print(f"\nregressed beyond {args.tolerance:.0%}: {', '.join(regressed)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# benchmarks/stub_backends.py
+"""
+In-process stand-ins for the Spring / WebFlux / JSON-to-Java services.
+
+All five services are served from one threaded HTTP server; `service_env()`
+returns the environment overrides that point config/settings.py at it.
+"""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+COURSES = [{"id": i, "name": name} for i, name in enumerate(["Math", "Physics", "Chemistry", "Biology", "History"], 1)]
+STUDENTS = [{"id": i, "name": f"Student {i}"} for i in range(1, 21)]
+PROFESSORS = [{"id": i, "name": f"Professor {i}"} for i in range(1, 6)]
+PRODUCTS = [{"id": str(i), "name": f"Product {i}", "data": {"price": 10.0 * i, "color": "black", "capacity": "128 GB"}} for i in range(1, 21)]
+MOVIES = [{"trackId": i, "trackName": f"Track {i}", "collectionName": f"Collection {i}", "collectionPrice": 1.0 * i} for i in range(1, 21)]
+
+
+def _route(method: str, path: str, query: str = ""):
+    """Return the JSON payload for a request path, or None for 404."""
+    if method == "POST":
+        return {"id": 999, "name": "created"}
+
+    if path == "/students/courses/by-ids":
+        # Batch endpoint for the bulk tools: {"<student id>": courses}
+        ids = parse_qs(query).get("ids", [""])[0].split(",")
+        return {i: COURSES[:3] for i in ids if i}
+    if path.startswith("/students"):
+        if re.fullmatch(r"/students/\d+/courses", path):
+            return COURSES[:3]
+        if path.endswith("/common-courses-grouped"):
+            return COURSES[:2]
+        return STUDENTS[:5]
+    if path.startswith("/courses"):
+        if path.endswith("/with-students"):
+            return [dict(c, students=STUDENTS[:5]) for c in COURSES]
+        if path.endswith("/with-professors"):
+            return [dict(c, professor=PROFESSORS[c["id"] % len(PROFESSORS)]) for c in COURSES]
+        return COURSES[:3]
+    if path.startswith("/professors"):
+        if re.fullmatch(r"/professors/courses/\d+/professor", path):
+            return PROFESSORS[0]
+        if path.endswith("/multiple-courses"):
+            return PROFESSORS[:2]
+        return STUDENTS[:5]
+    if path.startswith("/api/products"):
+        return PRODUCTS
+    if path.startswith("/api/movies"):
+        match = re.fullmatch(r"/api/movies/(\d+)", path)
+        if match:
+            track_id = int(match.group(1))
+            return next((m for m in MOVIES if m["trackId"] == track_id), None)
+        if path.endswith("/titles"):
+            return [{"trackName": m["trackName"], "collectionName": m["collectionName"]} for m in MOVIES]
+        return MOVIES
+    return None
+
+
+class StubBackend:
+    """Threaded HTTP server answering every backend route with canned JSON."""
+
+    def __init__(self, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0, payloads: dict = None):
+        self.latency = latency
+        # Path -> JSON payload served instead of the canned fixtures, or a callable
+        # taking the Accept header and returning (content type, byte chunks) to stream
+        self.payloads = payloads or {}
+        # Optional fault injection: callable(method, path) -> (extra delay seconds, error status or None)
+        self.fault = None
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _respond(self):
+                if stub.latency:
+                    time.sleep(stub.latency)
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                path, _, query = self.path.partition("?")
+                delay, status = (stub.fault(self.command, path) or (0, None)) if stub.fault else (0, None)
+                if delay:
+                    time.sleep(delay)
+                if status is not None:
+                    body = b'{"error": "injected"}'
+                else:
+                    payload = stub.payloads.get(path) if self.command == "GET" and path in stub.payloads else _route(self.command, path, query)
+                    if callable(payload):
+                        self._stream(*payload(self.headers.get("Accept", "")))
+                        return
+                    status = 200 if payload is not None else 404
+                    body = json.dumps(payload).encode() if payload is not None else b'{"error": "not found"}'
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, content_type: str, chunks):
+                """Send generated chunks with chunked transfer encoding."""
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for chunk in chunks:
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client stopped reading early
+                    self.close_connection = True
+
+            do_GET = _respond
+            do_POST = _respond
+
+            def log_message(self, *args):
+                pass
+
+        ThreadingHTTPServer.request_queue_size = 1024
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def service_env(self) -> dict:
+        return {
+            "STUDENT_SERVICE": f"{self.url}/students",
+            "PROFESSOR_SERVICE": f"{self.url}/professors",
+            "COURSE_SERVICE": f"{self.url}/courses",
+            "WEBFLUX_SERVICE": f"{self.url}/api/products",
+            "JSONTOJAVA_SERVICE": f"{self.url}/api/movies",
+        }
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,165 @@
+# benchmarks/stub_redis.py
+"""
+In-process stand-in for a Redis server, enough for `graph/redis_saver.py`.
+
+Speaks RESP2 on a local TCP port from a background thread and keeps
+hashes, sets and sorted sets (score 0 only) in memory, with key expiry.
+Every worker process of a benchmark can connect to it, like they would to
+a shared Redis.
+"""
+import asyncio
+import fnmatch
+import threading
+import time
+
+
+class StubRedis:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.data = {}  # key -> dict (hash) or set (set, or sorted set of score-0 members)
+        self.expires = {}  # key -> deadline
+        self.commands = 0
+        self._loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    # -----------------------
+    # Server
+    # -----------------------
+    def _serve(self):
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self._client, self.host, self.port))
+        self.port = server.sockets[0].getsockname()[1]
+        self._started.set()
+        self._loop.run_forever()
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        queued = None
+        try:
+            while True:
+                command = await self._read_command(reader)
+                if command is None:
+                    break
+                name = command[0].decode().upper()
+                if name == "MULTI":
+                    queued = []
+                    reply = "OK"
+                elif name == "EXEC":
+                    reply = [self._run(c) for c in queued or []]
+                    queued = None
+                elif queued is not None:
+                    queued.append(command)
+                    reply = "QUEUED"
+                else:
+                    reply = self._run(command)
+                writer.write(_encode(reply))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_command(reader: asyncio.StreamReader):
+        line = await reader.readline()
+        if not line:
+            return None
+        count = int(line[1:])
+        args = []
+        for _ in range(count):
+            size = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(size + 2))[:-2])
+        return args
+
+    # -----------------------
+    # Commands
+    # -----------------------
+    def _get(self, key: bytes, default=None):
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key, default)
+
+    def _run(self, command: list):
+        self.commands += 1
+        name, args = command[0].decode().upper(), command[1:]
+        if name == "PING":
+            return "PONG"
+        if name in ("CLIENT", "SELECT"):
+            return "OK"
+        if name == "HSET":
+            table = self._get(args[0]) or self.data.setdefault(args[0], {})
+            added = sum(args[i] not in table for i in range(1, len(args), 2))
+            table.update(zip(args[1::2], args[2::2]))
+            return added
+        if name == "HSETNX":
+            table = self._get(args[0]) or self.data.setdefault(args[0], {})
+            if args[1] in table:
+                return 0
+            table[args[1]] = args[2]
+            return 1
+        if name == "HGETALL":
+            table = self._get(args[0], {})
+            return [item for pair in table.items() for item in pair]
+        if name == "SADD":
+            members = self._get(args[0]) or self.data.setdefault(args[0], set())
+            added = len(set(args[1:]) - members)
+            members.update(args[1:])
+            return added
+        if name == "SMEMBERS":
+            return sorted(self._get(args[0], set()))
+        if name == "ZADD":
+            members = self._get(args[0]) or self.data.setdefault(args[0], set())
+            added = len(set(args[2::2]) - members)
+            members.update(args[2::2])
+            return added
+        if name in ("ZRANGE", "ZREVRANGE"):
+            members = sorted(self._get(args[0], set()), reverse=name == "ZREVRANGE")
+            start, stop = int(args[1]), int(args[2])
+            return members[start:None if stop == -1 else stop + 1]
+        if name == "EXPIRE":
+            if self._get(args[0]) is None:
+                return 0
+            self.expires[args[0]] = time.time() + int(args[1])
+            return 1
+        if name == "DEL":
+            removed = 0
+            for key in args:
+                removed += self._get(key) is not None
+                self.data.pop(key, None)
+                self.expires.pop(key, None)
+            return removed
+        if name == "SCAN":
+            pattern = args[args.index(b"MATCH") + 1].decode() if b"MATCH" in args else "*"
+            keys = [k for k in list(self.data) if self._get(k) is not None and fnmatch.fnmatchcase(k.decode(), pattern)]
+            return [b"0", keys]
+        return Exception(f"ERR unknown command '{name}'")
+
+    def __enter__(self):
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def __exit__(self, *exc):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+def _encode(value) -> bytes:
+    if isinstance(value, Exception):
+        return f"-{value}\r\n".encode()
+    if isinstance(value, str):
+        return f"+{value}\r\n".encode()
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if value is None:
+        return b"$-1\r\n"
+    return b"*%d\r\n" % len(value) + b"".join(_encode(v) for v in value)
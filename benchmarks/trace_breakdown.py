@@ -0,0 +1,123 @@
+# benchmarks/trace_breakdown.py
+"""
+Where a /chat request spends its time, from its exported spans.
+
+Runs a few queries through /chat offline (stub backends, scripted model with
+`--llm-latency` seconds per call) with every trace sampled and written to a
+temporary OTLP/JSON file, then prints, per span name, the count, total time
+and self time (time not covered by child spans). Also prints the
+chat/tool/backend/checkpoint histogram counts exposed on /metrics.
+
+With the default `--transport stdio` the tools run in the MCP server
+processes, as in a default deployment: their spans join each request's
+trace through the tool-call metadata, and their metrics appear on the API's
+/metrics with an `mcp_server` label. `--transport local` runs them in-process.
+
+Usage: python -m benchmarks.trace_breakdown [--llm-latency 0.3] [--transport stdio|local]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+from collections import defaultdict
+
+from benchmarks.stub_backends import StubBackend
+
+QUERIES = [
+    "Get courses for students 1, 2 and 3",
+    "Show all products",
+    "Who is the professor for course 2?",
+    "Show all movies",
+]
+
+
+def load_spans(path: str) -> list:
+    spans = []
+    with open(path) as f:
+        for line in f:
+            for resource in json.loads(line)["resourceSpans"]:
+                for scope in resource["scopeSpans"]:
+                    spans.extend(scope["spans"])
+    return spans
+
+
+def breakdown(spans: list) -> dict:
+    """name -> [count, total seconds, self seconds]"""
+    duration = {s["spanId"]: (int(s["endTimeUnixNano"]) - int(s["startTimeUnixNano"])) / 1e9 for s in spans}
+    children = defaultdict(float)
+    for s in spans:
+        if s["parentSpanId"]:
+            children[s["parentSpanId"]] += duration[s["spanId"]]
+    rows = defaultdict(lambda: [0, 0.0, 0.0])
+    for s in spans:
+        # Concurrent children can overlap their parent's time; self time never goes below zero
+        row = rows[s["name"]]
+        row[0] += 1
+        row[1] += duration[s["spanId"]]
+        row[2] += max(0.0, duration[s["spanId"]] - children[s["spanId"]])
+    return rows
+
+
+async def run(llm_latency: float):
+    import httpx
+    import main
+    from graph import agent_graph
+    from benchmarks.fake_llm import ScriptedChatModel
+
+    main.FAST_PATH_ENABLED = False
+    agent_graph.llm = ScriptedChatModel(latency=llm_latency, rules=[
+        (r"courses for students ([\d, and]+)", "get_courses_for_students", {"student_ids": "1,2,3"}),
+        (r"all products", "get_all_products", ()),
+        (r"professor for course (\d+)", "get_professor_for_course", ("course_id",)),
+        (r"all movies", "get_all_movies", ()),
+    ])
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+            for number, query in enumerate(QUERIES):
+                response = await client.post("/chat", params={"session_id": f"trace-{number}"}, json={"query": query})
+                response.raise_for_status()
+            metrics = (await client.get("/metrics")).text
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="scripted model latency per call, seconds")
+    parser.add_argument("--backend-latency", type=float, default=0.02)
+    parser.add_argument("--transport", choices=("stdio", "local"), default="stdio")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    trace_file = os.path.join(workdir, "traces.jsonl")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-offline")
+    os.environ["MCP_TRANSPORT"] = args.transport
+    os.environ["MCP_SCHEMA_CACHE"] = os.path.join(workdir, "mcp_tool_cache.json")
+    os.environ["ANSWER_CACHE_ENABLED"] = "false"
+    os.environ["CHECKPOINT_DB"] = os.path.join(workdir, "trace.db")
+    os.environ.update(TRACE_EXPORTER="file", TRACE_FILE=trace_file, TRACE_SAMPLE_RATE="1", LOG_LEVEL="WARNING")
+
+    with StubBackend(latency=args.backend_latency) as stub:
+        os.environ.update(stub.service_env())
+        metrics = asyncio.run(run(args.llm_latency))
+
+    spans = load_spans(trace_file)
+    traces = {s["traceId"] for s in spans}
+    ids = {s["spanId"] for s in spans}
+    orphans = [s["name"] for s in spans if s["parentSpanId"] and s["parentSpanId"] not in ids]
+    print(f"{len(QUERIES)} /chat requests, {len(traces)} traces, {len(spans)} spans in {trace_file} ({args.transport})")
+    if orphans:
+        print(f"FAIL {len(orphans)} spans whose parent is missing: {sorted(set(orphans))}")
+    print(f"{'span':<32}{'count':>6}{'total ms':>11}{'self ms':>10}")
+    for name, (count, total, own) in sorted(breakdown(spans).items(), key=lambda item: -item[1][2]):
+        print(f"{name:<32}{count:>6}{total * 1000:>11.1f}{own * 1000:>10.1f}")
+    print()
+    for line in metrics.splitlines():
+        if line.startswith(("chat_request_seconds_count", "tool_call_seconds_count", "backend_request_seconds_count",
+                            "checkpoint_seconds_count", "llm_call_seconds_count")):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
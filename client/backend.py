@@ -0,0 +1,303 @@
+# client/backend.py
+"""
+Resilient calls to the backend services.
+
+Every tool request goes through here instead of using the pooled client
+directly. Per service (STUDENT, PROFESSOR, COURSE, WEBFLUX, JSONTOJAVA):
+
+- connect and read timeouts,
+- bounded retries with exponential backoff and full jitter, for GETs only,
+  on transport errors and 502/503/504,
+- a circuit breaker that opens after consecutive failures and fails fast
+  with a message the model can relay ("the course service is down"),
+- optional hedging: a slow GET gets a second identical request after the
+  service's hedge delay, and the first response wins,
+- a concurrency budget: at most BACKEND_MAX_CONCURRENCY requests in flight,
+  further ones wait up to BACKEND_QUEUE_TIMEOUT and then fail as busy.
+"""
+import asyncio
+import math
+import random
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+
+from client.http_pool import get_client
+from config.settings import (
+    BACKEND_SERVICES,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_TIMEOUT,
+    HTTP_READ_TIMEOUTS,
+    RETRY_ATTEMPTS,
+    RETRY_DEADLINE,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_SECONDS,
+    HEDGE_DELAYS,
+    BACKEND_MAX_CONCURRENCY,
+    BACKEND_QUEUE_TIMEOUT,
+)
+from telemetry.metrics import counter, gauge, histogram
+from telemetry.tracing import span, current_span
+
+RETRY_STATUSES = {502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD"}
+
+backend_requests = counter("backend_requests_total", "Backend requests by service and outcome")
+backend_retries = counter("backend_retries_total", "Backend request retries by service")
+backend_hedges = counter("backend_hedged_requests_total", "Hedged backend requests by service and winner")
+circuit_open = gauge("backend_circuit_open", "1 while the service's circuit breaker is open")
+backend_queue_depth = gauge("backend_queue_depth", "Requests waiting for the service's concurrency budget")
+backend_seconds = histogram("backend_request_seconds", "Latency of backend requests, retries included, by service, method and status")
+
+
+class ServiceUnavailable(httpx.HTTPError):
+    """The service is failing or its circuit is open; raised instead of calling it."""
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures, lets one probe through after `reset_seconds`."""
+
+    def __init__(self, service: str, threshold: int = BREAKER_FAILURE_THRESHOLD, reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.service = service
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_seconds else "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.reset_seconds - time.monotonic()) if self.opened_at else 0.0
+
+    def record_success(self):
+        self.failures = 0
+        self.probing = False
+        if self.opened_at is not None:
+            self.opened_at = None
+            circuit_open.set(0, service=self.service)
+
+    def record_failure(self):
+        self.failures += 1
+        if self.probing or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+            circuit_open.set(1, service=self.service)
+        self.probing = False
+
+    def record_abandoned(self):
+        """A call ended without an outcome (cancelled, or failed in the client); an abandoned probe reopens the circuit."""
+        if self.probing:
+            self.record_failure()
+
+
+# Longest service URL first, so a URL maps to its most specific service
+_services = sorted(BACKEND_SERVICES.items(), key=lambda item: len(item[1]), reverse=True)
+_breakers = {}
+
+
+def service_for(url: str) -> str:
+    for name, base in _services:
+        if url.startswith(base):
+            return name
+    return httpx.URL(url).host
+
+
+def breaker_for(service: str) -> CircuitBreaker:
+    breaker = _breakers.get(service)
+    if breaker is None:
+        breaker = _breakers[service] = CircuitBreaker(service)
+    return breaker
+
+
+_budgets = {}  # service -> [asyncio.Semaphore, waiting]
+
+
+@asynccontextmanager
+async def _budget(url: str):
+    """Hold one of the service's BACKEND_MAX_CONCURRENCY slots for the block."""
+    service = service_for(url)
+    limit = BACKEND_MAX_CONCURRENCY.get(service)
+    if limit is None:
+        yield
+        return
+    budget = _budgets.get(service)
+    if budget is None:
+        budget = _budgets[service] = [asyncio.Semaphore(limit), 0]
+    semaphore = budget[0]
+    if semaphore.locked():
+        budget[1] += 1
+        backend_queue_depth.set(budget[1], service=service)
+        try:
+            await asyncio.wait_for(semaphore.acquire(), BACKEND_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            backend_requests.inc(service=service, outcome="shed")
+            raise ServiceUnavailable(
+                f"The {service} service is busy ({limit} requests in flight); try again in a few seconds."
+            ) from None
+        finally:
+            budget[1] -= 1
+            backend_queue_depth.set(budget[1], service=service)
+    else:
+        await semaphore.acquire()
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+def timeout_for(service: str) -> httpx.Timeout:
+    read = HTTP_READ_TIMEOUTS.get(service, HTTP_TIMEOUT)
+    return httpx.Timeout(read, connect=HTTP_CONNECT_TIMEOUT, pool=HTTP_CONNECT_TIMEOUT)
+
+
+def backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff before retry number `attempt` (1-based)."""
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** (attempt - 1)))
+
+
+async def _send(client: httpx.AsyncClient, request: httpx.Request, stream: bool) -> httpx.Response:
+    return await client.send(request, stream=stream)
+
+
+async def _send_hedged(service: str, client, request, stream: bool, delay: float) -> httpx.Response:
+    """Send `request`, and a duplicate if no response arrived within `delay`; the first success wins."""
+    tasks = [asyncio.create_task(_send(client, request, stream))]
+    winner, error = None, None
+    try:
+        done, pending = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            tasks.append(asyncio.create_task(_send(client, request, stream)))
+            pending = set(tasks)
+        while pending or done:
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                elif winner is None:
+                    winner = task
+            if winner is not None or not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # A loser that also completed still holds a connection
+        for task in tasks:
+            if task is not winner and not task.cancelled() and task.exception() is None:
+                await task.result().aclose()
+    if winner is None:
+        raise error
+    if len(tasks) > 1:
+        backend_hedges.inc(service=service, winner="hedge" if winner is tasks[1] else "primary")
+    return winner.result()
+
+
+async def _request(method: str, url: str, stream: bool = False, **kwargs) -> httpx.Response:
+    service = service_for(url)
+    target = httpx.URL(url)
+    attributes = {
+        "http.request.method": method, "server.address": target.host, "server.port": target.port,
+        "url.path": target.path, "backend.service": service,
+    }
+    start = time.perf_counter()
+    status = "error"
+    with span(f"{method} {service}", kind="client", **attributes) as current:
+        try:
+            response = await _request_with_retries(service, method, url, stream, **kwargs)
+            status = str(response.status_code)
+            # A streamed body is not read yet; its size is only known from the headers
+            size = response.headers.get("content-length") if stream else len(response.content)
+            current.set(**{"http.response.status_code": response.status_code, "http.response.body.size": int(size) if size else None})
+            if response.status_code >= 500:
+                current.error(f"HTTP {response.status_code}")
+            return response
+        finally:
+            backend_seconds.observe(time.perf_counter() - start, service=service, method=method, status=status)
+
+
+async def _request_with_retries(service: str, method: str, url: str, stream: bool, **kwargs) -> httpx.Response:
+    breaker = breaker_for(service)
+    client = get_client(url)
+    idempotent = method in IDEMPOTENT_METHODS
+    attempts = RETRY_ATTEMPTS if idempotent else 1
+    hedge_delay = HEDGE_DELAYS.get(service) if idempotent else None
+    kwargs.setdefault("timeout", timeout_for(service))
+    deadline = time.monotonic() + RETRY_DEADLINE
+
+    for attempt in range(1, attempts + 1):
+        if not breaker.allow():
+            backend_requests.inc(service=service, outcome="rejected")
+            raise ServiceUnavailable(
+                f"The {service} service is currently unavailable (circuit open after repeated failures); "
+                f"try again in about {math.ceil(breaker.retry_in())}s."
+            )
+        request = client.build_request(method, url, **kwargs)
+        current_span().set(**{"http.request.resend_count": attempt - 1})
+        pause = backoff(attempt)
+        try:
+            if hedge_delay is not None:
+                response = await _send_hedged(service, client, request, stream, hedge_delay)
+            else:
+                response = await _send(client, request, stream)
+        except httpx.TransportError as e:
+            breaker.record_failure()
+            if attempt == attempts or time.monotonic() + pause > deadline:
+                backend_requests.inc(service=service, outcome="error")
+                raise ServiceUnavailable(
+                    f"The {service} service did not respond ({type(e).__name__}) after {attempt} attempt(s)."
+                ) from e
+        except BaseException:
+            # Cancelled (TOOL_TIMEOUT, a client gone from a stream) or failed in the client: free a probe slot
+            breaker.record_abandoned()
+            raise
+        else:
+            if response.status_code < 500:
+                breaker.record_success()
+                backend_requests.inc(service=service, outcome="ok")
+                return response
+            breaker.record_failure()
+            if attempt == attempts or time.monotonic() + pause > deadline or response.status_code not in RETRY_STATUSES:
+                backend_requests.inc(service=service, outcome="error")
+                return response
+            await response.aclose()
+        backend_retries.inc(service=service)
+        await asyncio.sleep(pause)
+
+
+async def backend_get(url: str, **kwargs) -> httpx.Response:
+    async with _budget(url):
+        return await _request("GET", url, **kwargs)
+
+
+async def backend_post(url: str, **kwargs) -> httpx.Response:
+    """POSTs are never retried or hedged: the backend may have applied the first one."""
+    async with _budget(url):
+        return await _request("POST", url, **kwargs)
+
+
+@asynccontextmanager
+async def backend_stream(url: str, **kwargs):
+    """GET `url` with a streamed body; retries and hedging apply until the headers arrive."""
+    async with _budget(url):
+        response = await _request("GET", url, stream=True, **kwargs)
+        try:
+            yield response
+        finally:
+            await response.aclose()
+
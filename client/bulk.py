@@ -0,0 +1,111 @@
+# client/bulk.py
+"""
+Bulk lookups: one tool call for many ids instead of one call per id.
+
+Ids are parsed and deduplicated, answered from the response cache where
+possible, and the rest fetched in one request from the tool's batch endpoint
+(BULK_ENDPOINTS) when the service has one, otherwise concurrently with one
+pooled request per id. Per-id payloads are cached under the same key a
+single-id GET would use, so bulk calls warm each other.
+"""
+import asyncio
+import re
+
+import httpx
+
+from client.backend import backend_get
+from client.cache import ResponseCache, response_cache
+from client.shaping import RowPage
+from config.settings import BULK_ENDPOINTS, BULK_MAX_IDS, BULK_MAX_CONCURRENCY, CACHE_TTLS, CACHE_DEFAULT_TTL
+
+# Batch endpoints that answered 404/405/501; their tools fan out from then on
+_unsupported = set()
+
+
+def parse_ids(text) -> list:
+    """Distinct integer ids from input like "1,2,3" or "1, 2 and 3", in order of appearance."""
+    ids = list(dict.fromkeys(int(n) for n in re.findall(r"\d+", str(text))))
+    if not ids:
+        raise ValueError("no ids given")
+    if len(ids) > BULK_MAX_IDS:
+        raise ValueError(f"at most {BULK_MAX_IDS} ids per call, got {len(ids)}")
+    return ids
+
+
+async def _fetch_batch(url: str, ids: list):
+    """All ids in one request, or None if the endpoint is not available."""
+    response = await backend_get(url, params={"ids": ",".join(map(str, ids))})
+    if response.status_code in (404, 405, 501):
+        _unsupported.add(url)
+        return None
+    response.raise_for_status()
+    body = response.json()
+    return {id_: body.get(str(id_)) for id_ in ids}
+
+
+async def _fan_out(ids: list, item_url) -> dict:
+    semaphore = asyncio.Semaphore(BULK_MAX_CONCURRENCY)
+
+    async def fetch(id_):
+        async with semaphore:
+            try:
+                response = await backend_get(item_url(id_))
+                if response.status_code == 404:
+                    return None
+                response.raise_for_status()
+                return response.json()
+            except httpx.HTTPError as e:
+                return e
+
+    return dict(zip(ids, await asyncio.gather(*(fetch(id_) for id_ in ids))))
+
+
+async def fetch_many(tool_name: str, ids: list, item_url, tags=()) -> dict:
+    """
+    Payload per id: the decoded JSON, None when the service has no such id,
+    or the httpx error raised for it. Raises only when every id failed.
+    """
+    results, missing = {}, []
+    for id_ in ids:
+        cached = response_cache.get(ResponseCache.make_key(item_url(id_)))
+        if cached is not None:
+            results[id_] = cached
+        else:
+            missing.append(id_)
+
+    if missing:
+        fetched = None
+        batch_url = BULK_ENDPOINTS.get(tool_name)
+        if batch_url and batch_url not in _unsupported:
+            fetched = await _fetch_batch(batch_url, missing)
+        if fetched is None:
+            fetched = await _fan_out(missing, item_url)
+        ttl = CACHE_TTLS.get(tool_name, CACHE_DEFAULT_TTL)
+        for id_, payload in fetched.items():
+            results[id_] = payload
+            if payload is not None and not isinstance(payload, Exception):
+                response_cache.set(ResponseCache.make_key(item_url(id_)), payload, ttl, tags)
+
+    errors = [payload for payload in results.values() if isinstance(payload, Exception)]
+    if len(errors) == len(ids):
+        raise errors[0]
+    return results
+
+
+def outcome(payload, render):
+    """Cell value for one id: `render(payload)`, or why there is none."""
+    if payload is None:
+        return "not found"
+    if isinstance(payload, Exception):
+        return f"error: {payload}"
+    return render(payload)
+
+
+def bulk_table(tool_name: str, title: str, fields: dict, rows: list, ids: list, arg_name: str) -> str:
+    """Render one row per id; ids that do not fit the token budget are listed for the next call."""
+    page = RowPage(tool_name, fields)
+    for row in rows:
+        if not page.add(row):
+            break
+    rest = ",".join(map(str, ids[page.rows:]))
+    return page.render(title, total=len(ids), next_args=f"{arg_name}=\"{rest}\"" if rest else None)
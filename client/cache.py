@@ -0,0 +1,80 @@
+# client/cache.py
+import time
+from collections import OrderedDict
+
+from client.backend import backend_get
+from config.settings import CACHE_MAX_ENTRIES, CACHE_TTLS, CACHE_DEFAULT_TTL
+
+
+class ResponseCache:
+    """
+    Bounded LRU of backend responses with per-entry TTLs.
+
+    Each entry carries domain tags ("student", "course", ...) so that write
+    tools can evict every read that may have been affected by them.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, tags, value)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(endpoint: str, params: dict = None) -> tuple:
+        """Endpoint plus arguments normalized to a sorted tuple of strings."""
+        normalized = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+        return (endpoint.rstrip("/"), normalized)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def set(self, key, value, ttl: float, tags=()):
+        self._entries[key] = (time.monotonic() + ttl, frozenset(tags), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry carrying any of `tags`; returns how many were dropped."""
+        stale = [key for key, (_, entry_tags, _) in self._entries.items() if entry_tags.intersection(tags)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+response_cache = ResponseCache()
+
+
+async def cached_get_json(tool_name: str, url: str, params: dict = None, tags=()):
+    """GET `url` as JSON through the shared cache, using `tool_name`'s TTL."""
+    key = ResponseCache.make_key(url, params)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached
+    response = await backend_get(url, params=params)
+    response.raise_for_status()
+    data = response.json()
+    response_cache.set(key, data, CACHE_TTLS.get(tool_name, CACHE_DEFAULT_TTL), tags)
+    return data
@@ -0,0 +1,228 @@
+# client/enrollment_index.py
+"""
+Local read model of the enrollment graph for the set-query tools.
+
+Loaded by streaming COURSE_SERVICE/with-students, COURSE_SERVICE/with-professors
+and STUDENT_SERVICE/students-with-no-courses (together, the whole roster), it
+keeps, with students numbered in id order:
+
+- the students of each course as a sorted array of student positions
+  (4 bytes per enrollment, courses being small next to the roster),
+- the courses of each student and of each professor as course positions,
+- the students in no course, and in a course with someone else, computed
+  once per load or write rather than per query.
+
+Tools check `await enrollment_index.ready()` and fall back to their backend
+query when it is False (index disabled, or a reload failed). An index older
+than ENROLLMENT_INDEX_MAX_STALENESS is reloaded before it answers; after a
+failed reload, none is attempted for as long, so the tools do not each pay
+for three failing streams.
+Enrollments made through the tools are applied in place; other writes mark
+it stale.
+"""
+import asyncio
+import bisect
+import logging
+import re
+import time
+from array import array
+from contextlib import aclosing
+
+import httpx
+
+from client.backend import backend_stream
+from client.streaming import ACCEPT, iter_items
+from config.settings import COURSE_SERVICE, STUDENT_SERVICE, ENROLLMENT_INDEX_ENABLED, ENROLLMENT_INDEX_MAX_STALENESS
+from telemetry.metrics import counter, gauge, histogram
+
+logger = logging.getLogger(__name__)
+
+index_queries = counter("enrollment_index_queries_total", "Set-query tool calls by where they were answered (index/backend)")
+refresh_seconds = histogram("enrollment_index_refresh_seconds", "Time to reload the enrollment index, by outcome")
+index_size = gauge("enrollment_index_size", "Students, courses and enrollments in the enrollment index")
+
+
+def _ids(text) -> list:
+    return [int(n) for n in re.findall(r"\d+", str(text))]
+
+
+class EnrollmentIndex:
+    def __init__(self, enabled: bool = ENROLLMENT_INDEX_ENABLED, max_staleness: float = ENROLLMENT_INDEX_MAX_STALENESS):
+        self.enabled = enabled
+        self.max_staleness = max_staleness
+        self.loaded_at = None
+        self.failed_at = None
+        self._lock = asyncio.Lock()
+        self.load({}, {}, {})
+        self.loaded_at = None
+
+    def load(self, enrolled: dict, names: dict, professors: dict):
+        """
+        Replace the index. `enrolled`: course id -> student ids, `names`:
+        student id -> name (the whole roster, enrolled or not), `professors`: course id ->
+        (professor id, name) or None.
+        """
+        student_ids = sorted(names)
+        student_pos = {student_id: i for i, student_id in enumerate(student_ids)}
+        course_ids = sorted(enrolled.keys() | professors.keys())
+        course_pos = {course_id: i for i, course_id in enumerate(course_ids)}
+
+        student_courses = [[] for _ in student_ids]
+        course_students = []
+        for course_id in course_ids:
+            members = array("I", sorted({student_pos[s] for s in enrolled.get(course_id, ()) if s in student_pos}))
+            for position in members:
+                student_courses[position].append(course_pos[course_id])
+            course_students.append(members)
+        professor_courses, professor_names = {}, {}
+        for course_id, professor in professors.items():
+            if professor is not None:
+                professor_courses.setdefault(professor[0], []).append(course_pos[course_id])
+                professor_names[professor[0]] = professor[1]
+
+        self.student_ids = student_ids
+        self.student_names = [names[student_id] for student_id in student_ids]
+        self._student_pos = student_pos
+        self._course_pos = course_pos
+        self.course_students = course_students
+        self.student_courses = [tuple(courses) for courses in student_courses]
+        self.professor_courses = professor_courses
+        self.professor_names = professor_names
+        self._derive()
+        self.loaded_at = time.monotonic()
+        index_size.set(len(student_ids), kind="students")
+        index_size.set(len(course_ids), kind="courses")
+        index_size.set(sum(map(len, student_courses)), kind="enrollments")
+
+    async def refresh(self):
+        enrolled, names, professors = {}, {}, {}
+
+        def add_course(course):
+            members = enrolled[int(course["id"])] = []
+            for student in course.get("students") or ():
+                names.setdefault(int(student["id"]), student.get("name", str(student["id"])))
+                members.append(int(student["id"]))
+
+        def add_professor(course):
+            professor = course.get("professor")
+            professors[int(course["id"])] = (int(professor["id"]), professor.get("name")) if professor else None
+
+        def add_unenrolled(student):
+            names[int(student["id"])] = student.get("name", str(student["id"]))
+
+        async def collect(url: str, add):
+            async with backend_stream(url, headers=ACCEPT) as response:
+                response.raise_for_status()
+                async with aclosing(iter_items(response)) as items:
+                    async for item in items:
+                        add(item)
+
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            await asyncio.gather(
+                collect(f"{COURSE_SERVICE}/with-students", add_course),
+                collect(f"{COURSE_SERVICE}/with-professors", add_professor),
+                collect(f"{STUDENT_SERVICE}/students-with-no-courses", add_unenrolled),
+            )
+            self.load(enrolled, names, professors)
+            outcome = "ok"
+        finally:
+            refresh_seconds.observe(time.perf_counter() - start, outcome=outcome)
+
+    def fresh(self) -> bool:
+        return self.loaded_at is not None and time.monotonic() - self.loaded_at < self.max_staleness
+
+    def backing_off(self) -> bool:
+        """True within the staleness bound of a failed reload."""
+        return self.failed_at is not None and time.monotonic() - self.failed_at < self.max_staleness
+
+    async def ready(self) -> bool:
+        """True when the index may answer: enabled and loaded within the staleness bound."""
+        if not self.enabled:
+            return False
+        if not self.fresh():
+            async with self._lock:
+                if not self.fresh():
+                    if self.backing_off():
+                        index_queries.inc(result="backend")
+                        return False
+                    try:
+                        await self.refresh()
+                        self.failed_at = None
+                    except (httpx.HTTPError, ValueError, KeyError, TypeError) as e:
+                        self.failed_at = time.monotonic()
+                        logger.warning("Enrollment index reload failed, using the backend for %.0f s: %s", self.max_staleness, e)
+                        index_queries.inc(result="backend")
+                        return False
+        index_queries.inc(result="index")
+        return True
+
+    def invalidate(self):
+        self.loaded_at = None
+
+    def _derive(self):
+        self._without = [p for p, courses in enumerate(self.student_courses) if not courses]
+        self._sharing = sorted(set().union(*(members for members in self.course_students if len(members) > 1)))
+
+    def record_enrollment(self, student_id: int, course_id: int):
+        """Apply an enrollment made through the tools, or mark the index stale if it cannot."""
+        student = self._student_pos.get(int(student_id))
+        course = self._course_pos.get(int(course_id))
+        if not self.fresh() or student is None or course is None:
+            self.invalidate()
+            return
+        if course in self.student_courses[student]:
+            return
+        self.student_courses[student] += (course,)
+        members = self.course_students[course]
+        members.insert(bisect.bisect(members, student), student)
+        if len(self.student_courses[student]) == 1:
+            self._without.remove(student)
+        if len(members) > 1:
+            # A course reaching two students makes both share it; later ones only add the newcomer
+            for position in members if len(members) == 2 else (student,):
+                i = bisect.bisect_left(self._sharing, position)
+                if i == len(self._sharing) or self._sharing[i] != position:
+                    self._sharing.insert(i, position)
+
+    def _students(self, positions) -> list:
+        return [{"id": self.student_ids[p], "name": self.student_names[p]} for p in positions]
+
+    def students_in_any_course(self, course_ids) -> list:
+        courses = {self._course_pos.get(course_id) for course_id in _ids(course_ids)} - {None}
+        if len(courses) == 1:
+            return self._students(self.course_students[courses.pop()])
+        return self._students(sorted(set().union(*(self.course_students[c] for c in courses))))
+
+    def students_in_all_courses(self, course_ids) -> list:
+        courses = [self._course_pos.get(course_id) for course_id in _ids(course_ids)]
+        if not courses or None in courses:
+            return []
+        members = sorted((self.course_students[c] for c in courses), key=len)
+        return self._students(sorted(set(members[0]).intersection(*members[1:])))
+
+    def students_sharing_course(self, student_id) -> list:
+        """Students with at least one course in common with `student_id`, excluding them."""
+        ids = _ids(student_id)
+        student = self._student_pos.get(ids[0]) if ids else None
+        if student is None:
+            return []
+        shared = set().union(*(self.course_students[c] for c in self.student_courses[student]))
+        shared.discard(student)
+        return self._students(sorted(shared))
+
+    def students_with_common_courses(self) -> list:
+        return self._students(self._sharing)
+
+    def students_without_courses(self) -> list:
+        return self._students(self._without)
+
+    def professors_with_multiple_courses(self) -> list:
+        return [
+            {"id": professor_id, "name": self.professor_names[professor_id]}
+            for professor_id, courses in sorted(self.professor_courses.items()) if len(courses) > 1
+        ]
+
+
+enrollment_index = EnrollmentIndex()
@@ -0,0 +1,51 @@
+# client/http_pool.py
+from urllib.parse import urlsplit
+
+import httpx
+
+from config.settings import (
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_TIMEOUT,
+)
+
+# One pooled client per backend host (scheme://host:port), shared by all tools.
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_client(service_url: str) -> httpx.AsyncClient:
+    """Return the keep-alive client for the host serving `service_url`."""
+    origin = _origin(service_url)
+    client = _clients.get(origin)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            base_url=origin,
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+        _clients[origin] = client
+    return client
+
+
+def open_clients(*service_urls: str):
+    """Eagerly create the pools for the given services (called on startup)."""
+    for url in service_urls:
+        get_client(url)
+
+
+async def close_clients():
+    """Close every pooled client (called on shutdown)."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
@@ -1,36 +1,268 @@
 # client/multi_client.py
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+import anyio
+from langchain_core.tools import StructuredTool
+from pydantic import AnyUrl
+
+from config.settings import MCP_TRANSPORT, MCP_SERVERS, MCP_SCHEMA_CACHE, MCP_CONNECT_TIMEOUT, WRITE_TOOLS
+from telemetry.metrics import MCP_METRICS_URI
+from telemetry.tracing import traceparent
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Raised by the send itself on a closed session: the server never saw the request
+NOT_SENT_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError)
+
+
+def _source_digest() -> str:
+    """Digest of the tool and server sources, so editing a tool invalidates the cached schemas."""
+    digest = hashlib.sha256()
+    for path in sorted([*PROJECT_ROOT.glob("tools/*.py"), *PROJECT_ROOT.glob("mcp_servers/*.py")]):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class MCPServerConnection:
+    """
+    One persistent MCP session to one server.
+
+    The transport and ClientSession live in a dedicated task (anyio contexts
+    must be entered and exited by the same task); callers share the session
+    and a broken session is reopened. A call that fails on it is sent again
+    once, except a write tool whose request may already have reached the
+    server: that one is only re-sent when the send itself failed.
+    """
+
+    def __init__(self, name: str, config: dict, transport: str):
+        self.name = name
+        self.config = config
+        self.transport = transport
+        self._session = None
+        self._task = None
+        self._ready = None
+        self._closing = None
+        self._lock = asyncio.Lock()
+
+    def _open_transport(self):
+        if self.transport == "streamable_http":
+            from mcp.client.streamable_http import streamablehttp_client
+            return streamablehttp_client(self.config["url"])
+        from mcp.client.stdio import stdio_client, StdioServerParameters
+        return stdio_client(StdioServerParameters(
+            command=sys.executable,
+            args=["-m", self.config["module"]],
+            # Pass the full environment so backend URLs and settings propagate
+            env=dict(os.environ),
+            cwd=str(PROJECT_ROOT),
+        ))
+
+    async def _run(self):
+        from mcp import ClientSession
+        try:
+            async with self._open_transport() as streams:
+                async with ClientSession(streams[0], streams[1]) as session:
+                    await session.initialize()
+                    self._session = session
+                    self._ready.set()
+                    await self._closing.wait()
+        finally:
+            self._session = None
+            self._ready.set()
+
+    async def session(self):
+        async with self._lock:
+            if self._session is None or self._task is None or self._task.done():
+                self._ready, self._closing = asyncio.Event(), asyncio.Event()
+                self._task = asyncio.create_task(self._run(), name=f"mcp-{self.name}")
+                await asyncio.wait_for(self._ready.wait(), MCP_CONNECT_TIMEOUT)
+                if self._session is None:
+                    # The connection task failed; surface its exception
+                    await self._task
+                    raise ConnectionError(f"MCP server '{self.name}' closed during startup")
+            return self._session
+
+    async def list_tools(self) -> list:
+        session = await self.session()
+        result = await session.list_tools()
+        return [
+            {"name": t.name, "description": t.description or "", "inputSchema": t.inputSchema}
+            for t in result.tools
+        ]
+
+    async def call_tool(self, name: str, arguments: dict) -> str:
+        # The server continues the caller's trace from the request metadata
+        parent = traceparent()
+        meta = {"traceparent": parent} if parent else None
+        for attempt in range(2):
+            try:
+                session = await self.session()
+            except Exception:
+                if attempt:
+                    raise
+                logger.warning("MCP server '%s' did not start, reconnecting", self.name, exc_info=True)
+                await self.close()
+                continue
+            try:
+                result = await session.call_tool(name, arguments, meta=meta)
+                break
+            except Exception as e:
+                # Any other failure may come after the server ran the tool; only a read is safe to send again
+                if attempt or not (isinstance(e, NOT_SENT_ERRORS) or name not in WRITE_TOOLS):
+                    raise
+                logger.warning("MCP server '%s' call failed, reconnecting", self.name, exc_info=True)
+                await self.close()
+        text = "\n".join(c.text for c in result.content if getattr(c, "type", None) == "text")
+        return f"Error: {text}" if result.isError else text
+
+    async def metrics(self):
+        """The server process's metrics snapshot, or None while no session is open."""
+        if self._session is None:
+            return None
+        result = await self._session.read_resource(AnyUrl(MCP_METRICS_URI))
+        return json.loads(result.contents[0].text)
+
+    async def close(self):
+        if self._task is not None and not self._task.done():
+            self._closing.set()
+            try:
+                await self._task
+            except Exception:
+                logger.debug("MCP server '%s' closed with an error", self.name, exc_info=True)
+        self._task = None
+        self._session = None
+
 
 class MultiServerMCPClient:
-    def __init__(self):
+    def __init__(self, connections: dict = None, transport: str = MCP_TRANSPORT, cache_path: str = MCP_SCHEMA_CACHE):
         self.servers = {}
+        self.connections = connections or {}
+        self.transport = transport
+        self.cache_path = Path(cache_path)
+        self._clients = {}
+        self._all_tools = None
 
     def add_server(self, name: str, tools_list: list):
         """Attach a server by its tool list."""
         self.servers[name] = tools_list
+        self._all_tools = None
 
     def get_all_tools(self):
-        """Flatten and return all tools from all servers."""
-        all_tools = []
-        for tools in self.servers.values():
-            all_tools.extend(tools)
-        return all_tools
+        """All tools from all servers, flattened once per change of the server set."""
+        if self._all_tools is None:
+            self._all_tools = [t for tools in self.servers.values() for t in tools]
+        return self._all_tools
+
+    # -----------------------
+    # Remote discovery
+    # -----------------------
+    def _fingerprint(self, name: str) -> str:
+        config = json.dumps({"transport": self.transport, "sources": _source_digest(), **self.connections[name]}, sort_keys=True)
+        return hashlib.sha256(config.encode()).hexdigest()
+
+    def _load_schema_cache(self) -> dict:
+        try:
+            return json.loads(self.cache_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _make_tool(self, server: str, schema: dict) -> StructuredTool:
+        async def call(**kwargs):
+            return await self._clients[server].call_tool(schema["name"], kwargs)
+
+        return StructuredTool(
+            name=schema["name"],
+            description=schema["description"],
+            args_schema=schema["inputSchema"],
+            coroutine=call,
+        )
+
+    async def start(self, refresh: bool = False):
+        """
+        Register every configured server's tools.
+
+        Schemas come from the on-disk cache when it matches the server config;
+        the remaining servers are discovered concurrently. Sessions are kept
+        for the life of the process; `connect()` opens the others up front.
+        """
+        if self.transport == "local":
+            register_local_servers(self)
+            return
+
+        cache = {} if refresh else self._load_schema_cache()
+        for name, config in self.connections.items():
+            self._clients[name] = MCPServerConnection(name, config, self.transport)
+
+        stale = [n for n in self.connections if cache.get(n, {}).get("fingerprint") != self._fingerprint(n)]
+        if stale:
+            discovered = await asyncio.gather(*(self._clients[n].list_tools() for n in stale))
+            for name, schemas in zip(stale, discovered):
+                cache[name] = {"fingerprint": self._fingerprint(name), "tools": schemas}
+            try:
+                self.cache_path.write_text(json.dumps(cache, indent=2))
+            except OSError:
+                logger.warning("Could not write MCP schema cache to %s", self.cache_path)
+
+        for name in self.connections:
+            self.add_server(name, [self._make_tool(name, schema) for schema in cache[name]["tools"]])
+
+    async def connect(self):
+        """
+        Open every server's session concurrently, so spawning the stdio
+        processes is paid at startup rather than by the first requests. A
+        server that fails to start is logged and retried on first use.
+        """
+        names = list(self._clients)
+        results = await asyncio.gather(*(self._clients[n].session() for n in names), return_exceptions=True)
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                logger.warning("Could not open MCP server '%s' at startup: %s", name, result)
+
+    async def metrics(self, timeout: float = 2.0) -> dict:
+        """
+        {server: metrics snapshot} of the stdio server processes this client
+        spawned. Servers on streamable HTTP are scraped on their own /metrics,
+        and local tools already share this process's registry.
+        """
+        if self.transport != "stdio":
+            return {}
+        names = list(self._clients)
+        results = await asyncio.gather(
+            *(asyncio.wait_for(self._clients[n].metrics(), timeout) for n in names), return_exceptions=True
+        )
+        snapshots = {}
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                logger.warning("Could not read metrics of MCP server '%s': %s", name, result)
+            elif result is not None:
+                snapshots[name] = result
+        return snapshots
 
+    async def aclose(self):
+        await asyncio.gather(*(client.close() for client in self._clients.values()))
+        self._clients.clear()
 
-# -----------------------
-# Import actual tool lists from MCP servers
-# -----------------------
-from tools.student_tool import student_tools
-from tools.course import course_tools
-from tools.professor import professor_tools
-from tools.webflux_api_product import webflux_tools
-from tools.json_to_java import json_to_java_tools
 
-# Create multi-server client
-mcp_client = MultiServerMCPClient()
+def register_local_servers(client: MultiServerMCPClient):
+    """In-process mode: import the tool modules directly instead of talking MCP."""
+    from tools.student_tool import student_tools
+    from tools.course import course_tools
+    from tools.professor import professor_tools
+    from tools.webflux_api_product import webflux_tools
+    from tools.json_to_java import json_to_java_tools
 
-# Register servers with their tools
-mcp_client.add_server("student-course-professor", student_tools + course_tools + professor_tools)
-mcp_client.add_server("webflux", webflux_tools)
-mcp_client.add_server("json-to-java", json_to_java_tools)
+    client.add_server("student-course-professor", student_tools + course_tools + professor_tools)
+    client.add_server("webflux", webflux_tools)
+    client.add_server("json-to-java", json_to_java_tools)
 
 
+# Create multi-server client; servers are registered by `await mcp_client.start()`
+mcp_client = MultiServerMCPClient(MCP_SERVERS)
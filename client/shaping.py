@@ -0,0 +1,99 @@
+# client/shaping.py
+"""
+Compact tool outputs.
+
+Backend payloads are projected onto the fields a tool declares, rendered as a
+pipe-separated table, and cut to the tool's token budget. Rows that do not fit
+are reported with the `offset` to ask for next, so the model can page through
+large results instead of receiving the whole payload at once.
+"""
+from config.settings import RESULT_TOKEN_BUDGET, RESULT_TOKEN_BUDGETS, RESULT_CELL_ITEMS
+from client.tokens import count_text_tokens
+
+MORE_ROWS_HINT = "call again with"
+
+
+def _resolve(value, parts):
+    """Follow a dotted path; a `name[]` segment maps the rest of the path over a list."""
+    if not parts:
+        return value
+    head, rest = parts[0], parts[1:]
+    if head.endswith("[]"):
+        items = value.get(head[:-2]) if isinstance(value, dict) else None
+        return [_resolve(item, rest) for item in items or ()]
+    return _resolve(value.get(head) if isinstance(value, dict) else None, rest)
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        shown = [_cell(v) for v in value[:RESULT_CELL_ITEMS]]
+        if len(value) > RESULT_CELL_ITEMS:
+            shown.append(f"+{len(value) - RESULT_CELL_ITEMS} more")
+        return "; ".join(shown)
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+def project(record, fields: dict) -> list:
+    """Cells of `record` for each declared field ({header: dotted path})."""
+    return [_cell(_resolve(record, path.split("."))) for path in fields.values()]
+
+
+class RowPage:
+    """One page of projected rows, filled until the tool's token budget is spent."""
+
+    def __init__(self, tool_name: str, fields: dict, offset: int = 0):
+        self.fields = fields
+        self.offset = max(offset, 0)
+        self.budget = RESULT_TOKEN_BUDGETS.get(tool_name, RESULT_TOKEN_BUDGET)
+        self.lines = [" | ".join(fields)]
+        self.used = count_text_tokens(self.lines[0])
+        self.rows = 0
+
+    def add(self, record) -> bool:
+        """Append a row; returns False, without adding it, once the budget is spent."""
+        line = " | ".join(project(record, self.fields))
+        cost = count_text_tokens(line) + 1
+        # Always show at least one row so paging makes progress
+        if self.used + cost > self.budget and self.rows:
+            return False
+        self.lines.append(line)
+        self.used += cost
+        self.rows += 1
+        return True
+
+    def render(self, title: str, total: int = None, more: bool = False, next_args: str = None) -> str:
+        """
+        `total` when the row count is known, otherwise `more` says whether rows
+        follow. `next_args` replaces "offset=K" in the hint for the next call.
+        """
+        offset, end = self.offset, self.offset + self.rows
+        if not self.rows:
+            if total:
+                return f"{title}: no results at offset {offset} ({total} total)."
+            return f"{title}: no results" + (f" at offset {offset}." if offset else ".")
+        if total is not None:
+            header = f"{title} ({total} total" + (f", from row {offset + 1}):" if offset else "):")
+            more = end < total
+        else:
+            header = f"{title}" + (f" (from row {offset + 1}):" if offset else ":")
+        lines = [header] + self.lines
+        if more:
+            omitted = f"{total - end} more" if total is not None else "More rows"
+            lines.append(f"... {omitted} omitted (rows {offset + 1}-{end} shown; {MORE_ROWS_HINT} {next_args or f'offset={end}'}).")
+        return "\n".join(lines)
+
+
+def has_more_rows(text: str) -> bool:
+    """True when a tool output was cut and asks to be called again for the rest."""
+    last = text.rstrip().rpartition("\n")[2]
+    return last.startswith("... ") and MORE_ROWS_HINT in last
+
+
+def shape_record(title: str, record, fields: dict) -> str:
+    """Render one record as `header=value` pairs, skipping empty fields."""
+    pairs = [f"{name}={cell}" for name, cell in zip(fields, project(record, fields)) if cell]
+    return f"{title}: " + ", ".join(pairs)
@@ -0,0 +1,124 @@
+# client/streaming.py
+"""
+Incremental parsing of large backend collections.
+
+Collection endpoints are read as a stream: a JSON array is decoded one item
+at a time as bytes arrive, and NDJSON (`application/x-ndjson`, which the
+WebFlux service emits natively) one line at a time. Items are projected into
+a RowPage as they are parsed and the connection is dropped as soon as the
+page is full, so memory per request is bounded by one item plus one page of
+rows, whatever the size of the collection.
+"""
+import codecs
+import json
+import re
+from contextlib import aclosing
+
+from client.cache import ResponseCache, response_cache
+from client.backend import backend_stream
+from client.shaping import RowPage
+from config.settings import CACHE_TTLS, CACHE_DEFAULT_TTL, RESULT_PAGE_SIZE
+
+# WebFlux answers with NDJSON when asked; the other services ignore the header
+ACCEPT = {"Accept": "application/x-ndjson, application/json;q=0.9"}
+NDJSON_TYPES = ("application/x-ndjson", "application/stream+json", "application/jsonl")
+
+_decoder = json.JSONDecoder()
+_SEPARATOR = re.compile(r"[\s,]*")
+
+
+async def iter_json_array(chunks):
+    """Yield the items of a top-level JSON array from an async iterator of byte chunks.
+
+    A body that is not an array is yielded as a single item.
+    """
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer, pos = "", 0
+    in_array = None  # unknown until the first non-blank character
+    async for chunk in chunks:
+        buffer = buffer[pos:] + text.decode(chunk)
+        pos = 0
+        if in_array is None:
+            stripped = buffer.lstrip()
+            if not stripped:
+                continue
+            in_array = stripped[0] == "["
+            pos = len(buffer) - len(stripped) + in_array
+        if not in_array:
+            continue
+        while True:
+            pos = _SEPARATOR.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # item continues in the next chunk
+            if end == len(buffer) or isinstance(item, (int, float)) and buffer[end] in ".eE":
+                break  # a number or literal may continue in the next chunk ("1" of "1.5", "2" of "2e3")
+            yield item
+            pos = end
+
+    buffer = buffer[pos:] + text.decode(b"", final=True)
+    if in_array is None:
+        return
+    if not in_array:
+        yield json.loads(buffer)
+        return
+    # The stream ended without "]": only a last complete item may remain
+    pos = _SEPARATOR.match(buffer).end()
+    if pos < len(buffer):
+        item, end = _decoder.raw_decode(buffer, pos)
+        yield item
+        if _SEPARATOR.match(buffer, end).end() < len(buffer):
+            raise ValueError("Malformed JSON array in response body")
+
+
+async def iter_ndjson(response):
+    async for line in response.aiter_lines():
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_items(response):
+    """Items of a collection response, as NDJSON or a JSON array depending on its content type."""
+    content_type = response.headers.get("content-type", "")
+    if content_type.startswith(NDJSON_TYPES):
+        return iter_ndjson(response)
+    return iter_json_array(response.aiter_bytes())
+
+
+async def stream_rows(tool_name: str, url: str, title: str, fields: dict, offset: int = 0,
+                      limit: int = RESULT_PAGE_SIZE, params: dict = None, tags=None) -> str:
+    """
+    Stream the collection at `url` into one page of projected rows.
+
+    With `tags`, the rendered page is kept in the response cache under the
+    tool's TTL, keyed by URL, params and page.
+    """
+    key = None
+    if tags is not None:
+        key = ResponseCache.make_key(url, {**(params or {}), "__offset": offset, "__limit": limit})
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached
+
+    page = RowPage(tool_name, fields, offset)
+    stop = page.offset + max(limit, 1)
+    more = False
+    async with backend_stream(url, params=params, headers=ACCEPT) as response:
+        response.raise_for_status()
+        async with aclosing(iter_items(response)) as items:
+            index = 0
+            async for item in items:
+                if index >= page.offset and (index >= stop or not page.add(item)):
+                    more = True
+                    break
+                index += 1
+    text = page.render(title, more=more)
+
+    if key is not None:
+        response_cache.set(key, text, CACHE_TTLS.get(tool_name, CACHE_DEFAULT_TTL), tags)
+    return text
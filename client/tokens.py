@@ -0,0 +1,37 @@
+# client/tokens.py
+"""Token counting with the model's tokenizer, shared by tool output shaping and the prompt budget."""
+import logging
+from functools import lru_cache
+
+from config.settings import TOKENIZER_MODEL
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    import tiktoken
+    try:
+        return tiktoken.encoding_for_model(TOKENIZER_MODEL)
+    except Exception:
+        # No cached BPE file and no network: fall back to a ~4 chars/token estimate
+        logger.warning("tiktoken encoding for %s unavailable, estimating tokens", TOKENIZER_MODEL)
+        return None
+
+
+def count_text_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    encoding = _encoding()
+    if encoding is None:
+        limit = max_tokens * 4
+        return text if len(text) <= limit else text[:limit] + " ...[truncated]"
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens]) + " ...[truncated]"
@@ -1,5 +1,286 @@
-STUDENT_SERVICE = "http://localhost:8081/students"
-PROFESSOR_SERVICE = "http://localhost:8082/professors"
-COURSE_SERVICE = "http://localhost:8083/courses"
-WEBFLUX_SERVICE = "http://localhost:8082/api/products"
-JSONTOJAVA_SERVICE = "http://localhost:8083/api/movies"
\ No newline at end of file
+import os
+
+STUDENT_SERVICE = os.getenv("STUDENT_SERVICE", "http://localhost:8081/students")
+PROFESSOR_SERVICE = os.getenv("PROFESSOR_SERVICE", "http://localhost:8082/professors")
+COURSE_SERVICE = os.getenv("COURSE_SERVICE", "http://localhost:8083/courses")
+WEBFLUX_SERVICE = os.getenv("WEBFLUX_SERVICE", "http://localhost:8082/api/products")
+JSONTOJAVA_SERVICE = os.getenv("JSONTOJAVA_SERVICE", "http://localhost:8083/api/movies")
+
+# -----------------------
+# Pooled HTTP clients (one per backend host)
+# -----------------------
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+
+# -----------------------
+# Backend resilience (per service)
+# -----------------------
+BACKEND_SERVICES = {
+    "student": STUDENT_SERVICE,
+    "professor": PROFESSOR_SERVICE,
+    "course": COURSE_SERVICE,
+    "webflux": WEBFLUX_SERVICE,
+    "jsontojava": JSONTOJAVA_SERVICE,
+}
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "2"))
+# Read timeout per service in seconds (HTTP_TIMEOUT otherwise)
+HTTP_READ_TIMEOUTS = {
+    "student": 5,
+    "professor": 5,
+    "course": 5,
+    "webflux": 10,
+    "jsontojava": 10,
+}
+# GETs only: total attempts, and the full-jitter exponential backoff between them
+RETRY_ATTEMPTS = int(os.getenv("RETRY_ATTEMPTS", "3"))
+# No retry starts once a call has taken this long (kept below TOOL_TIMEOUT)
+RETRY_DEADLINE = float(os.getenv("RETRY_DEADLINE", "20"))
+RETRY_BACKOFF_BASE = float(os.getenv("RETRY_BACKOFF_BASE", "0.1"))
+RETRY_BACKOFF_MAX = float(os.getenv("RETRY_BACKOFF_MAX", "2"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+# Seconds before a slow GET to the service is hedged with a second request, e.g. {"jsontojava": 0.5}
+HEDGE_DELAYS = {}
+# Concurrent requests per service and worker; more wait up to BACKEND_QUEUE_TIMEOUT,
+# then fail fast as busy instead of piling onto an overloaded service
+BACKEND_MAX_CONCURRENCY = {
+    "student": 32,
+    "professor": 32,
+    "course": 32,
+    "webflux": 32,
+    "jsontojava": 32,
+}
+BACKEND_QUEUE_TIMEOUT = float(os.getenv("BACKEND_QUEUE_TIMEOUT", "2"))
+
+# -----------------------
+# Admission control (per worker)
+# -----------------------
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+# Agent runs at once; /chat/batch holds one slot per item it runs concurrently
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "32"))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "64"))
+# Longest a run waits for a slot; runs expected to wait longer are shed at once
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+# Token buckets: requests per second and burst, per session_id and per X-API-Key (0 = no limit).
+# Off by default: a chat session sending quick follow-ups, or a keyed /chat/batch (one token per
+# item), must not get 429s from a stock deployment. Only the capacity limits above apply then
+ADMISSION_SESSION_RATE = float(os.getenv("ADMISSION_SESSION_RATE", "0"))
+ADMISSION_SESSION_BURST = float(os.getenv("ADMISSION_SESSION_BURST", "5"))
+ADMISSION_KEY_RATE = float(os.getenv("ADMISSION_KEY_RATE", "0"))
+ADMISSION_KEY_BURST = float(os.getenv("ADMISSION_KEY_BURST", "40"))
+
+# -----------------------
+# Chat model
+# -----------------------
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+# Import the model client with main instead of at startup; set when the
+# server forks workers from a preloaded app (gunicorn --preload)
+PRELOAD_MODULES = os.getenv("PRELOAD_MODULES", "false").lower() == "true"
+
+# -----------------------
+# Model response cache (record/replay)
+# -----------------------
+# passthrough: off; record: serve recorded responses, record new ones;
+# replay: serve recorded responses only, fail on anything else (offline runs)
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "passthrough")
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "llm_cache.db")
+# Least recently used responses are evicted past this many bytes
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# -----------------------
+# Agent tool execution
+# -----------------------
+TOOL_MAX_CONCURRENCY = int(os.getenv("TOOL_MAX_CONCURRENCY", "8"))
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "30"))
+
+# -----------------------
+# Read-only tool response cache (TTL in seconds)
+# -----------------------
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "512"))
+CACHE_DEFAULT_TTL = float(os.getenv("CACHE_DEFAULT_TTL", "60"))
+CACHE_TTLS = {
+    "get_all_courses_with_students": 60,
+    "get_courses_with_professors": 120,
+    "get_professors_with_multiple_courses": 120,
+    "get_students_with_common_courses": 60,
+    "get_all_movies": 600,
+    "get_titles": 600,
+    "get_all_products": 300,
+    "get_professors_for_courses": 120,
+    "get_movies_by_track_ids": 600,
+}
+
+# -----------------------
+# Tool output shaping
+# -----------------------
+# Token budget for one list-style tool result; rows beyond it are paged with `offset`
+RESULT_TOKEN_BUDGET = int(os.getenv("RESULT_TOKEN_BUDGET", "600"))
+RESULT_TOKEN_BUDGETS = {
+    "get_all_courses_with_students": 800,
+}
+RESULT_PAGE_SIZE = int(os.getenv("RESULT_PAGE_SIZE", "25"))
+# Items shown per nested list cell (e.g. the students of one course)
+RESULT_CELL_ITEMS = int(os.getenv("RESULT_CELL_ITEMS", "10"))
+
+# -----------------------
+# Bulk lookup tools (many ids in one tool call)
+# -----------------------
+BULK_MAX_IDS = int(os.getenv("BULK_MAX_IDS", "100"))
+# Per-id requests in flight for one bulk call when there is no batch endpoint
+BULK_MAX_CONCURRENCY = int(os.getenv("BULK_MAX_CONCURRENCY", "10"))
+# Batch endpoint per bulk tool: GET <url>?ids=1,2,3 answering {"<id>": <per-id payload>},
+# e.g. {"get_courses_for_students": f"{STUDENT_SERVICE}/courses/by-ids"}
+BULK_ENDPOINTS = {}
+
+# -----------------------
+# Enrollment index (local read model of students, courses and professors)
+# -----------------------
+# Answer the set-query tools (students by courses, in all courses, sharing a
+# course, without courses, ...) in-process from COURSE_SERVICE/with-students,
+# /with-professors and STUDENT_SERVICE/students-with-no-courses instead of per-call queries
+ENROLLMENT_INDEX_ENABLED = os.getenv("ENROLLMENT_INDEX_ENABLED", "false").lower() == "true"
+# An older index is reloaded before it answers; writes of other workers show up within this bound.
+# After a failed reload, the backend answers for this long before the next attempt
+ENROLLMENT_INDEX_MAX_STALENESS = float(os.getenv("ENROLLMENT_INDEX_MAX_STALENESS", "60"))
+
+# -----------------------
+# Session checkpoints
+# -----------------------
+# "sqlite": CHECKPOINT_DB (WAL), shared by the workers of one host.
+# "redis": CHECKPOINT_URL, shared by workers on any number of hosts.
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "sqlite").lower()
+CHECKPOINT_URL = os.getenv("CHECKPOINT_URL", "redis://localhost:6379/0")
+CHECKPOINT_KEY_PREFIX = os.getenv("CHECKPOINT_KEY_PREFIX", "chat:")
+CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", "chat_memory.db")
+CHECKPOINT_HOT_SESSIONS = int(os.getenv("CHECKPOINT_HOT_SESSIONS", "1024"))
+# true when the load balancer pins each session_id to one worker: cached
+# sessions are then served without checking the store for newer turns
+CHECKPOINT_AFFINITY = os.getenv("CHECKPOINT_AFFINITY", "false").lower() == "true"
+CHECKPOINT_RETENTION_SECONDS = float(os.getenv("CHECKPOINT_RETENTION_SECONDS", str(7 * 24 * 3600)))
+CHECKPOINT_PRUNE_INTERVAL = float(os.getenv("CHECKPOINT_PRUNE_INTERVAL", "600"))
+
+# -----------------------
+# Conversation history budget (tokens)
+# -----------------------
+TOKENIZER_MODEL = os.getenv("TOKENIZER_MODEL", "gpt-4o-mini")
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "6000"))
+HISTORY_KEEP_TURNS = int(os.getenv("HISTORY_KEEP_TURNS", "4"))
+HISTORY_SUMMARY_TRIGGER = int(os.getenv("HISTORY_SUMMARY_TRIGGER", "1500"))
+HISTORY_TOOL_OUTPUT_TOKENS = int(os.getenv("HISTORY_TOOL_OUTPUT_TOKENS", "500"))
+
+# -----------------------
+# Tool routing (tools bound to the model per turn)
+# -----------------------
+ROUTER_ENABLED = os.getenv("ROUTER_ENABLED", "true").lower() == "true"
+ROUTER_TOP_N = int(os.getenv("ROUTER_TOP_N", "6"))
+ROUTER_MIN_SCORE = float(os.getenv("ROUTER_MIN_SCORE", "0.15"))
+ROUTER_GROUP_RATIO = float(os.getenv("ROUTER_GROUP_RATIO", "0.6"))
+
+# -----------------------
+# MCP tool servers
+# -----------------------
+# "stdio" spawns each server as a subprocess, "streamable_http" connects to
+# already running servers, "local" imports the tool modules in-process.
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "stdio")
+MCP_SERVERS = {
+    "student-course-professor": {
+        "module": "mcp_servers.student_course_professor_server",
+        "url": os.getenv("MCP_STUDENT_COURSE_PROFESSOR_URL", "http://localhost:9001/mcp"),
+    },
+    "webflux": {
+        "module": "mcp_servers.webflux_server",
+        "url": os.getenv("MCP_WEBFLUX_URL", "http://localhost:9002/mcp"),
+    },
+    "json-to-java": {
+        "module": "mcp_servers.json_to_java_server",
+        "url": os.getenv("MCP_JSON_TO_JAVA_URL", "http://localhost:9003/mcp"),
+    },
+}
+MCP_SCHEMA_CACHE = os.getenv("MCP_SCHEMA_CACHE", ".mcp_tool_cache.json")
+MCP_CONNECT_TIMEOUT = float(os.getenv("MCP_CONNECT_TIMEOUT", "30"))
+
+# -----------------------
+# Tool registry
+# -----------------------
+# Tool name -> MCP server whose tool wins when several servers expose that
+# name, e.g. {"get_courses_by_student_id": "student-course-professor"};
+# any other duplicate name fails startup
+TOOL_SHADOWS = {}
+# Distinct tool subsets kept bound to the model
+TOOL_BINDING_CACHE_SIZE = int(os.getenv("TOOL_BINDING_CACHE_SIZE", "128"))
+
+# -----------------------
+# /chat/batch
+# -----------------------
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+
+# -----------------------
+# Concurrent turns on one session
+# -----------------------
+# Identical queries in flight on the same session share one agent run
+SESSION_COALESCE = os.getenv("SESSION_COALESCE", "false").lower() == "true"
+
+# -----------------------
+# Write tools and the data domains they change
+# -----------------------
+WRITE_TOOLS = {
+    "create_student": ("student", "course"),
+    "enroll_student_in_course": ("student", "course"),
+    "create_course": ("course", "professor"),
+    "create_professor": ("professor",),
+}
+
+# -----------------------
+# Answer cache (skips the agent for repeated read-only questions)
+# -----------------------
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "300"))
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.7"))
+
+# -----------------------
+# Fast path
+# -----------------------
+# Answer simple single-tool lookups without calling the model
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "true").lower() == "true"
+
+# -----------------------
+# Direct return (skips the model's final answer)
+# -----------------------
+# A turn whose first step is one successful call to one of these tools, with
+# every argument taken from the query, every number of the query used, and no
+# data asked about beyond the tool's, returns the tool output as the answer;
+# tools declared `return_direct=True` always do
+DIRECT_RETURN_ENABLED = os.getenv("DIRECT_RETURN_ENABLED", "true").lower() == "true"
+DIRECT_RETURN_TOOLS = {
+    "get_courses_by_student_id",
+    "get_courses_for_students",
+    "get_students_with_common_courses",
+    "get_course_from_common_courses_grouped",
+    "get_students_shares_atleast_one_course",
+    "get_students_with_no_courses",
+    "get_students_with_no_course_and_professor",
+    "get_students_by_courses",
+    "get_students_in_all_courses",
+    "get_professor_for_course",
+    "get_professors_for_courses",
+    "get_professors_with_multiple_courses",
+    "get_students_by_professor",
+    "get_products_by_name",
+    "get_movie_by_track_id",
+    "get_movies_by_track_ids",
+}
+
+# -----------------------
+# Tracing and logging
+# -----------------------
+SERVICE_NAME = os.getenv("SERVICE_NAME", "multiserver-chatbot")
+# "none", "console" (stderr), "file" (TRACE_FILE, OTLP/JSON lines) or "otel" (opentelemetry API)
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none")
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+# Fraction of requests whose spans are exported and whose DEBUG logs are emitted
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
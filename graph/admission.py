@@ -0,0 +1,231 @@
+# graph/admission.py
+"""
+Admission control for the chat endpoints.
+
+- Rate limits: a token bucket per session_id and one per API key
+  (`X-API-Key`). A request over either limit is rejected with 429 and a
+  Retry-After of the time until the bucket has a token again. A batch costs
+  one token per item, and a batch larger than the key's burst is rejected
+  outright, with a Retry-After of a full refill.
+- Capacity: at most `max_in_flight` agent runs at once. Further runs wait in
+  a queue of at most `queue_size`, served round-robin across sessions so one
+  busy session cannot starve the others. A run is shed with 503 and a
+  Retry-After, instead of timing out later, when the queue is full, when its
+  expected wait (queue ahead of it x average run time) exceeds
+  `queue_timeout`, or when it has waited `queue_timeout` without a slot.
+"""
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+
+from config.settings import (
+    ADMISSION_MAX_IN_FLIGHT,
+    ADMISSION_QUEUE_SIZE,
+    ADMISSION_QUEUE_TIMEOUT,
+    ADMISSION_SESSION_RATE,
+    ADMISSION_SESSION_BURST,
+    ADMISSION_KEY_RATE,
+    ADMISSION_KEY_BURST,
+)
+from telemetry.metrics import counter, gauge, histogram
+
+in_flight_gauge = gauge("chat_admission_in_flight", "Agent runs holding an admission slot")
+queue_depth = gauge("chat_admission_queue_depth", "Agent runs waiting for an admission slot")
+shed_total = counter("chat_admission_shed_total", "Requests rejected by admission control, by reason")
+wait_seconds = histogram("chat_admission_wait_seconds", "Time agent runs waited for an admission slot")
+
+
+class Rejected(Exception):
+    """Turned into a 429/503 response with a Retry-After header."""
+
+    def __init__(self, status: int, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, cost: float = 1) -> float:
+        """Take `cost` tokens; returns 0, or the seconds until they are available (nothing taken)."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """A token bucket per key; the least recently used are dropped past `max_keys` (they refill anyway)."""
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 100_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+
+    def take(self, key: str, cost: float = 1) -> float:
+        if self.rate <= 0:
+            return 0.0
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.take(cost)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_in_flight: int = ADMISSION_MAX_IN_FLIGHT,
+        queue_size: int = ADMISSION_QUEUE_SIZE,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+        session_rate: float = ADMISSION_SESSION_RATE,
+        session_burst: float = ADMISSION_SESSION_BURST,
+        key_rate: float = ADMISSION_KEY_RATE,
+        key_burst: float = ADMISSION_KEY_BURST,
+    ):
+        self.max_in_flight = max_in_flight
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.sessions = RateLimiter(session_rate, session_burst)
+        self.keys = RateLimiter(key_rate, key_burst)
+        self.in_flight = 0
+        self.queued = 0
+        self._waiters = OrderedDict()  # session_id -> deque of [future, weight], in round-robin order
+        self._run_seconds = None  # moving average of how long a slot is held
+
+    def check_rate(self, session_id: str = None, api_key: str = None, cost: int = 1):
+        """Raise Rejected(429) when the session or the API key is over its rate limit."""
+        wait = self.sessions.take(session_id, cost) if session_id is not None else 0.0
+        if wait:
+            shed_total.inc(reason="session_rate")
+            raise Rejected(429, f"Too many requests for session {session_id!r}", wait)
+        if api_key:
+            if self.keys.rate > 0 and cost > self.keys.burst:
+                # The bucket never holds that many tokens: waiting would not help
+                shed_total.inc(reason="key_burst")
+                raise Rejected(
+                    429, f"A batch of {cost} items is over this API key's burst of {self.keys.burst:g}; split it",
+                    self.keys.burst / self.keys.rate,
+                )
+            wait = self.keys.take(api_key, cost)
+            if wait:
+                shed_total.inc(reason="key_rate")
+                raise Rejected(429, "Too many requests for this API key", wait)
+
+    def expected_wait(self, weight: int = 1) -> float:
+        if self._run_seconds is None:
+            return 0.0
+        return (self.queued + weight) * self._run_seconds / self.max_in_flight
+
+    async def acquire(self, session_id: str, weight: int = 1):
+        """Wait for `weight` slots; returns an idempotent release function, or raises Rejected(503)."""
+        weight = max(1, min(weight, self.max_in_flight))
+        start = time.monotonic()
+        if self.in_flight + weight <= self.max_in_flight and not self._waiters:
+            return self._grant(weight, start)
+
+        if self.queued + weight > self.queue_size:
+            shed_total.inc(reason="queue_full")
+            raise Rejected(503, "Server busy: admission queue is full", self.expected_wait(weight) or self.queue_timeout)
+        expected = self.expected_wait(weight)
+        if expected > self.queue_timeout:
+            shed_total.inc(reason="expected_wait")
+            raise Rejected(503, f"Server busy: expected wait {expected:.1f}s exceeds {self.queue_timeout}s", expected)
+
+        entry = [asyncio.get_running_loop().create_future(), weight]
+        self._waiters.setdefault(session_id, deque()).append(entry)
+        self.queued += weight
+        queue_depth.set(self.queued)
+        try:
+            await asyncio.wait_for(asyncio.shield(entry[0]), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if entry[0].done():
+                # Granted just as the wait ended: hand the slot back
+                self._release(weight, None)
+            else:
+                entry[0].cancel()
+                self._dequeue(session_id, entry)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            shed_total.inc(reason="queue_timeout")
+            raise Rejected(503, f"Server busy: no slot within {self.queue_timeout}s", self.expected_wait(weight) or self.queue_timeout)
+        return self._make_release(weight, start)
+
+    @asynccontextmanager
+    async def slot(self, session_id: str, weight: int = 1):
+        release = await self.acquire(session_id, weight)
+        try:
+            yield
+        finally:
+            release()
+
+    def _grant(self, weight: int, start: float):
+        self.in_flight += weight
+        in_flight_gauge.set(self.in_flight)
+        return self._make_release(weight, start)
+
+    def _make_release(self, weight: int, start: float):
+        wait_seconds.observe(time.monotonic() - start)
+        held_since = time.monotonic()
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self._release(weight, time.monotonic() - held_since)
+
+        return release
+
+    def _dequeue(self, session_id: str, entry: list):
+        waiters = self._waiters.get(session_id)
+        if waiters is not None and entry in waiters:
+            waiters.remove(entry)
+            self.queued -= entry[1]
+            if not waiters:
+                del self._waiters[session_id]
+            queue_depth.set(self.queued)
+        self._wake()
+
+    def _release(self, weight: int, held: float):
+        self.in_flight -= weight
+        if held is not None:
+            self._run_seconds = held if self._run_seconds is None else 0.8 * self._run_seconds + 0.2 * held
+        self._wake()
+        in_flight_gauge.set(self.in_flight)
+
+    def _wake(self):
+        """Hand free slots to waiters, one session at a time in round-robin order."""
+        while self._waiters:
+            session_id, waiters = next(iter(self._waiters.items()))
+            future, weight = waiters[0]
+            if self.in_flight + weight > self.max_in_flight:
+                break
+            waiters.popleft()
+            self.queued -= weight
+            if waiters:
+                self._waiters.move_to_end(session_id)
+            else:
+                del self._waiters[session_id]
+            if not future.done():
+                self.in_flight += weight
+                future.set_result(None)
+        queue_depth.set(self.queued)
+        in_flight_gauge.set(self.in_flight)
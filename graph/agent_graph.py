@@ -1,45 +1,222 @@
-from langchain_openai import ChatOpenAI
-from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
+import asyncio
+import logging
+import re
+from contextlib import asynccontextmanager
 
-from langchain_community.chat_message_histories import SQLChatMessageHistory
-from langchain.memory import ConversationBufferMemory
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.graph import StateGraph, MessagesState, START, END
 
 from client.multi_client import mcp_client
+from client.shaping import has_more_rows
+from client.tokens import count_text_tokens
+from graph.tool_node import ParallelToolNode
+from graph.checkpointer import open_checkpointer
+from graph.history import summarize_history, build_prompt
+from graph.router import ToolRouter, tokenize
+from graph.answer_cache import DOMAINS, tool_domains
+from graph.tool_registry import ToolRegistry
+from graph.intent import IntentParser
+from config.settings import ROUTER_ENABLED, LLM_MODEL, DIRECT_RETURN_ENABLED, DIRECT_RETURN_TOOLS
+from telemetry.metrics import counter
+from telemetry.tracing import llm_span, record_usage
 from dotenv import load_dotenv
 
 load_dotenv()
 
-llm = ChatOpenAI(model="gpt-4o-mini")
+logger = logging.getLogger(__name__)
+
+# Built on first use by get_llm(); importing langchain_openai alone takes over a second
+llm = None
+
+
+def get_llm():
+    global llm
+    if llm is None:
+        from langchain_openai import ChatOpenAI
+        from graph.llm_cache import open_llm_cache
+        llm = ChatOpenAI(model=LLM_MODEL, cache=open_llm_cache())
+    return llm
+
+
+def _warm_up():
+    """Build the model client and load the tokenizer before the first request needs them."""
+    get_llm()
+    count_text_tokens("")
+
+
+def preload():
+    """Import the heavy modules now, so forked workers share them copy-on-write."""
+    import langchain_openai  # noqa: F401
+    import tiktoken  # noqa: F401
 
 system_prompt = """
-You are a helpful assistant. 
+You are a helpful assistant.
 Always use the registered tools when they are relevant.
 Do NOT answer directly if a tool exists for the user request.
 For example:
 - If the query asks about "courses of student <id>", always call get_courses_by_student_id.
+- If it asks about several students, courses or movies, call the bulk tool
+  (get_courses_for_students, get_professors_for_courses, get_movies_by_track_ids)
+  once with all the IDs instead of one call per ID.
 """
 
-# Gather all tools from MCP servers
-tools = mcp_client.get_all_tools()
+routed_turns = counter("chat_router_decisions_total", "Tool routing decisions by outcome")
+direct_returns = counter("chat_direct_return_total", "Turns answered with a final tool's output instead of a model call")
+
+
+class AgentState(MessagesState):
+    # Running summary of turns that were trimmed from `messages`
+    summary: str
+    summarized_tokens: int
+
+
+def route_after_model(state: AgentState):
+    last = state["messages"][-1]
+    if isinstance(last, AIMessage) and last.tool_calls:
+        return "tools"
+    return END
+
+
+def _numbers(value) -> set:
+    return {float(n) for n in re.findall(r"\d+(?:\.\d+)?", str(value))}
+
+
+def _args_from_query(args: dict, query: str) -> bool:
+    """Every argument is read off the query, and every number in the query is one of the arguments."""
+    in_query = _numbers(query)
+    text = " ".join(query.lower().split())
+    used = set()
+    for value in args.values():
+        numbers = _numbers(value)
+        if numbers:
+            if not numbers <= in_query:
+                return False
+            used |= numbers
+        elif " ".join(str(value).lower().split()) not in text:
+            return False
+    return used == in_query
+
+
+def direct_tool_output(messages, direct_tools: set, always: set = frozenset()) -> ToolMessage:
+    """
+    The tool result that answers the whole turn, or None to hand it back to
+    the model. The turn's first model step must have made exactly one
+    successful call, with a complete output, to a direct-return tool. The
+    call must take all its arguments from the query and leave no number of
+    the query unused, and the query must ask about no data the tool does
+    not cover (the domains in its name). So a call that is one step of a
+    longer plan, such as one id of many or the first link of a chain ("who
+    teaches the courses of student 1"), goes back to the model. Tools in
+    `always` (declared `return_direct=True`) end the turn whatever the
+    query, as in LangChain.
+    """
+    if len(messages) < 3:
+        return None
+    result, request, query = messages[-1], messages[-2], messages[-3]
+    if not (isinstance(result, ToolMessage) and isinstance(request, AIMessage) and isinstance(query, HumanMessage)):
+        return None
+    if len(request.tool_calls) != 1 or result.name not in direct_tools | always:
+        return None
+    content = str(result.content)
+    # Failures and cut pages go back to the model, which can explain or page on
+    if result.status == "error" or content.startswith("Error") or has_more_rows(content):
+        return None
+    call = request.tool_calls[0]
+    if call["name"] in always:
+        return result
+    text = str(query.content)
+    if not _args_from_query(call["args"], text):
+        return None
+    if not set(tokenize(text)) & set(DOMAINS) <= tool_domains(call["name"]):
+        return None
+    return result
+
+
+def build_workflow(registry: ToolRegistry) -> StateGraph:
+    """
+    ReAct loop over the registry's tools; tool calls of one model turn run
+    concurrently. A turn whose query one direct-return tool call answers on
+    its own ends with that tool's output instead of another model call.
+    """
+    tools = registry.tools
+    logger.info("Loaded tools: %s", [t.name for t in tools])
+    for server, usage in registry.report().items():
+        logger.info("Tool schemas of %s: %d tokens for %d tools", server, usage["tokens"], len(usage["tools"]))
+    router = ToolRouter(registry.servers)
+    direct_tools = {t.name for t in tools if t.name in DIRECT_RETURN_TOOLS} if DIRECT_RETURN_ENABLED else set()
+    always_direct = {t.name for t in tools if t.return_direct} if DIRECT_RETURN_ENABLED else set()
+
+    def tools_for_turn(messages) -> list:
+        """Tools relevant to the latest user message, or every tool when unsure."""
+        if not ROUTER_ENABLED:
+            return tools
+        query = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+        selected, confident = router.route(str(query))
+        routed_turns.inc(outcome="routed" if confident else "fallback")
+        return selected
+
+    async def summarize(state: AgentState):
+        return await summarize_history(state, get_llm())
+
+    async def call_model(state: AgentState, config):
+        prompt = build_prompt(
+            system_prompt, state.get("summary", ""), state["messages"], state.get("summarized_tokens", 0)
+        )
+        chat_model = get_llm()
+        model = registry.bind(chat_model, tools_for_turn(state["messages"]))
+        with llm_span(chat_model, "agent") as current:
+            response = await model.ainvoke(prompt, config)
+            record_usage(current, response)
+        return {"messages": [response]}
+
+    def route_after_tools(state: AgentState):
+        return "direct" if direct_tool_output(state["messages"], direct_tools, always_direct) else "agent"
 
-print("Loaded tools:", [t.name for t in tools])
+    async def direct_answer(state: AgentState):
+        """Stored like a model answer, so history and later turns see a normal exchange."""
+        result = state["messages"][-1]
+        direct_returns.inc(tool=result.name)
+        return {"messages": [AIMessage(content=str(result.content))]}
 
-# Function to create persistent memory per session
-def get_memory(session_id: str = "default_session"):
-    history = SQLChatMessageHistory(
-        connection="sqlite:///chat_memory.db",  # correct arg in 0.4.x
-        session_id=session_id
-    )
-    return ConversationBufferMemory(
-        return_messages=True,
-        chat_memory=history
-    )
+    workflow = StateGraph(AgentState)
+    workflow.add_node("summarize", summarize)
+    workflow.add_node("agent", call_model)
+    workflow.add_node("tools", ParallelToolNode(tools))
+    workflow.add_node("direct", direct_answer)
+    workflow.add_edge(START, "summarize")
+    workflow.add_edge("summarize", "agent")
+    workflow.add_conditional_edges("agent", route_after_model, ["tools", END])
+    workflow.add_conditional_edges("tools", route_after_tools, ["agent", "direct"])
+    workflow.add_edge("direct", END)
+    return workflow
 
-# Checkpointer (saves memory snapshots automatically)
-checkpointer = MemorySaver()
 
-#  Create agent with memory persistence
-agent_with_memory = create_react_agent(llm, tools, checkpointer=checkpointer)
+# Compiled on startup, once tools are discovered and the SQLite checkpointer is open
+agent_with_memory = None
+fast_path = None
+tool_registry = None
 
 
+@asynccontextmanager
+async def agent_lifespan():
+    """Discover MCP tools and compile the agent against the persistent checkpointer."""
+    global agent_with_memory, fast_path, tool_registry
+    # Model client and tokenizer load in a thread while the MCP servers start
+    warmed = asyncio.create_task(asyncio.to_thread(_warm_up))
+    await mcp_client.start()
+    # Sessions not opened by discovery (warm schema cache) start while the rest is set up
+    connected = asyncio.create_task(mcp_client.connect())
+    try:
+        await warmed
+        async with open_checkpointer() as checkpointer:
+            tool_registry = ToolRegistry(mcp_client.servers)
+            fast_path = IntentParser(tool_registry.servers)
+            agent_with_memory = build_workflow(tool_registry).compile(checkpointer=checkpointer)
+            await connected
+            yield agent_with_memory
+    finally:
+        agent_with_memory = None
+        fast_path = None
+        tool_registry = None
+        await connected
+        await mcp_client.aclose()
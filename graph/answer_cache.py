@@ -0,0 +1,153 @@
+# graph/answer_cache.py
+"""
+Answer cache in front of the agent.
+
+Queries are canonicalized with the router's tokenizer (stemming + synonyms)
+and compared as token/bigram vectors, so "courses for student 1"
+and "which classes is student 1 taking" can share one stored answer. Numbers
+and quantifier/negation words ("all", "any", "no", ...) must match exactly,
+so "students in all courses 1,2" never gets the answer to "students in any
+of courses 1,2". Only answers produced solely by read-only tools are
+stored, and any write tool evicts the answers it could have changed.
+"""
+import math
+import re
+import time
+from collections import Counter, OrderedDict
+
+from langchain_core.messages import ToolMessage
+
+from config.settings import (
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_TTL,
+    ANSWER_CACHE_THRESHOLD,
+    CACHE_TTLS,
+    WRITE_TOOLS,
+)
+from graph.router import STOPWORDS, tokenize
+from telemetry.metrics import counter
+
+DOMAINS = ("student", "course", "professor", "product", "movie")
+
+# Follow-ups that only make sense in the context of the conversation
+CONTEXT_WORDS = {"he", "she", "it", "they", "them", "his", "her", "their", "that", "those", "these", "this", "same", "again"}
+
+# Words that change which rows answer the question; the router drops some of them as stopwords
+QUANTIFIERS = {"all", "any", "every", "each", "both", "only", "no", "not", "none", "without", "except"}
+CACHE_STOPWORDS = STOPWORDS - QUANTIFIERS
+
+answer_cache_lookups = counter("chat_answer_cache_lookups_total", "Answer cache lookups by result")
+
+
+def tool_domains(tool_name: str) -> set:
+    """Data domains a tool touches, derived from its name (get_students_by_professor -> student, professor)."""
+    return {d for d in DOMAINS if d in tool_name}
+
+
+class _Entry:
+    __slots__ = ("vector", "answer", "domains", "expires_at")
+
+    def __init__(self, vector, answer, domains, expires_at):
+        self.vector = vector
+        self.answer = answer
+        self.domains = domains
+        self.expires_at = expires_at
+
+
+class AnswerCache:
+    def __init__(self, max_entries: int = ANSWER_CACHE_MAX_ENTRIES, threshold: float = ANSWER_CACHE_THRESHOLD):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._entries = OrderedDict()  # ((numbers, quantifiers), canonical query) -> _Entry
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def canonicalize(query: str):
+        """
+        ((numbers, quantifiers in the query), canonical token string), or None
+        if the query depends on context. The first part must match exactly.
+        """
+        words = set(re.findall(r"[a-z]+", query.lower()))
+        if words & CONTEXT_WORDS:
+            return None
+        numbers = tuple(re.findall(r"\d+(?:\.\d+)?", query))
+        exact = numbers, tuple(sorted(words & QUANTIFIERS))
+        # Order is kept: "courses for student 1" and "students in course 1" differ
+        return exact, " ".join(dict.fromkeys(tokenize(query, stopwords=CACHE_STOPWORDS)))
+
+    @staticmethod
+    def _vector(canonical: str) -> dict:
+        features = Counter()
+        tokens = canonical.split()
+        features.update(tokens)
+        # Bigrams carry the direction of the question, so they weigh more
+        for first, second in zip(tokens, tokens[1:]):
+            features[f"{first}>{second}"] += 2
+        norm = math.sqrt(sum(v * v for v in features.values())) or 1.0
+        return {f: v / norm for f, v in features.items()}
+
+    def lookup(self, query: str):
+        key = self.canonicalize(query)
+        if key is None:
+            answer_cache_lookups.inc(result="skip")
+            return None
+        exact, canonical = key
+        vector = self._vector(canonical)
+        now = time.monotonic()
+        best, best_key = 0.0, None
+        for entry_key, entry in list(self._entries.items()):
+            if entry.expires_at < now:
+                del self._entries[entry_key]
+                continue
+            if entry_key[0] != exact:
+                continue
+            similarity = sum(w * entry.vector.get(f, 0.0) for f, w in vector.items())
+            if similarity > best:
+                best, best_key = similarity, entry_key
+        if best_key is None or best < self.threshold:
+            self.misses += 1
+            answer_cache_lookups.inc(result="miss")
+            return None
+        self._entries.move_to_end(best_key)
+        self.hits += 1
+        answer_cache_lookups.inc(result="hit")
+        return self._entries[best_key].answer
+
+    def observe_turn(self, query: str, answer: str, turn_messages) -> bool:
+        """
+        Record a finished agent turn: evict answers a write tool may have changed,
+        and store the answer if it came only from successful read-only tools.
+        """
+        tool_messages = [m for m in turn_messages if isinstance(m, ToolMessage)]
+        self.invalidate_for_tools(m.name for m in tool_messages)
+        # Tools report backend failures as "Error ..." text with a success status
+        cacheable = bool(tool_messages) and all(
+            m.name not in WRITE_TOOLS and m.status != "error" and not str(m.content).startswith("Error")
+            for m in tool_messages
+        )
+        key = self.canonicalize(query) if cacheable else None
+        if key is None:
+            return False
+        ttl = min(CACHE_TTLS.get(m.name, ANSWER_CACHE_TTL) for m in tool_messages)
+        domains = set().union(*(tool_domains(m.name) for m in tool_messages))
+        self._entries[key] = _Entry(self._vector(key[1]), answer, domains, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    def invalidate_for_tools(self, tool_names) -> int:
+        """Evict answers over the domains touched by any write tool in `tool_names`."""
+        affected = set()
+        for name in tool_names:
+            affected.update(WRITE_TOOLS.get(name, ()))
+        if not affected:
+            return 0
+        stale = [k for k, e in self._entries.items() if e.domains & affected]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,337 @@
+# graph/checkpointer.py
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+
+import aiosqlite
+from langgraph.checkpoint.base import WRITES_IDX_MAP, CheckpointTuple, get_checkpoint_id, get_checkpoint_metadata
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from config.settings import (
+    CHECKPOINT_BACKEND,
+    CHECKPOINT_URL,
+    CHECKPOINT_AFFINITY,
+    CHECKPOINT_DB,
+    CHECKPOINT_HOT_SESSIONS,
+    CHECKPOINT_RETENTION_SECONDS,
+    CHECKPOINT_PRUNE_INTERVAL,
+)
+from telemetry.metrics import histogram
+from telemetry.tracing import span
+
+logger = logging.getLogger(__name__)
+
+checkpoint_seconds = histogram("checkpoint_seconds", "Latency of checkpoint reads and writes by operation")
+checkpoint_batch = histogram(
+    "checkpoint_commit_writes", "Checkpoint writes committed together in one transaction", buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+
+
+@contextmanager
+def _timed(operation: str, thread_id: str, **attributes):
+    with span(f"checkpoint {operation}", **{"checkpoint.thread_id": thread_id}, **attributes) as current:
+        try:
+            yield current
+        finally:
+            checkpoint_seconds.observe(current.duration, op=operation)
+
+
+class HotSessionMixin:
+    """
+    Serves the latest checkpoint of the most recently used threads from a bounded LRU.
+
+    With `affinity`, every turn of a session reaches the same worker and a
+    cached checkpoint is served as is. Without it another worker may have
+    moved the thread on, so a cached checkpoint is only served while its id
+    is still the latest one in the store (`_latest_checkpoint_id`).
+    """
+
+    def _init_hot(self, max_hot_sessions: int, affinity: bool):
+        self.max_hot_sessions = max_hot_sessions
+        self.affinity = affinity
+        self._hot = OrderedDict()  # thread_id -> latest CheckpointTuple
+
+    async def _latest_checkpoint_id(self, thread_id: str):
+        raise NotImplementedError
+
+    def _remember(self, thread_id: str, checkpoint_tuple: CheckpointTuple):
+        self._hot[thread_id] = checkpoint_tuple
+        self._hot.move_to_end(thread_id)
+        while len(self._hot) > self.max_hot_sessions:
+            self._hot.popitem(last=False)
+
+    @staticmethod
+    def _is_latest_lookup(config) -> bool:
+        return not get_checkpoint_id(config) and not config["configurable"].get("checkpoint_ns")
+
+    async def _hot_tuple(self, thread_id: str):
+        cached = self._hot.get(thread_id)
+        if cached is None:
+            return None
+        if not self.affinity:
+            with _timed("validate", thread_id):
+                latest_id = await self._latest_checkpoint_id(thread_id)
+            if latest_id != cached.config["configurable"]["checkpoint_id"]:
+                del self._hot[thread_id]
+                return None
+        self._hot.move_to_end(thread_id)
+        return cached
+
+    async def aget_tuple(self, config):
+        thread_id = str(config["configurable"]["thread_id"])
+        latest = self._is_latest_lookup(config)
+        if latest:
+            cached = await self._hot_tuple(thread_id)
+            if cached is not None:
+                return cached
+        with _timed("read", thread_id):
+            checkpoint_tuple = await super().aget_tuple(config)
+        if latest and checkpoint_tuple is not None:
+            self._remember(thread_id, checkpoint_tuple)
+        return checkpoint_tuple
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        thread_id = str(config["configurable"]["thread_id"])
+        with _timed("write", thread_id):
+            next_config = await super().aput(config, checkpoint, metadata, new_versions)
+        if config["configurable"].get("checkpoint_ns"):
+            return next_config
+        parent_id = config["configurable"].get("checkpoint_id")
+        self._remember(thread_id, CheckpointTuple(
+            next_config,
+            checkpoint,
+            json.loads(json.dumps(get_checkpoint_metadata(config, metadata), ensure_ascii=False)),
+            {"configurable": {**next_config["configurable"], "checkpoint_id": parent_id}} if parent_id else None,
+            [],
+        ))
+        return next_config
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        with _timed("write_pending", str(config["configurable"]["thread_id"]), **{"checkpoint.writes": len(writes)}):
+            await super().aput_writes(config, writes, task_id, task_path)
+        # Pending writes are part of the tuple; reload from the store next time
+        self._hot.pop(str(config["configurable"]["thread_id"]), None)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await super().adelete_thread(thread_id)
+        self._hot.pop(str(thread_id), None)
+
+
+class GroupCommitSqliteSaver(AsyncSqliteSaver):
+    """
+    AsyncSqliteSaver whose checkpoint and pending writes share commits.
+
+    Every write is queued to one writer task, which runs all the writes
+    queued so far in a single transaction and commits once; writes queued
+    while it commits go in the next one. Callers still return only once
+    their write is committed, so the store sees the same writes in the same
+    order, with one commit (and WAL sync) per batch instead of per write.
+    A failing batch is rolled back and fails every write in it.
+    """
+
+    def __init__(self, conn: aiosqlite.Connection, *args, **kwargs):
+        super().__init__(conn, *args, **kwargs)
+        self._queued = []  # (sql, rows, future), in call order
+        self._writer = None
+
+    async def _write(self, sql: str, rows: list):
+        """Queue `rows` for `sql`; returns once they are committed."""
+        future = asyncio.get_running_loop().create_future()
+        self._queued.append((sql, rows, future))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_batches())
+        # A cancelled caller does not cancel the batch its rows are in
+        await asyncio.shield(future)
+
+    async def _write_batches(self):
+        while self._queued:
+            batch, self._queued = self._queued, []
+            try:
+                async with self.lock:
+                    try:
+                        for sql, rows, _ in batch:
+                            await self.conn.executemany(sql, rows)
+                        await self.conn.commit()
+                    except BaseException:
+                        await self.conn.rollback()
+                        raise
+            except Exception as e:
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                checkpoint_batch.observe(len(batch))
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        await self.setup()
+        configurable = config["configurable"]
+        type_, serialized_checkpoint = self.serde.dumps_typed(checkpoint)
+        serialized_metadata = json.dumps(
+            get_checkpoint_metadata(config, metadata), ensure_ascii=False
+        ).encode("utf-8", "ignore")
+        await self._write(
+            "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+            "type, checkpoint, metadata) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(
+                str(configurable["thread_id"]), configurable["checkpoint_ns"], checkpoint["id"],
+                configurable.get("checkpoint_id"), type_, serialized_checkpoint, serialized_metadata,
+            )],
+        )
+        return {"configurable": {
+            "thread_id": configurable["thread_id"],
+            "checkpoint_ns": configurable["checkpoint_ns"],
+            "checkpoint_id": checkpoint["id"],
+        }}
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        await self.setup()
+        configurable = config["configurable"]
+        # Same conflict rule as AsyncSqliteSaver: special channels replace, others keep the first write
+        verb = "REPLACE" if all(w[0] in WRITES_IDX_MAP for w in writes) else "IGNORE"
+        await self._write(
+            f"INSERT OR {verb} INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, task_path, idx, "
+            "channel, type, value) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    str(configurable["thread_id"]), str(configurable["checkpoint_ns"]), str(configurable["checkpoint_id"]),
+                    task_id, task_path, WRITES_IDX_MAP.get(channel, idx), channel, *self.serde.dumps_typed(value),
+                )
+                for idx, (channel, value) in enumerate(writes)
+            ],
+        )
+
+
+class BoundedSqliteSaver(HotSessionMixin, GroupCommitSqliteSaver):
+    """
+    SQLite (WAL) checkpointer that only keeps a bounded LRU of hot sessions in memory.
+
+    Sessions are loaded from disk on first access; the latest checkpoint of
+    the most recently used threads is served from memory. Thread activity is
+    tracked in `thread_activity` so idle threads can be pruned. Several
+    worker processes on one host can share the database file.
+    """
+
+    def __init__(self, conn: aiosqlite.Connection, max_hot_sessions: int = CHECKPOINT_HOT_SESSIONS,
+                 affinity: bool = CHECKPOINT_AFFINITY):
+        super().__init__(conn)
+        self._init_hot(max_hot_sessions, affinity)
+        self._touched = {}  # thread_id -> last activity, flushed in batches
+
+    async def setup(self) -> None:
+        if self.is_setup:
+            return
+        await super().setup()
+        async with self.lock:
+            await self.conn.executescript(
+                """
+                PRAGMA synchronous=NORMAL;
+                CREATE TABLE IF NOT EXISTS thread_activity (
+                    thread_id TEXT PRIMARY KEY,
+                    last_seen REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS thread_activity_last_seen ON thread_activity (last_seen);
+                """
+            )
+            # Threads written before activity tracking existed start their clock now
+            await self.conn.execute(
+                "INSERT OR IGNORE INTO thread_activity (thread_id, last_seen) SELECT DISTINCT thread_id, ? FROM checkpoints",
+                (time.time(),),
+            )
+            await self.conn.commit()
+
+    async def _latest_checkpoint_id(self, thread_id: str):
+        async with self.lock:
+            async with self.conn.execute(
+                "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = '' "
+                "ORDER BY checkpoint_id DESC LIMIT 1",
+                (thread_id,),
+            ) as cur:
+                row = await cur.fetchone()
+        return row[0] if row else None
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        next_config = await super().aput(config, checkpoint, metadata, new_versions)
+        self._touched[str(config["configurable"]["thread_id"])] = time.time()
+        return next_config
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await super().adelete_thread(thread_id)
+        self._touched.pop(str(thread_id), None)
+        async with self.lock:
+            await self.conn.execute("DELETE FROM thread_activity WHERE thread_id = ?", (str(thread_id),))
+            await self.conn.commit()
+
+    # -----------------------
+    # Retention
+    # -----------------------
+    async def flush_activity(self):
+        """Write buffered thread activity timestamps in one batch."""
+        if not self._touched:
+            return
+        touched, self._touched = self._touched, {}
+        await self.setup()
+        await self._write(
+            "INSERT INTO thread_activity (thread_id, last_seen) VALUES (?, ?) "
+            "ON CONFLICT(thread_id) DO UPDATE SET last_seen = excluded.last_seen",
+            list(touched.items()),
+        )
+
+    async def prune_idle_threads(self, max_age: float = CHECKPOINT_RETENTION_SECONDS) -> int:
+        """Delete every thread idle for longer than `max_age` seconds; returns how many."""
+        await self.flush_activity()
+        cutoff = time.time() - max_age
+        async with self.lock:
+            async with self.conn.execute(
+                "SELECT thread_id FROM thread_activity WHERE last_seen < ?", (cutoff,)
+            ) as cur:
+                stale = [row[0] for row in await cur.fetchall()]
+            if stale:
+                await self.conn.executemany("DELETE FROM checkpoints WHERE thread_id = ?", [(t,) for t in stale])
+                await self.conn.executemany("DELETE FROM writes WHERE thread_id = ?", [(t,) for t in stale])
+                await self.conn.executemany("DELETE FROM thread_activity WHERE thread_id = ?", [(t,) for t in stale])
+                await self.conn.commit()
+        for thread_id in stale:
+            self._hot.pop(thread_id, None)
+        return len(stale)
+
+
+async def _maintenance_loop(saver: BoundedSqliteSaver, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await saver.flush_activity()
+            await saver.prune_idle_threads()
+        except Exception:
+            logger.exception("Checkpoint maintenance failed")
+
+
+@asynccontextmanager
+async def open_checkpointer(path: str = CHECKPOINT_DB, backend: str = CHECKPOINT_BACKEND, url: str = CHECKPOINT_URL):
+    """
+    Open this worker's checkpoint store: "sqlite" (the `path` file, shared by
+    the workers of one host) or "redis" (`url`, shared across hosts).
+    """
+    if backend == "redis":
+        from graph.redis_saver import open_redis_saver
+
+        async with open_redis_saver(url) as saver:
+            yield saver
+        return
+    if backend != "sqlite":
+        raise ValueError(f"Unknown CHECKPOINT_BACKEND {backend!r}; expected 'sqlite' or 'redis'")
+
+    async with aiosqlite.connect(path) as conn:
+        saver = BoundedSqliteSaver(conn)
+        await saver.setup()
+        maintenance = asyncio.create_task(_maintenance_loop(saver, CHECKPOINT_PRUNE_INTERVAL))
+        try:
+            yield saver
+        finally:
+            maintenance.cancel()
+            await saver.flush_activity()
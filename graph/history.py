@@ -0,0 +1,158 @@
+# graph/history.py
+"""
+Token-budgeted conversation history.
+
+The last HISTORY_KEEP_TURNS turns are kept verbatim; older turns are folded
+into a running summary stored in the checkpoint, and the prompt sent to the
+model never exceeds HISTORY_TOKEN_BUDGET tokens.
+"""
+import json
+import logging
+
+from langchain_core.messages import (
+    AIMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+from config.settings import (
+    HISTORY_TOKEN_BUDGET,
+    HISTORY_KEEP_TURNS,
+    HISTORY_SUMMARY_TRIGGER,
+    HISTORY_TOOL_OUTPUT_TOKENS,
+)
+from client.tokens import count_text_tokens, truncate_text
+from telemetry.metrics import counter, histogram, TOKEN_BUCKETS
+from telemetry.tracing import llm_span, record_usage
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_OVERHEAD_TOKENS = 4
+
+prompt_tokens_before = histogram(
+    "chat_prompt_tokens_before_trim", "History tokens per model call before trimming", TOKEN_BUCKETS
+)
+prompt_tokens_after = histogram(
+    "chat_prompt_tokens_after_trim", "History tokens per model call after trimming", TOKEN_BUCKETS
+)
+prompt_tokens_saved = counter("chat_prompt_tokens_saved_total", "History tokens removed by trimming")
+summaries_total = counter("chat_history_summaries_total", "Older turns folded into the running summary")
+
+SUMMARY_PROMPT = """Extend the running summary of a conversation between a user and an assistant
+that answers questions using student/course/professor, product and movie tools.
+Keep every id, name, number and result the user may refer back to. Be concise.
+
+Current summary:
+{summary}
+
+New messages to fold in:
+{messages}
+
+Updated summary:"""
+
+
+def _message_text(message) -> str:
+    text = message.content if isinstance(message.content, str) else json.dumps(message.content)
+    if isinstance(message, AIMessage) and message.tool_calls:
+        text += json.dumps([{"name": c["name"], "args": c["args"]} for c in message.tool_calls])
+    return text
+
+
+def count_tokens(messages) -> int:
+    return sum(count_text_tokens(_message_text(m)) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def split_turns(messages) -> list:
+    """Group messages into turns, each starting at a user message."""
+    turns = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def _shrink_tool_outputs(messages) -> list:
+    shrunk = []
+    for message in messages:
+        if isinstance(message, ToolMessage) and isinstance(message.content, str):
+            content = truncate_text(message.content, HISTORY_TOOL_OUTPUT_TOKENS)
+            if content is not message.content:
+                message = message.model_copy(update={"content": content})
+        shrunk.append(message)
+    return shrunk
+
+
+def _render_for_summary(messages) -> str:
+    lines = []
+    for message in _shrink_tool_outputs(messages):
+        role = {"human": "User", "ai": "Assistant", "tool": f"Tool {getattr(message, 'name', '')}"}.get(message.type, message.type)
+        lines.append(f"{role}: {_message_text(message)}")
+    return "\n".join(lines)
+
+
+async def summarize_history(state: dict, llm) -> dict:
+    """
+    Fold turns older than the last HISTORY_KEEP_TURNS into the running summary
+    once they add up to HISTORY_SUMMARY_TRIGGER tokens, and drop them from state.
+    """
+    turns = split_turns(state["messages"])
+    older = [m for turn in turns[:-HISTORY_KEEP_TURNS] for m in turn] if len(turns) > HISTORY_KEEP_TURNS else []
+    if not older or count_tokens(older) < HISTORY_SUMMARY_TRIGGER:
+        return {}
+    summary = state.get("summary") or "(empty)"
+    try:
+        with llm_span(llm, "summary") as current:
+            response = await llm.ainvoke(
+                SUMMARY_PROMPT.format(summary=summary, messages=_render_for_summary(older))
+            )
+            record_usage(current, response)
+    except Exception:
+        logger.exception("History summarization failed; keeping full history")
+        return {}
+    summaries_total.inc()
+    return {
+        "summary": response.content,
+        "summarized_tokens": state.get("summarized_tokens", 0) + count_tokens(older),
+        "messages": [RemoveMessage(id=m.id) for m in older if m.id],
+    }
+
+
+def build_prompt(system_prompt: str, summary: str, messages, summarized_tokens: int = 0) -> list:
+    """
+    System prompt (+ running summary) followed by as much recent history as fits
+    in HISTORY_TOKEN_BUDGET. The current turn is always kept whole.
+
+    `summarized_tokens` is the size of the turns already folded into the
+    summary, so the "before" metric reflects the full untrimmed history.
+    """
+    system_text = system_prompt
+    if summary:
+        system_text += f"\nSummary of the earlier conversation:\n{summary}\n"
+    system = SystemMessage(system_text)
+    before = count_tokens([SystemMessage(system_prompt), *messages]) + summarized_tokens
+
+    turns = split_turns(messages)
+    current, previous = turns[-1:] or [[]], turns[:-1]
+    # Older turns only need the gist of large tool payloads
+    previous = [_shrink_tool_outputs(turn) for turn in previous]
+    budget = HISTORY_TOKEN_BUDGET - count_tokens([system, *current[0]])
+    kept = []
+    for turn in reversed(previous):
+        cost = count_tokens(turn)
+        if cost > budget:
+            break
+        kept.insert(0, turn)
+        budget -= cost
+    prompt = [system] + [m for turn in kept for m in turn] + current[0]
+    if budget < 0:
+        # The current turn alone is over budget: shrink its tool payloads too
+        prompt = [system] + _shrink_tool_outputs(current[0])
+
+    after = count_tokens(prompt)
+    prompt_tokens_before.observe(before)
+    prompt_tokens_after.observe(after)
+    prompt_tokens_saved.inc(before - after)
+    return prompt
@@ -0,0 +1,170 @@
+# graph/intent.py
+"""
+Deterministic fast path for simple lookups.
+
+Every read-only tool gets a signature generated from its name and argument
+schema: "get_products_below_price(price: number)" becomes the token sequence
+[product, below, price] plus one number. A query whose content words reduce
+to exactly one tool's signature, with arguments of the right type and count,
+is answered by calling that tool directly, skipping both LLM round trips.
+Anything else (extra words, missing or surplus values, several matching
+tools) is left to the agent, and so is a call that fails or returns only
+the first page of its rows.
+"""
+import re
+import time
+
+from client.shaping import has_more_rows
+from config.settings import WRITE_TOOLS
+from graph.router import tokenize
+from telemetry.metrics import counter, histogram
+from telemetry.tracing import span
+
+# Only unambiguous word-level aliases; the router's wider synonyms (title -> movie,
+# taking -> enroll) would make distinct tools collide.
+ALIASES = {
+    "class": "course", "subject": "course", "pupil": "student", "learner": "student",
+    "teacher": "professor", "prof": "professor", "film": "movie", "item": "product",
+    "under": "below", "cheaper": "below", "named": "name", "called": "name",
+}
+FILLER = {"find", "display", "tell", "about", "details", "number", "please"}
+
+WORD = re.compile(r"\d+(?:\.\d+)?|[A-Za-z][\w'-]*")
+
+fast_path_total = counter("chat_fast_path_total", "Fast-path intent matches by result")
+fast_path_seconds = histogram("chat_fast_path_seconds", "Latency of turns answered by the fast path")
+
+
+def _content(word: str):
+    tokens = tokenize(word, ALIASES)
+    return tokens[0] if tokens and tokens[0] not in FILLER else None
+
+
+class _Intent:
+    __slots__ = ("tool", "numeric", "id_list", "text_arg")
+
+    def __init__(self, tool, numeric, id_list, text_arg):
+        self.tool = tool
+        self.numeric = numeric  # [(arg name, "integer" | "number")] in signature order
+        self.id_list = id_list  # string arg holding comma-separated ids
+        self.text_arg = text_arg  # free-text string arg, taken from the end of the query
+
+
+class IntentParser:
+    def __init__(self, servers: dict):
+        self.exact = {}  # signature -> [_Intent], matched against all content words
+        self.prefix = {}  # signature -> [_Intent], followed by a free-text value
+        seen = set()
+        for tools in servers.values():
+            for tool in tools:
+                if tool.name in WRITE_TOOLS or tool.name in seen:
+                    continue
+                intent = self._compile(tool)
+                if intent is None:
+                    continue
+                seen.add(tool.name)
+                signature = tuple(t for t in (_content(w) for w in WORD.findall(tool.name.replace("_", " "))) if t)
+                table = self.prefix if intent.text_arg else self.exact
+                table.setdefault(signature, []).append(intent)
+
+    @staticmethod
+    def _compile(tool):
+        """Classify the tool's required arguments, or None if it cannot be filled from a query."""
+        schema = tool.args_schema if isinstance(tool.args_schema, dict) else tool.args_schema.model_json_schema()
+        properties = schema.get("properties", {})
+        required = schema.get("required", [])
+        numeric, id_list, text_arg = [], None, None
+        for name in required:
+            kind = properties.get(name, {}).get("type")
+            if kind in ("integer", "number"):
+                numeric.append((name, kind))
+            elif kind == "string" and (name == "ids" or name.endswith(("_id", "_ids"))) and id_list is None:
+                id_list = name
+            elif kind == "string" and text_arg is None:
+                text_arg = name
+            else:
+                return None
+        if (numeric or text_arg) and id_list or numeric and text_arg:
+            return None
+        return _Intent(tool, numeric, id_list, text_arg)
+
+    def match(self, query: str):
+        """(tool, args) when exactly one tool fits the query, otherwise None."""
+        intent = self.resolve(query)
+        if intent is None:
+            fast_path_total.inc(result="fallback")
+        return intent
+
+    def resolve(self, query: str):
+        """Same as `match`, without counting a fast-path decision."""
+        content, numbers = [], []
+        candidates = []
+        for word in WORD.finditer(query):
+            text = word.group()
+            if text[0].isdigit():
+                numbers.append(text)
+                continue
+            token = _content(text)
+            if token is None:
+                continue
+            content.append(token)
+            # A free-text value is whatever follows the signature words
+            for intent in self.prefix.get(tuple(content), ()):
+                rest = query[word.end():].strip(" \t?.!\"'")
+                if rest and not numbers:
+                    candidates.append((intent, {intent.text_arg: rest}))
+        for intent in self.exact.get(tuple(content), ()):
+            args = self._bind(intent, numbers)
+            if args is not None:
+                candidates.append((intent, args))
+        if len({intent.tool.name for intent, _ in candidates}) > 1:
+            # One id also fits the bulk variant of a single-id tool; the single-id tool wins
+            single = [(intent, args) for intent, args in candidates if not intent.id_list]
+            if len({intent.tool.name for intent, _ in single}) == 1:
+                candidates = single
+        if len({intent.tool.name for intent, _ in candidates}) != 1:
+            return None
+        intent, args = candidates[0]
+        return intent.tool, args
+
+    @staticmethod
+    def _bind(intent, numbers):
+        if intent.id_list:
+            if not numbers or any("." in n for n in numbers):
+                return None
+            return {intent.id_list: ",".join(numbers)}
+        if len(numbers) != len(intent.numeric):
+            return None
+        args = {}
+        for (name, kind), value in zip(intent.numeric, numbers):
+            if kind == "integer":
+                if "." in value:
+                    return None
+                args[name] = int(value)
+            else:
+                args[name] = float(value)
+        return args
+
+    async def call(self, tool, args: dict):
+        """
+        Run a matched tool and return its output, or None to fall back to the
+        agent: when it fails, or when its output was cut and asks to be called
+        again for the rest, which only the model can do.
+        """
+        start = time.perf_counter()
+        try:
+            with span(f"tool {tool.name}", **{"tool.name": tool.name, "tool.fast_path": True}):
+                result = str(await tool.ainvoke(args))
+        except Exception:
+            fast_path_total.inc(result="error")
+            return None
+        # Tools report backend failures as "Error ..." text rather than raising
+        if result.startswith("Error"):
+            fast_path_total.inc(result="error")
+            return None
+        if has_more_rows(result):
+            fast_path_total.inc(result="fallback")
+            return None
+        fast_path_total.inc(result="hit")
+        fast_path_seconds.observe(time.perf_counter() - start)
+        return result
@@ -0,0 +1,156 @@
+# graph/llm_cache.py
+"""
+Content-addressed on-disk cache of model responses, for record and replay.
+
+It is the LangChain cache of the chat model, so it sees every agent and
+summary call. The key is a SHA-256 of the model's llm_string (model name,
+sampling parameters and the bound tool schemas) and of the serialized
+messages. Message ids, usage and response metadata are left out and tool
+call ids are numbered in order of use: they differ between a live response
+and the same response served from the cache, or between two recordings of
+it, and would otherwise change the key of every later turn.
+LLM_CACHE_MODE picks:
+
+- "passthrough": no cache,
+- "record": recorded responses are served, other calls go to the model and
+  their responses are recorded,
+- "replay": recorded responses are served, other calls raise LLMCacheMiss
+  without touching the network, so recorded conversations run offline.
+
+Responses are kept in SQLite (LLM_CACHE_DB) up to LLM_CACHE_MAX_BYTES; the
+least recently used are evicted first.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+from config.settings import LLM_CACHE_MODE, LLM_CACHE_DB, LLM_CACHE_MAX_BYTES
+from telemetry.metrics import counter
+
+MODES = ("passthrough", "record", "replay")
+# Per-response bookkeeping, not part of what the model is asked
+VOLATILE_FIELDS = ("id", "usage_metadata", "response_metadata")
+
+llm_cache_lookups = counter("llm_cache_total", "Model response cache lookups by result (hit/miss/stored/evicted)")
+
+
+def _canonical(prompt: str) -> str:
+    """The serialized messages without volatile fields, tool call ids numbered by first use."""
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt
+    if not isinstance(messages, list):
+        return prompt
+    call_ids = {}
+
+    def number(call_id):
+        return call_ids.setdefault(call_id, f"call_{len(call_ids)}")
+
+    for message in messages:
+        fields = message.get("kwargs") if isinstance(message, dict) else None
+        if not isinstance(fields, dict):
+            continue
+        for name in VOLATILE_FIELDS:
+            fields.pop(name, None)
+        for call in [*fields.get("tool_calls", []), *fields.get("invalid_tool_calls", []),
+                     *fields.get("additional_kwargs", {}).get("tool_calls", [])]:
+            if isinstance(call, dict) and call.get("id"):
+                call["id"] = number(call["id"])
+        if fields.get("tool_call_id"):
+            fields["tool_call_id"] = number(fields["tool_call_id"])
+    return json.dumps(messages, sort_keys=True, ensure_ascii=False)
+
+
+class LLMCacheMiss(RuntimeError):
+    """Replay mode found no recorded response for a model call."""
+
+
+class LLMCache(BaseCache):
+    def __init__(self, path: str = LLM_CACHE_DB, mode: str = "record", max_bytes: int = LLM_CACHE_MAX_BYTES):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"LLMCache mode must be 'record' or 'replay', not {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache (last_used);
+            """
+        )
+        self.size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+    @staticmethod
+    def make_key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\0{_canonical(prompt)}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str):
+        key = self.make_key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        if row is None:
+            llm_cache_lookups.inc(result="miss")
+            if self.mode == "replay":
+                raise LLMCacheMiss(
+                    f"No recorded model response for key {key[:12]} in {self.path}; "
+                    "run the conversation once with LLM_CACHE_MODE=record"
+                )
+            return None
+        llm_cache_lookups.inc(result="hit")
+        return loads(row[0], allowed_objects="core")
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        if self.mode != "record":
+            return
+        key = self.make_key(prompt, llm_string)
+        value = dumps(return_val)
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time()),
+            )
+            self.size += len(value) - (old[0] if old else 0)
+            self._evict()
+        llm_cache_lookups.inc(result="stored")
+
+    def _evict(self):
+        if self.size <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_used"):
+            if self.size <= self.max_bytes:
+                break
+            evicted.append((key,))
+            self.size -= size
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", evicted)
+        llm_cache_lookups.inc(len(evicted), result="evicted")
+
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self.size = 0
+
+
+def open_llm_cache(mode: str = LLM_CACHE_MODE, path: str = LLM_CACHE_DB):
+    """The cache for LLM_CACHE_MODE, or None in passthrough mode."""
+    if mode not in MODES:
+        raise ValueError(f"Unknown LLM_CACHE_MODE {mode!r}; expected one of {', '.join(MODES)}")
+    return None if mode == "passthrough" else LLMCache(path, mode)
@@ -0,0 +1,195 @@
+# graph/redis_saver.py
+"""
+Session checkpoints in Redis, shared by workers on any number of hosts.
+
+Only plain hash, set and sorted-set commands are used, so any
+Redis-compatible server works. Keys per thread and checkpoint namespace,
+under CHECKPOINT_KEY_PREFIX (the thread id is a hash tag, so a thread's keys
+stay on one Redis Cluster slot):
+
+- `index:{thread}:<ns>`: sorted set of checkpoint ids, all scored 0 so they
+  sort lexically, which is chronological for checkpoint ids,
+- `checkpoint:{thread}:<ns>:<id>`: hash of type, checkpoint, metadata, parent,
+- `writes:{thread}:<ns>:<id>`: pending writes, one field per `<task_id>:<idx>`,
+- `namespaces:{thread}`: the thread's namespaces, for deletion.
+
+Every key a write touches expires after CHECKPOINT_RETENTION_SECONDS, so idle
+threads are pruned by Redis itself.
+"""
+import json
+from contextlib import asynccontextmanager
+
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+
+from config.settings import CHECKPOINT_AFFINITY, CHECKPOINT_HOT_SESSIONS, CHECKPOINT_KEY_PREFIX, CHECKPOINT_RETENTION_SECONDS
+from graph.checkpointer import HotSessionMixin
+
+try:
+    from redis.asyncio import Redis
+except ImportError as e:
+    raise ImportError("CHECKPOINT_BACKEND=redis needs the redis package: pip install redis") from e
+
+
+class RedisStore(BaseCheckpointSaver):
+    """Async-only checkpoint saver over a `redis.asyncio.Redis` client."""
+
+    def __init__(self, client: Redis, prefix: str = CHECKPOINT_KEY_PREFIX, ttl: float = CHECKPOINT_RETENTION_SECONDS):
+        super().__init__()
+        self.client = client
+        self.prefix = prefix
+        self.ttl = int(ttl)
+
+    def _key(self, kind: str, thread_id: str, *parts: str) -> str:
+        return ":".join((f"{self.prefix}{kind}", f"{{{thread_id}}}", *parts))
+
+    async def _latest_id(self, thread_id: str, checkpoint_ns: str):
+        ids = await self.client.zrevrange(self._key("index", thread_id, checkpoint_ns), 0, 0)
+        return ids[0].decode() if ids else None
+
+    async def _load(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str):
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(self._key("checkpoint", thread_id, checkpoint_ns, checkpoint_id))
+            pipe.hgetall(self._key("writes", thread_id, checkpoint_ns, checkpoint_id))
+            record, writes = await pipe.execute()
+        if not record:
+            return None
+        pending = []
+        for field, packed in writes.items():
+            task_id, idx = field.decode().rsplit(":", 1)
+            header, _, value = packed.partition(b"\n")
+            task_path, channel, type_ = json.loads(header)
+            pending.append((writes_sort_key(task_path, task_id, int(idx)), (task_id, channel, self.serde.loads_typed((type_, value)))))
+        parent_id = record[b"parent"].decode()
+        return CheckpointTuple(
+            {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            self.serde.loads_typed((record[b"type"].decode(), record[b"checkpoint"])),
+            json.loads(record[b"metadata"]),
+            {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+            if parent_id else None,
+            [write for _, write in sorted(pending, key=lambda item: item[0])],
+        )
+
+    async def aget_tuple(self, config):
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config) or await self._latest_id(thread_id, checkpoint_ns)
+        if checkpoint_id is None:
+            return None
+        return await self._load(thread_id, checkpoint_ns, checkpoint_id)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        if config is None:
+            prefix = f"{self.prefix}namespaces:"
+            threads = [key.decode()[len(prefix) + 1:-1] async for key in self.client.scan_iter(match=f"{prefix}*")]
+        else:
+            threads = [str(config["configurable"]["thread_id"])]
+        before_id = get_checkpoint_id(before) if before else None
+        candidates = []
+        for thread_id in threads:
+            if config is not None and "checkpoint_ns" in config["configurable"]:
+                namespaces = [config["configurable"]["checkpoint_ns"]]
+            else:
+                namespaces = [ns.decode() for ns in await self.client.smembers(self._key("namespaces", thread_id))]
+            for checkpoint_ns in namespaces:
+                for checkpoint_id in await self.client.zrange(self._key("index", thread_id, checkpoint_ns), 0, -1):
+                    checkpoint_id = checkpoint_id.decode()
+                    if config is not None and get_checkpoint_id(config) not in (None, checkpoint_id):
+                        continue
+                    if before_id is not None and checkpoint_id >= before_id:
+                        continue
+                    candidates.append((checkpoint_id, thread_id, checkpoint_ns))
+        yielded = 0
+        for checkpoint_id, thread_id, checkpoint_ns in sorted(candidates, reverse=True):
+            if limit is not None and yielded >= limit:
+                return
+            checkpoint_tuple = await self._load(thread_id, checkpoint_ns, checkpoint_id)
+            if checkpoint_tuple is None:
+                continue  # expired since it was listed
+            if filter and any(checkpoint_tuple.metadata.get(k) != v for k, v in filter.items()):
+                continue
+            yielded += 1
+            yield checkpoint_tuple
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, serialized = self.serde.dumps_typed(checkpoint)
+        record_key = self._key("checkpoint", thread_id, checkpoint_ns, checkpoint["id"])
+        index_key = self._key("index", thread_id, checkpoint_ns)
+        namespaces_key = self._key("namespaces", thread_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(record_key, mapping={
+                "type": type_,
+                "checkpoint": serialized,
+                "metadata": json.dumps(get_checkpoint_metadata(config, metadata), ensure_ascii=False).encode("utf-8", "ignore"),
+                "parent": config["configurable"].get("checkpoint_id") or "",
+            })
+            pipe.zadd(index_key, {checkpoint["id"]: 0})
+            pipe.sadd(namespaces_key, checkpoint_ns)
+            for key in (record_key, index_key, namespaces_key):
+                pipe.expire(key, self.ttl)
+            await pipe.execute()
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        key = self._key(
+            "writes", str(config["configurable"]["thread_id"]),
+            config["configurable"].get("checkpoint_ns", ""), str(config["configurable"]["checkpoint_id"]),
+        )
+        # Special channels (errors, interrupts) replace earlier writes; others keep the first
+        replace = all(channel in WRITES_IDX_MAP for channel, _ in writes)
+        async with self.client.pipeline(transaction=True) as pipe:
+            for idx, (channel, value) in enumerate(writes):
+                type_, serialized = self.serde.dumps_typed(value)
+                field = f"{task_id}:{WRITES_IDX_MAP.get(channel, idx)}"
+                packed = json.dumps([task_path, channel, type_]).encode() + b"\n" + serialized
+                if replace:
+                    pipe.hset(key, field, packed)
+                else:
+                    pipe.hsetnx(key, field, packed)
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        thread_id = str(thread_id)
+        namespaces_key = self._key("namespaces", thread_id)
+        keys = [namespaces_key]
+        for checkpoint_ns in await self.client.smembers(namespaces_key):
+            checkpoint_ns = checkpoint_ns.decode()
+            index_key = self._key("index", thread_id, checkpoint_ns)
+            keys.append(index_key)
+            for checkpoint_id in await self.client.zrange(index_key, 0, -1):
+                keys.append(self._key("checkpoint", thread_id, checkpoint_ns, checkpoint_id.decode()))
+                keys.append(self._key("writes", thread_id, checkpoint_ns, checkpoint_id.decode()))
+        await self.client.delete(*keys)
+
+
+class RedisSaver(HotSessionMixin, RedisStore):
+    """RedisStore with the hot-session LRU and checkpoint timing of BoundedSqliteSaver."""
+
+    def __init__(self, client: Redis, max_hot_sessions: int = CHECKPOINT_HOT_SESSIONS,
+                 affinity: bool = CHECKPOINT_AFFINITY, **kwargs):
+        super().__init__(client, **kwargs)
+        self._init_hot(max_hot_sessions, affinity)
+
+    async def _latest_checkpoint_id(self, thread_id: str):
+        return await self._latest_id(thread_id, "")
+
+
+@asynccontextmanager
+async def open_redis_saver(url: str):
+    """One pooled client per worker; fails fast if the server is unreachable."""
+    # RESP2: understood by every Redis-compatible server, HELLO is not
+    client = Redis.from_url(url, protocol=2)
+    try:
+        await client.ping()
+        yield RedisSaver(client)
+    finally:
+        await client.aclose()
@@ -0,0 +1,101 @@
+# graph/router.py
+"""
+Local tool routing: pick the tools worth binding to the model for one turn.
+
+A TF-IDF index over tool names and docstrings scores each tool against the
+user query (no network). The best-scoring server groups are kept and their
+top-N tools are bound; a low-confidence query falls back to every tool.
+"""
+import math
+import re
+from collections import Counter
+
+from config.settings import ROUTER_TOP_N, ROUTER_MIN_SCORE, ROUTER_GROUP_RATIO
+
+STOPWORDS = {
+    "a", "all", "an", "and", "any", "are", "by", "can", "do", "for", "from", "get", "give",
+    "given", "have", "i", "in", "is", "it", "list", "me", "of", "on", "please", "show",
+    "that", "the", "their", "them", "this", "to", "use", "what", "which", "who", "with",
+    "fetch", "tool", "example", "queries", "should", "trigger", "id", "ids",
+}
+
+SYNONYMS = {
+    "class": "course", "subject": "course", "enrolled": "enroll", "enrol": "enroll", "taking": "enroll",
+    "teacher": "professor", "prof": "professor", "teach": "professor", "taught": "professor",
+    "pupil": "student", "learner": "student",
+    "film": "movie", "track": "movie", "collection": "movie", "title": "movie",
+    "item": "product", "cheap": "below", "cheaper": "below", "under": "below", "less": "below",
+    "add": "create", "new": "create", "register": "create",
+}
+
+
+def tokenize(text: str, synonyms: dict = SYNONYMS, stopwords: set = STOPWORDS) -> list:
+    words = re.findall(r"[a-z]+", text.lower().replace("_", " "))
+    tokens = []
+    for word in words:
+        if len(word) > 3 and word.endswith("es") and word[:-2].endswith(("ss", "sh", "ch")):
+            word = word[:-2]
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        word = synonyms.get(word, word)
+        if word not in stopwords:
+            tokens.append(word)
+    return tokens
+
+
+class ToolRouter:
+    def __init__(self, servers: dict, top_n: int = ROUTER_TOP_N, min_score: float = ROUTER_MIN_SCORE,
+                 group_ratio: float = ROUTER_GROUP_RATIO):
+        self.top_n = top_n
+        self.min_score = min_score
+        self.group_ratio = group_ratio
+        self.all_tools = [t for tools in servers.values() for t in tools]
+        self.group_of = {t.name: group for group, tools in servers.items() for t in tools}
+
+        # Tool names are repeated so they weigh more than free-form docstrings
+        docs = {t.name: tokenize(t.name) * 2 + tokenize(t.description or "") for t in self.all_tools}
+        df = Counter(token for tokens in docs.values() for token in set(tokens))
+        n_docs = len(docs)
+        self.idf = {token: math.log((1 + n_docs) / (1 + count)) + 1 for token, count in df.items()}
+        self.vectors = {name: self._vector(tokens) for name, tokens in docs.items()}
+
+    def _vector(self, tokens: list) -> dict:
+        counts = Counter(t for t in tokens if t in self.idf)
+        vector = {t: c * self.idf[t] for t, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {t: v / norm for t, v in vector.items()}
+
+    def score(self, query: str) -> list:
+        """(score, tool) pairs, best first."""
+        tokens = tokenize(query)
+        # Several ids ("students 1, 2 and 3") point at the bulk tools, documented for "several" ids
+        if len(re.findall(r"\d+", query)) > 1:
+            tokens.append("several")
+        query_vector = self._vector(tokens)
+        scored = []
+        for tool in self.all_tools:
+            vector = self.vectors[tool.name]
+            scored.append((sum(w * vector.get(t, 0.0) for t, w in query_vector.items()), tool))
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return scored
+
+    def route(self, query: str):
+        """Return (tools, confident). Falls back to every tool when not confident."""
+        scored = self.score(query)
+        best = scored[0][0] if scored else 0.0
+        if best < self.min_score:
+            return self.all_tools, False
+
+        group_scores = {}
+        for score, tool in scored:
+            group = self.group_of[tool.name]
+            group_scores[group] = max(group_scores.get(group, 0.0), score)
+        groups = {g for g, s in group_scores.items() if s >= best * self.group_ratio}
+
+        selected, names = [], set()
+        for score, tool in scored:
+            # Two servers may expose the same tool name; the model can only be given one
+            if self.group_of[tool.name] in groups and score > 0 and tool.name not in names:
+                selected.append(tool)
+                names.add(tool.name)
+        return selected[: self.top_n], True
@@ -0,0 +1,72 @@
+# graph/session_lock.py
+import asyncio
+from contextlib import asynccontextmanager, AsyncExitStack
+
+
+class SessionLockManager:
+    """
+    Serializes turns on the same thread_id; different sessions stay parallel.
+
+    A lock only exists while some request holds or waits for it, so memory
+    is bounded by the number of sessions with requests in flight. With
+    `coalesce=True`, an identical query that arrives while the same session
+    is already running it shares that execution instead of running twice.
+    """
+
+    def __init__(self, coalesce: bool = False):
+        self.coalesce = coalesce
+        self._locks = {}  # session_id -> [asyncio.Lock, holders + waiters]
+        self._inflight = {}  # (session_id, query) -> asyncio.Future
+
+    def __len__(self):
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def hold(self, session_id: str):
+        entry = self._locks.get(session_id)
+        if entry is None:
+            entry = self._locks[session_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[session_id]
+
+    @asynccontextmanager
+    async def hold_many(self, session_ids):
+        """Hold several sessions at once (sorted, so concurrent callers cannot deadlock)."""
+        async with AsyncExitStack() as stack:
+            for session_id in sorted(set(session_ids)):
+                await stack.enter_async_context(self.hold(session_id))
+            yield
+
+    async def run(self, session_id: str, query: str, turn):
+        """Run `turn()` holding the session lock, coalescing identical in-flight queries."""
+        if not self.coalesce:
+            async with self.hold(session_id):
+                return await turn()
+
+        key = (session_id, query)
+        shared = self._inflight.get(key)
+        if shared is not None:
+            return await asyncio.shield(shared)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            async with self.hold(session_id):
+                result = await turn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting on it
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
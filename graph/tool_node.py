@@ -0,0 +1,72 @@
+# graph/tool_node.py
+import asyncio
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from config.settings import TOOL_MAX_CONCURRENCY, TOOL_TIMEOUT
+from telemetry.metrics import histogram
+from telemetry.tracing import span
+
+tool_call_seconds = histogram("tool_call_seconds", "Latency of agent tool calls by tool and status")
+
+
+class ParallelToolNode:
+    """
+    Runs every tool call of the last AI message concurrently.
+
+    At most `max_concurrency` calls run at once and each call is bounded by
+    `timeout` seconds. Tool messages are returned in the order the model
+    issued the calls, so the transcript is stable whatever finishes first.
+    """
+
+    def __init__(self, tools: list, max_concurrency: int = TOOL_MAX_CONCURRENCY, timeout: float = TOOL_TIMEOUT):
+        self.tools_by_name = {t.name: t for t in tools}
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+    async def _run_call(self, call: dict, semaphore: asyncio.Semaphore, config) -> ToolMessage:
+        with span(f"tool {call['name']}", **{"tool.name": call["name"], "tool.call_id": call["id"]}) as current:
+            message = await self._invoke(call, semaphore, config)
+            # Tools report backend failures as "Error ..." text rather than raising
+            status = "error" if message.status == "error" or str(message.content).startswith("Error") else "ok"
+            current.set(**{"tool.status": status, "tool.output.size": len(str(message.content))})
+            if status == "error":
+                current.error(str(message.content)[:200])
+        tool_call_seconds.observe(current.duration, tool=call["name"], status=status)
+        return message
+
+    async def _invoke(self, call: dict, semaphore: asyncio.Semaphore, config) -> ToolMessage:
+        tool = self.tools_by_name.get(call["name"])
+        if tool is None:
+            return ToolMessage(
+                content=f"Error: unknown tool '{call['name']}'.",
+                name=call["name"], tool_call_id=call["id"], status="error",
+            )
+        async with semaphore:
+            try:
+                result = await asyncio.wait_for(
+                    tool.ainvoke({**call, "type": "tool_call"}, config), self.timeout
+                )
+            except asyncio.TimeoutError:
+                return ToolMessage(
+                    content=f"Error: tool '{call['name']}' timed out after {self.timeout}s.",
+                    name=call["name"], tool_call_id=call["id"], status="error",
+                )
+            except Exception as e:
+                return ToolMessage(
+                    content=f"Error running tool '{call['name']}': {str(e)}",
+                    name=call["name"], tool_call_id=call["id"], status="error",
+                )
+        if isinstance(result, ToolMessage):
+            return result
+        return ToolMessage(content=str(result), name=call["name"], tool_call_id=call["id"])
+
+    async def __call__(self, state: dict, config) -> dict:
+        last = state["messages"][-1]
+        if not isinstance(last, AIMessage) or not last.tool_calls:
+            return {"messages": []}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(
+            *(self._run_call(call, semaphore, config) for call in last.tool_calls)
+        )
+        return {"messages": list(results)}
@@ -0,0 +1,102 @@
+# graph/tool_registry.py
+"""
+The validated set of tools the agent can call.
+
+Built from the tools of every MCP server (`MultiServerMCPClient.servers`):
+
+- names are unique: a name exposed by several servers is an error unless
+  TOOL_SHADOWS names the server whose tool wins (the others are dropped),
+  and a name exposed twice by one server is always an error,
+- each tool's OpenAI function schema and its token cost are computed once,
+- `bind()` binds a tool subset to the model once per distinct subset, in
+  registry order so the same subset always yields the same prompt prefix,
+  and reuses that binding on later turns,
+- `report()` gives the schema token overhead per server and tool.
+"""
+import json
+import logging
+from collections import OrderedDict
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from config.settings import TOOL_SHADOWS, TOOL_BINDING_CACHE_SIZE
+from client.tokens import count_text_tokens
+from telemetry.metrics import counter, gauge
+
+logger = logging.getLogger(__name__)
+
+schema_tokens_gauge = gauge("tool_schema_tokens", "Tokens of the tool schemas each MCP server adds to a full prompt")
+bindings_total = counter("tool_bindings_total", "Tool subsets bound to the model, by result (hit/miss)")
+
+
+class DuplicateToolError(ValueError):
+    """Several tools share a name and TOOL_SHADOWS does not say which one wins."""
+
+
+class ToolRegistry:
+    def __init__(self, servers: dict, shadows: dict = TOOL_SHADOWS, max_bindings: int = TOOL_BINDING_CACHE_SIZE):
+        owners = {}
+        for server, tools in servers.items():
+            for tool in tools:
+                owners.setdefault(tool.name, []).append(server)
+
+        problems, self.shadowed = [], {}
+        for name, names_servers in owners.items():
+            if len(names_servers) == 1:
+                continue
+            winner = shadows.get(name)
+            if winner in names_servers and names_servers.count(winner) == 1:
+                self.shadowed[name] = winner
+            else:
+                problems.append(f"{name} ({', '.join(names_servers)})")
+        if problems:
+            raise DuplicateToolError(
+                "Tool names must be unique; rename the tools or set TOOL_SHADOWS for: " + "; ".join(problems)
+            )
+        for name, winner in self.shadowed.items():
+            logger.info("Tool %s of server %s shadows %s", name, winner,
+                        ", ".join(s for s in owners[name] if s != winner))
+
+        self.servers = {
+            server: [t for t in tools if self.shadowed.get(t.name, server) == server]
+            for server, tools in servers.items()
+        }
+        self.tools = [t for tools in self.servers.values() for t in tools]
+        self.server_of = {t.name: server for server, tools in self.servers.items() for t in tools}
+        self._order = {t.name: i for i, t in enumerate(self.tools)}
+        self.schemas = {t.name: convert_to_openai_tool(t) for t in self.tools}
+        self.schema_tokens = {
+            name: count_text_tokens(json.dumps(schema, separators=(",", ":"))) for name, schema in self.schemas.items()
+        }
+        for server, tools in self.servers.items():
+            schema_tokens_gauge.set(sum(self.schema_tokens[t.name] for t in tools), server=server)
+
+        self.max_bindings = max_bindings
+        self._bound = OrderedDict()  # (id(model), names) -> (model, bound model)
+
+    def bind(self, model, tools: list):
+        """`model` with `tools` bound, from the precomputed schemas; one binding per distinct subset."""
+        names = frozenset(t.name for t in tools)
+        key = (id(model), names)
+        entry = self._bound.get(key)
+        if entry is not None and entry[0] is model:
+            self._bound.move_to_end(key)
+            bindings_total.inc(result="hit")
+            return entry[1]
+        bindings_total.inc(result="miss")
+        bound = model.bind_tools([self.schemas[name] for name in sorted(names, key=self._order.__getitem__)])
+        self._bound[key] = (model, bound)
+        while len(self._bound) > self.max_bindings:
+            self._bound.popitem(last=False)
+        return bound
+
+    def tokens(self, tools: list) -> int:
+        return sum(self.schema_tokens[t.name] for t in tools)
+
+    def report(self) -> dict:
+        """Schema tokens per server: {server: {"tokens": total, "tools": {name: tokens}}}, largest first."""
+        report = {}
+        for server, tools in self.servers.items():
+            per_tool = sorted(((t.name, self.schema_tokens[t.name]) for t in tools), key=lambda item: -item[1])
+            report[server] = {"tokens": sum(tokens for _, tokens in per_tool), "tools": dict(per_tool)}
+        return dict(sorted(report.items(), key=lambda item: -item[1]["tokens"]))
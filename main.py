@@ -1,31 +1,290 @@
-from fastapi import FastAPI, Query
-from graph.agent_graph import agent_with_memory
-from schemas.chat import QueryRequest, QueryResponse
+import json
+from contextlib import asynccontextmanager, nullcontext
+
+from fastapi import FastAPI, Header, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from graph import agent_graph
+from schemas.chat import QueryRequest, QueryResponse, BatchRequest, BatchResponse, BatchItemResult
+from client.http_pool import open_clients, close_clients
+from client.multi_client import mcp_client
+from graph.session_lock import SessionLockManager
+from graph.answer_cache import AnswerCache
+from graph.admission import AdmissionController, Rejected
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from telemetry.metrics import render_prometheus, histogram
+from telemetry.tracing import span, current_span, setup_logging
+from config.settings import (
+    STUDENT_SERVICE,
+    PROFESSOR_SERVICE,
+    COURSE_SERVICE,
+    WEBFLUX_SERVICE,
+    JSONTOJAVA_SERVICE,
+    BATCH_MAX_CONCURRENCY,
+    SESSION_COALESCE,
+    ANSWER_CACHE_ENABLED,
+    FAST_PATH_ENABLED,
+    PRELOAD_MODULES,
+    ADMISSION_ENABLED,
+)
 
 import os
 os.environ["LANGCHAIN_TRACING_V2"] = "false"
-os.environ["LANGCHAIN_DEBUG"] = "true"
 
-app = FastAPI()
+# LOG_LEVEL gates logging; DEBUG records are only emitted for sampled traces
+setup_logging()
+
+if PRELOAD_MODULES:
+    agent_graph.preload()
+
+chat_seconds = histogram("chat_request_seconds", "Latency of chat requests by endpoint and how they were answered")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pooled keep-alive clients for every backend host, closed on shutdown
+    open_clients(STUDENT_SERVICE, PROFESSOR_SERVICE, COURSE_SERVICE, WEBFLUX_SERVICE, JSONTOJAVA_SERVICE)
+    # Session history lives in chat_memory.db (SQLite, WAL)
+    async with agent_graph.agent_lifespan():
+        yield
+    await close_clients()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# One turn at a time per session_id, so concurrent requests cannot interleave a thread
+session_locks = SessionLockManager(coalesce=SESSION_COALESCE)
+
+
+# Repeated read-only questions are answered without running the agent
+answer_cache = AnswerCache()
+
+# Rate limits and a cap on concurrent agent runs, shedding with 429/503 under overload
+admission = AdmissionController()
+
+
+@app.exception_handler(Rejected)
+async def rejected_handler(request: Request, exc: Rejected):
+    return JSONResponse({"detail": exc.reason}, status_code=exc.status, headers={"Retry-After": str(exc.retry_after)})
+
+
+def _turn_messages(messages) -> list:
+    """Messages of the latest turn, from the last user message on."""
+    start = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=0)
+    return messages[start:]
+
+
+async def _run_turn(user_input: str, session_id: str) -> str:
+    async with admission.slot(session_id) if ADMISSION_ENABLED else nullcontext():
+        response = await agent_graph.agent_with_memory.ainvoke(
+            {"messages": [{"role": "user", "content": user_input}]},
+            config={"configurable": {"thread_id": session_id}}
+        )
+    answer = response["messages"][-1].content
+    answer_cache.observe_turn(user_input, answer, _turn_messages(response["messages"]))
+    return answer
+
+
+async def _record_turn(user_input: str, answer: str, session_id: str):
+    """Append a turn answered outside the agent to the session history."""
+    await agent_graph.agent_with_memory.aupdate_state(
+        {"configurable": {"thread_id": session_id}},
+        {"messages": [HumanMessage(user_input), AIMessage(answer)]},
+        as_node="agent",
+    )
+
 
 @app.get("/")
 def root():
     return {"message": "ChatBot API is running with MCP + SQLite persistent memory!"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Under MCP_TRANSPORT=stdio, tool and backend metrics live in the MCP server processes
+    return render_prometheus(await mcp_client.metrics())
+
 @app.post("/chat", response_model=QueryResponse)
-def chat(request: QueryRequest, session_id: str = Query("default_session")):
+async def chat(
+    request: QueryRequest,
+    response: Response,
+    session_id: str = Query("default_session"),
+    api_key: str = Header(None, alias="X-API-Key"),
+):
     """
     Each user/session gets its own memory stored in SQLite.
     Pass ?session_id=user123 in your API call to separate histories.
+    Over the rate limits or capacity, answers 429/503 with Retry-After.
     """
-    user_input = request.query
+    with span("POST /chat", kind="server", **{"session.id": session_id}) as current:
+        response.headers["X-Trace-Id"] = current.trace_id
+        if ADMISSION_ENABLED:
+            admission.check_rate(session_id, api_key)
+        answer, path = await _chat(request.query, response, session_id)
+        current.set(**{"chat.path": path})
+    chat_seconds.observe(current.duration, endpoint="chat", path=path)
+    return QueryResponse(answer=answer)
+
+
+async def _chat(user_input: str, response: Response, session_id: str):
+    """The answer to one /chat turn, and which path produced it."""
     if user_input.lower() in ["exit", "quit"]:
-        return QueryResponse(answer="Exiting the chat. Goodbye!")
+        return "Exiting the chat. Goodbye!", "exit"
 
-    response = agent_with_memory.invoke(
-        {"messages": [{"role": "user", "content": user_input}]},
-        config={"configurable": {"thread_id": session_id}}
+    cached = answer_cache.lookup(user_input) if ANSWER_CACHE_ENABLED else None
+    response.headers["X-Answer-Cache"] = "hit" if cached is not None else "miss"
+    if cached is not None:
+        async with session_locks.hold(session_id):
+            await _record_turn(user_input, cached, session_id)
+        return cached, "answer_cache"
+
+    # Simple single-tool lookups skip the model entirely
+    intent = agent_graph.fast_path.match(user_input) if FAST_PATH_ENABLED else None
+    if intent is not None:
+        async with session_locks.hold(session_id):
+            answer = await agent_graph.fast_path.call(*intent)
+            if answer is not None:
+                await _record_turn(user_input, answer, session_id)
+        if answer is not None:
+            # Lets paraphrases that would go through the agent reuse this answer
+            tool_message = ToolMessage(answer, name=intent[0].name, tool_call_id="fast-path")
+            answer_cache.observe_turn(user_input, answer, [tool_message])
+            response.headers["X-Fast-Path"] = "hit"
+            return answer, "fast_path"
+
+    answer = await session_locks.run(session_id, user_input, lambda: _run_turn(user_input, session_id))
+    return answer, "agent"
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _stream_chat(user_input: str, session_id: str, release):
+    try:
+        if user_input.lower() in ["exit", "quit"]:
+            yield _sse("final", QueryResponse(answer="Exiting the chat. Goodbye!").model_dump())
+            return
+
+        config = {"configurable": {"thread_id": session_id}}
+        with span("POST /chat/stream", kind="server", **{"session.id": session_id}) as current:
+            async for event in _stream_turn(user_input, session_id, config):
+                yield event
+        chat_seconds.observe(current.duration, endpoint="chat_stream", path="agent")
+    finally:
+        release()
+
+
+async def _stream_turn(user_input: str, session_id: str, config: dict):
+    try:
+        async with session_locks.hold(session_id):
+            async for event in agent_graph.agent_with_memory.astream_events(
+                {"messages": [{"role": "user", "content": user_input}]}, config=config, version="v2"
+            ):
+                kind = event["event"]
+                if kind == "on_chat_model_stream" and event["metadata"].get("langgraph_node") == "agent":
+                    content = event["data"]["chunk"].content
+                    if content:
+                        yield _sse("token", {"content": content})
+                elif kind == "on_chain_end" and event["name"] == "direct":
+                    # A direct-return answer arrives whole, without model tokens
+                    yield _sse("token", {"content": event["data"]["output"]["messages"][-1].content})
+                elif kind == "on_tool_start":
+                    yield _sse("tool_start", {"name": event["name"], "input": event["data"].get("input")})
+                elif kind == "on_tool_end":
+                    output = event["data"].get("output")
+                    yield _sse("tool_end", {"name": event["name"], "output": getattr(output, "content", output)})
+            state = await agent_graph.agent_with_memory.aget_state(config)
+            answer = state.values["messages"][-1].content
+            answer_cache.observe_turn(user_input, answer, _turn_messages(state.values["messages"]))
+            yield _sse("final", QueryResponse(answer=answer).model_dump())
+    except Exception as e:
+        current_span().error(f"{type(e).__name__}: {e}")
+        yield _sse("error", {"detail": str(e)})
+
+
+def _no_slot():
+    pass
+
+
+@app.post("/chat/stream")
+async def chat_stream(
+    request: QueryRequest,
+    session_id: str = Query("default_session"),
+    api_key: str = Header(None, alias="X-API-Key"),
+):
+    """
+    Same as /chat, streamed as server-sent events: `token`, `tool_start`,
+    `tool_end`, and a final `final` event shaped like QueryResponse.
+    """
+    release = _no_slot
+    if ADMISSION_ENABLED:
+        # Admitted before the response starts, so a rejection is still a 429/503
+        admission.check_rate(session_id, api_key)
+        release = await admission.acquire(session_id)
+    return StreamingResponse(
+        _stream_chat(request.query, session_id, release),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also frees the slot if the client left before the stream started
+        background=BackgroundTask(release),
     )
 
-    answer = response["messages"][-1].content
-    return QueryResponse(answer=answer)
+
+@app.post("/chat/batch", response_model=BatchResponse)
+async def chat_batch(request: BatchRequest, api_key: str = Header(None, alias="X-API-Key")):
+    """
+    Run many {session_id, query} items through the agent with bounded concurrency.
+    Results come back in request order; failures are reported per item.
+    Items sharing a session_id run one after another, in request order.
+    """
+    with span("POST /chat/batch", kind="server", **{"chat.batch.items": len(request.items)}) as current:
+        if ADMISSION_ENABLED and request.items:
+            admission.check_rate(api_key=api_key, cost=len(request.items))
+            # One slot per item run at once; batches share one round-robin lane with the sessions
+            async with admission.slot("batch", weight=min(len(request.items), _batch_concurrency(request))):
+                results = await _chat_batch(request)
+        else:
+            results = await _chat_batch(request)
+    chat_seconds.observe(current.duration, endpoint="chat_batch", path="agent")
+    return BatchResponse(results=results)
+
+
+def _batch_concurrency(request: BatchRequest) -> int:
+    return min(request.max_concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+
+
+async def _chat_batch(request: BatchRequest) -> list:
+    results = [None] * len(request.items)
+    max_concurrency = _batch_concurrency(request)
+
+    # Wave k holds the k-th pending item of every session, so a session never
+    # has two turns in flight while different sessions run side by side.
+    per_session = {}
+    for index, item in enumerate(request.items):
+        if item.query.lower() in ["exit", "quit"]:
+            results[index] = BatchItemResult(session_id=item.session_id, answer="Exiting the chat. Goodbye!")
+        else:
+            per_session.setdefault(item.session_id, []).append(index)
+    waves = []
+    for indexes in per_session.values():
+        for depth, index in enumerate(indexes):
+            if depth == len(waves):
+                waves.append([])
+            waves[depth].append(index)
+
+    for wave in waves:
+        async with session_locks.hold_many(request.items[i].session_id for i in wave):
+            outputs = await agent_graph.agent_with_memory.abatch(
+                [{"messages": [{"role": "user", "content": request.items[i].query}]} for i in wave],
+                [{"configurable": {"thread_id": request.items[i].session_id}, "max_concurrency": max_concurrency} for i in wave],
+                return_exceptions=True,
+            )
+        for index, output in zip(wave, outputs):
+            session_id = request.items[index].session_id
+            if isinstance(output, Exception):
+                results[index] = BatchItemResult(session_id=session_id, error=str(output) or type(output).__name__)
+            else:
+                answer = output["messages"][-1].content
+                answer_cache.observe_turn(request.items[index].query, answer, _turn_messages(output["messages"]))
+                results[index] = BatchItemResult(session_id=session_id, answer=answer)
+    return results
@@ -0,0 +1,54 @@
+import functools
+import json
+import sys
+
+from mcp.server.fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from telemetry.metrics import MCP_METRICS_URI, render_prometheus, snapshot
+from telemetry.tracing import continue_trace, setup_logging, span
+
+
+def _traced(app: FastMCP, name: str, func):
+    """Run a tool inside the caller's trace, passed as `traceparent` in the request metadata."""
+    @functools.wraps(func)
+    async def call(*args, **kwargs):
+        context = app.get_context().request_context
+        meta = context.meta if context is not None else None
+        with continue_trace(getattr(meta, "traceparent", None)):
+            with span(f"mcp tool {name}", kind="server", **{"tool.name": name, "mcp.server": app.name}):
+                return await func(*args, **kwargs)
+
+    return call
+
+
+def register_tools(app: FastMCP, tools: list):
+    """Expose LangChain tools on a FastMCP app under their own names and docstrings."""
+    names = [tool.name for tool in tools]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        # FastMCP would keep the first silently, while local transport keeps both
+        raise ValueError(f"Duplicate tool names on MCP server {app.name!r}: {', '.join(duplicates)}")
+    for tool in tools:
+        app.add_tool(_traced(app, tool.name, tool.coroutine), name=tool.name, description=tool.description)
+
+
+def _register_telemetry(app: FastMCP):
+    """This process's metrics: an MCP resource read by the API's /metrics, and GET /metrics over HTTP."""
+    @app.resource(MCP_METRICS_URI, mime_type="application/json")
+    def metrics_snapshot() -> str:
+        return json.dumps(snapshot())
+
+    @app.custom_route("/metrics", methods=["GET"])
+    async def metrics(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(render_prometheus())
+
+
+def serve(app: FastMCP):
+    """Run the server; transport is `stdio` (default) or `streamable-http`."""
+    transport = sys.argv[1] if len(sys.argv) > 1 else "stdio"
+    # Same log format and levels as the API; stdout stays free for the stdio transport
+    setup_logging()
+    _register_telemetry(app)
+    app.run(transport=transport)
@@ -1,8 +1,11 @@
 from mcp.server.fastmcp import FastMCP
 from tools.json_to_java import json_to_java_tools
+from mcp_servers.common import register_tools, serve
 
-app = FastMCP("json-to-java")
+app = FastMCP("json-to-java", port=9003)
 
 # Register tools
-for tool in json_to_java_tools:
-    app.tool(tool)
\ No newline at end of file
+register_tools(app, json_to_java_tools)
+
+if __name__ == "__main__":
+    serve(app)
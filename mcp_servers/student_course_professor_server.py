@@ -2,9 +2,12 @@ from mcp.server.fastmcp import FastMCP
 from tools.student_tool import student_tools
 from tools.course import course_tools
 from tools.professor import professor_tools
+from mcp_servers.common import register_tools, serve
 
-app = FastMCP("student-course-professor")
+app = FastMCP("student-course-professor", port=9001)
 
 # Register tools
-for tool in student_tools + course_tools + professor_tools:
-    app.tool(tool)
\ No newline at end of file
+register_tools(app, student_tools + course_tools + professor_tools)
+
+if __name__ == "__main__":
+    serve(app)
@@ -1,8 +1,11 @@
 from mcp.server.fastmcp import FastMCP
 from tools.webflux_api_product import webflux_tools
+from mcp_servers.common import register_tools, serve
 
-app = FastMCP("webflux")
+app = FastMCP("webflux", port=9002)
 
 # Register tools
-for tool in webflux_tools:
-    app.tool(tool)
\ No newline at end of file
+register_tools(app, webflux_tools)
+
+if __name__ == "__main__":
+    serve(app)
@@ -1,7 +1,27 @@
-from pydantic import BaseModel
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from config.settings import BATCH_MAX_ITEMS
 
 class QueryRequest(BaseModel):
     query: str
 
 class QueryResponse(BaseModel):
-    answer: str
\ No newline at end of file
+    answer: str
+
+class BatchItem(BaseModel):
+    session_id: str = "default_session"
+    query: str
+
+class BatchRequest(BaseModel):
+    items: list[BatchItem] = Field(max_length=BATCH_MAX_ITEMS)
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+
+class BatchItemResult(BaseModel):
+    session_id: str
+    answer: Optional[str] = None
+    error: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    results: list[BatchItemResult]
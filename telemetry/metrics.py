@@ -0,0 +1,158 @@
+# telemetry/metrics.py
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Counters and histograms are keyed by a sorted tuple of label pairs.
+`snapshot()` exports every series of a process (an MCP tool server) so that
+`render_prometheus()` of another process (the API) can expose them next to
+its own, labelled with `mcp_server`.
+"""
+import bisect
+import threading
+
+# MCP resource under which a tool server publishes its snapshot()
+MCP_METRICS_URI = "telemetry://metrics"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000)
+
+_registry = {}
+_lock = threading.Lock()
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(_label_key(labels), 0)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value: float, **labels):
+        with _lock:
+            self.values[_label_key(labels)] = value
+
+    def render(self) -> list:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.values = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with _lock:
+            series = self.values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def total(self) -> tuple:
+        """(sum, count) over every label set."""
+        with _lock:
+            return sum(s[-2] for s in self.values.values()), sum(s[-1] for s in self.values.values())
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, (('le', '+Inf'),))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+        return lines
+
+
+def _register(metric):
+    with _lock:
+        return _registry.setdefault(metric.name, metric)
+
+
+def counter(name: str, help: str) -> Counter:
+    return _register(Counter(name, help))
+
+
+def gauge(name: str, help: str) -> Gauge:
+    return _register(Gauge(name, help))
+
+
+def histogram(name: str, help: str, buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help, buckets))
+
+
+def snapshot() -> dict:
+    """Every series, JSON-serializable: {name: {"type", "help", "buckets", "values": [[labels, value]]}}."""
+    with _lock:
+        return {
+            name: {
+                "type": type(metric).__name__.lower(),
+                "help": metric.help,
+                "buckets": list(getattr(metric, "buckets", ())),
+                "values": [[list(map(list, key)), value] for key, value in metric.values.items()],
+            }
+            for name, metric in _registry.items()
+        }
+
+
+def _merged(sources: dict) -> list:
+    """This process's metrics with the series of each {server: snapshot()} added under an `mcp_server` label."""
+    metrics = {}
+    with _lock:
+        for name, metric in _registry.items():
+            copy = metric.__class__.__new__(metric.__class__)
+            copy.__dict__.update(metric.__dict__, values=dict(metric.values))
+            metrics[name] = copy
+    kinds = {"counter": Counter, "gauge": Gauge}
+    for source, remote in sources.items():
+        for name, data in remote.items():
+            metric = metrics.get(name)
+            if metric is None:
+                kind = kinds.get(data["type"])
+                metric = metrics[name] = kind(name, data["help"]) if kind else Histogram(name, data["help"], data["buckets"])
+            for key, value in data["values"]:
+                labels = tuple(sorted([tuple(pair) for pair in key] + [("mcp_server", source)]))
+                metric.values[labels] = value
+    return list(metrics.values())
+
+
+def render_prometheus(sources: dict = None) -> str:
+    """Prometheus text of this process, plus the snapshots of MCP server processes by server name."""
+    lines = []
+    for metric in _merged(sources) if sources else list(_registry.values()):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,250 @@
+# telemetry/tracing.py
+"""
+Request-level spans in the OpenTelemetry data model, and sampled logging.
+
+`span(name, **attributes)` times a block as a child of the current span,
+tracked in a contextvar so it follows asyncio tasks. Whether a trace is
+sampled (TRACE_SAMPLE_RATE) is decided at its root span. When the root
+ends, the spans of a sampled trace go to the exporter named by TRACE_EXPORTER:
+
+- "console": one OTLP/JSON `ExportTraceServiceRequest` per trace on stderr,
+- "file": the same, one line per trace, appended to TRACE_FILE,
+- "otel": spans are mirrored live through the `opentelemetry` API, for
+  whatever SDK / OTLP exporter the process has configured,
+- "none": spans are still timed for metrics but not exported.
+
+`traceparent()` gives the current span as a W3C traceparent; another process
+(an MCP tool server) runs its work under `continue_trace(traceparent)`, so
+its spans join the same trace and are exported by that process.
+"""
+import json
+import logging
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from config.settings import TRACE_EXPORTER, TRACE_FILE, TRACE_SAMPLE_RATE, LOG_LEVEL, SERVICE_NAME
+from telemetry.metrics import counter, histogram
+
+KINDS = {"internal": 1, "server": 2, "client": 3}
+STATUS_OK, STATUS_ERROR = 1, 2
+
+_current = ContextVar("current_span", default=None)
+_write_lock = threading.Lock()
+_file = None
+
+llm_seconds = histogram("llm_call_seconds", "Latency of model calls by purpose")
+llm_tokens = counter("llm_tokens_total", "Model tokens by purpose and kind (input/output)")
+
+_otel_tracer = None
+if TRACE_EXPORTER == "otel":
+    try:
+        from opentelemetry import trace as otel_trace
+        _otel_tracer = otel_trace.get_tracer(SERVICE_NAME)
+    except ImportError:
+        logging.getLogger(__name__).warning("TRACE_EXPORTER=otel but opentelemetry is not installed; spans are not exported")
+
+
+class _RemoteParent:
+    """A span of another process, parent of the spans this process runs for it."""
+
+    __slots__ = ("trace_id", "span_id", "sampled")
+    is_remote = True
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+
+class Span:
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "sampled", "attributes",
+                 "status", "message", "start_ns", "end_ns", "trace")
+    is_remote = False
+
+    def __init__(self, name: str, parent, kind: str, attributes: dict):
+        self.name = name
+        self.kind = kind
+        self.span_id = f"{random.getrandbits(64):016x}"
+        if parent is None:
+            self.trace_id = f"{random.getrandbits(128):032x}"
+            self.parent_id = ""
+            self.sampled = random.random() < TRACE_SAMPLE_RATE
+            self.trace = [] if self.sampled else None  # finished spans, exported with the root
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+            self.sampled = parent.sampled
+            # The first local span under a remote parent collects and exports this process's part
+            self.trace = ([] if self.sampled else None) if parent.is_remote else parent.trace
+        self.attributes = {k: v for k, v in attributes.items() if v is not None}
+        self.status = STATUS_OK
+        self.message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    def set(self, **attributes):
+        self.attributes.update((k, v) for k, v in attributes.items() if v is not None)
+
+    def error(self, message: str):
+        self.status = STATUS_ERROR
+        self.message = message
+
+    @property
+    def duration(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def to_otlp(self) -> dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "kind": KINDS.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": self.status, "message": self.message} if self.message else {"code": self.status},
+        }
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _export(spans: list):
+    payload = {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": __name__}, "spans": [s.to_otlp() for s in spans]}],
+    }]}
+    line = json.dumps(payload, separators=(",", ":")) + "\n"
+    global _file
+    with _write_lock:
+        if TRACE_EXPORTER == "console":
+            sys.stderr.write(line)
+        elif TRACE_EXPORTER == "file":
+            if _file is None:
+                _file = open(TRACE_FILE, "a", encoding="utf-8")
+            _file.write(line)
+            _file.flush()
+
+
+def current_span():
+    return _current.get()
+
+
+_TRACEPARENT = re.compile(r"00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})")
+
+
+def traceparent():
+    """The current span as a W3C traceparent, or None outside a span."""
+    current = _current.get()
+    if current is None:
+        return None
+    return f"00-{current.trace_id}-{current.span_id}-{'01' if current.sampled else '00'}"
+
+
+@contextmanager
+def continue_trace(header):
+    """Spans opened in the block are children of the remote span `header` (a traceparent), if valid."""
+    match = _TRACEPARENT.fullmatch(header or "")
+    if match is None:
+        yield
+        return
+    trace_id, span_id, flags = match.groups()
+    token = _current.set(_RemoteParent(trace_id, span_id, bool(int(flags, 16) & 1)))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes):
+    """Time the block as a span; exceptions mark it as failed and propagate."""
+    parent = _current.get()
+    current = Span(name, parent, kind, attributes)
+    token = _current.set(current)
+    mirror = _otel_tracer.start_as_current_span(name) if _otel_tracer is not None and current.sampled else nullcontext()
+    try:
+        with mirror as otel_span:
+            try:
+                yield current
+            except BaseException as e:
+                current.error(f"{type(e).__name__}: {e}")
+                raise
+            finally:
+                current.end_ns = time.time_ns()
+                if otel_span is not None:
+                    otel_span.set_attributes(current.attributes)
+                    if current.status == STATUS_ERROR:
+                        otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, current.message))
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:
+            # Ended in another context (e.g. an async generator closed elsewhere)
+            _current.set(parent)
+        if current.trace is not None:
+            current.trace.append(current)
+            if (parent is None or parent.is_remote) and TRACE_EXPORTER in ("console", "file"):
+                _export(current.trace)
+
+
+@contextmanager
+def llm_span(llm, purpose: str):
+    """Span and latency metric for one model call; pass the response to `record_usage`."""
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+    with span(f"llm {purpose}", kind="client", **{"gen_ai.request.model": model, "llm.purpose": purpose}) as current:
+        try:
+            yield current
+        finally:
+            llm_seconds.observe(current.duration, purpose=purpose)
+
+
+def record_usage(current: Span, message):
+    """Token counts reported by the provider on an AI message, if any."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    purpose = current.attributes.get("llm.purpose", "")
+    for kind in ("input", "output"):
+        tokens = usage.get(f"{kind}_tokens")
+        if tokens is not None:
+            current.set(**{f"gen_ai.usage.{kind}_tokens": tokens})
+            llm_tokens.inc(tokens, purpose=purpose, kind=kind)
+
+
+class SampledLogFilter(logging.Filter):
+    """
+    Tags records with the current trace id and lets DEBUG records through only
+    inside sampled traces, so per-request debug logging follows TRACE_SAMPLE_RATE.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        current = _current.get()
+        record.trace_id = current.trace_id if current is not None else "-"
+        if record.levelno <= logging.DEBUG and current is not None:
+            return current.sampled
+        return True
+
+
+def setup_logging(level: str = LOG_LEVEL):
+    """Root logging at `level`, with trace ids and sampled DEBUG records."""
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [trace=%(trace_id)s] %(message)s"))
+    handler.addFilter(SampledLogFilter())
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level.upper())
+    # httpx logs every request and the MCP server every tool call at INFO; spans already record them
+    for name in ("httpx", "mcp.server.lowlevel.server"):
+        logging.getLogger(name).setLevel(max(root.level, logging.WARNING))
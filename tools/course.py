@@ -1,52 +1,43 @@
-import requests
-from langchain.tools import tool
-from config.settings import COURSE_SERVICE
+import httpx
+from langchain_core.tools import tool
+from config.settings import COURSE_SERVICE, WRITE_TOOLS, RESULT_PAGE_SIZE
+from client.backend import backend_post
+from client.cache import response_cache
+from client.enrollment_index import enrollment_index
+from client.streaming import stream_rows
 
+COURSE_STUDENT_FIELDS = {"id": "id", "course": "name", "students": "students[].name"}
+COURSE_PROFESSOR_FIELDS = {"id": "id", "course": "name", "professor": "professor.name"}
 
-@tool
-def get_courses_by_student_id(student_id: int) -> str:
-    """
-    Fetch all courses for a given student ID.
-    """
-    try:
-        response = requests.get(f"{COURSE_SERVICE}/students/{student_id}/courses")
-        response.raise_for_status()
-        courses = response.json()
-        if not courses:
-            return f"No courses found for student {student_id}."
-        names = [c['name'] if isinstance(c, dict) and 'name' in c else str(c) for c in courses]
-        return f"Courses for student {student_id}: {', '.join(names)}"
-    except requests.RequestException as e:
-        return f"Error fetching courses for student {student_id}: {str(e)}"
 
 @tool
-def get_all_courses_with_students() -> str:
+async def get_all_courses_with_students(offset: int = 0, limit: int = RESULT_PAGE_SIZE) -> str:
     """
     Fetch all courses with their enrolled students.
     """
     try:
-        response = requests.get(f"{COURSE_SERVICE}/with-students")
-        response.raise_for_status()
-        courses = response.json()
-        return f"Courses with students: {courses}"
-    except requests.RequestException as e:
+        return await stream_rows(
+            "get_all_courses_with_students", f"{COURSE_SERVICE}/with-students", "Courses with students",
+            COURSE_STUDENT_FIELDS, offset, limit, tags=("course", "student"),
+        )
+    except httpx.HTTPError as e:
         return f"Error fetching courses with students: {str(e)}"
 
 @tool
-def get_courses_with_professors() -> str:
+async def get_courses_with_professors(offset: int = 0, limit: int = RESULT_PAGE_SIZE) -> str:
     """
     Fetch all courses with their professors.
     """
     try:
-        response = requests.get(f"{COURSE_SERVICE}/with-professors")
-        response.raise_for_status()
-        courses = response.json()
-        return f"Courses with professors: {courses}"
-    except requests.RequestException as e:
+        return await stream_rows(
+            "get_courses_with_professors", f"{COURSE_SERVICE}/with-professors", "Courses with professors",
+            COURSE_PROFESSOR_FIELDS, offset, limit, tags=("course", "professor"),
+        )
+    except httpx.HTTPError as e:
         return f"Error fetching courses with professors: {str(e)}"
 
 @tool
-def create_course(name: str, professor_id: int = None) -> str:
+async def create_course(name: str, professor_id: int = None) -> str:
     """
     Create a new course with a name and optional professor ID.
     """
@@ -54,13 +45,15 @@ def create_course(name: str, professor_id: int = None) -> str:
         payload = {"id": None, "name": name}
         if professor_id is not None:
             payload["professor"] = {"id": professor_id}
-        response = requests.post(f"{COURSE_SERVICE}/create", json=payload)
+        response = await backend_post(f"{COURSE_SERVICE}/create", json=payload)
         response.raise_for_status()
         course = response.json()
+        response_cache.invalidate(*WRITE_TOOLS["create_course"])
+        enrollment_index.invalidate()
         return f"Course created: {course.get('name')} (ID: {course.get('id')})"
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return f"Error creating course: {str(e)}"
     
 
 
-course_tools=[get_courses_by_student_id, get_all_courses_with_students, get_courses_with_professors, create_course]
\ No newline at end of file
+course_tools=[get_all_courses_with_students, get_courses_with_professors, create_course]
\ No newline at end of file
@@ -1,60 +1,87 @@
-import requests
-from langchain.tools import tool
-from config.settings import JSONTOJAVA_SERVICE
+import httpx
+from langchain_core.tools import tool
+from config.settings import JSONTOJAVA_SERVICE, RESULT_PAGE_SIZE
+from client.backend import backend_get
+from client.bulk import parse_ids, fetch_many, outcome, bulk_table
+from client.shaping import shape_record
+from client.streaming import stream_rows
+
+MOVIE_FIELDS = {"trackId": "trackId", "track": "trackName", "collection": "collectionName", "price": "collectionPrice"}
+TITLE_FIELDS = {"track": "trackName", "collection": "collectionName"}
+MOVIE_DETAIL_FIELDS = {
+    "trackId": "trackId", "track": "trackName", "collection": "collectionName", "artist": "artistName",
+    "genre": "primaryGenreName", "released": "releaseDate", "collectionPrice": "collectionPrice",
+    "trackPrice": "trackPrice", "currency": "currency",
+}
 
 @tool
-def get_all_movies() -> str:
+async def get_all_movies(offset: int = 0, limit: int = RESULT_PAGE_SIZE) -> str:
     """
     Fetch all movies.
     """
     try:
-        response = requests.get(f"{JSONTOJAVA_SERVICE}")
-        response.raise_for_status()
-        movies = response.json()
-        return f"All movies: {movies}"
-    except requests.RequestException as e:
+        return await stream_rows("get_all_movies", f"{JSONTOJAVA_SERVICE}", "All movies", MOVIE_FIELDS, offset, limit, tags=("movie",))
+    except httpx.HTTPError as e:
         return f"Error fetching movies: {str(e)}"
 
 @tool
-def get_titles() -> str:
+async def get_titles(offset: int = 0, limit: int = RESULT_PAGE_SIZE) -> str:
     """
     Fetch all trackName and collectionName pairs.
     """
     try:
-        response = requests.get(f"{JSONTOJAVA_SERVICE}/titles")
-        response.raise_for_status()
-        titles = response.json()
-        return f"Titles: {titles}"
-    except requests.RequestException as e:
+        return await stream_rows("get_titles", f"{JSONTOJAVA_SERVICE}/titles", "Titles", TITLE_FIELDS, offset, limit, tags=("movie",))
+    except httpx.HTTPError as e:
         return f"Error fetching titles: {str(e)}"
 
 @tool
-def get_movie_by_track_id(track_id: int) -> str:
+async def get_movie_by_track_id(track_id: int) -> str:
     """
     Fetch a movie by its track ID.
+    For a list of movies, call get_movies_by_track_ids once with all their IDs.
     """
     try:
-        response = requests.get(f"{JSONTOJAVA_SERVICE}/{track_id}")
+        response = await backend_get(f"{JSONTOJAVA_SERVICE}/{track_id}")
         if response.status_code == 404:
             return f"No movie found with track ID {track_id}."
         response.raise_for_status()
         movie = response.json()
-        return f"Movie: {movie}"
-    except requests.RequestException as e:
+        return shape_record("Movie", movie, MOVIE_DETAIL_FIELDS)
+    except httpx.HTTPError as e:
         return f"Error fetching movie by track ID {track_id}: {str(e)}"
 
 @tool
-def get_movies_by_price_less_than(max_price: float) -> str:
+async def get_movies_by_track_ids(track_ids: str) -> str:
+    """
+    Fetch several movies in one call, given comma-separated track IDs,
+    e.g. track_ids="1,2,3". Use this instead of calling get_movie_by_track_id
+    once per movie.
+    """
+    try:
+        ids = parse_ids(track_ids)
+        results = await fetch_many("get_movies_by_track_ids", ids, lambda i: f"{JSONTOJAVA_SERVICE}/{i}", tags=("movie",))
+        rows = [
+            results[i] if isinstance(results[i], dict) else {"trackId": i, "trackName": outcome(results[i], str)}
+            for i in ids
+        ]
+        return bulk_table("get_movies_by_track_ids", "Movies", MOVIE_FIELDS, rows, ids, "track_ids")
+    except ValueError as e:
+        return f"Invalid track IDs {track_ids!r}: {str(e)}"
+    except httpx.HTTPError as e:
+        return f"Error fetching movies by track IDs {track_ids}: {str(e)}"
+
+@tool
+async def get_movies_by_price_less_than(max_price: float, offset: int = 0, limit: int = RESULT_PAGE_SIZE) -> str:
     """
     Fetch movies with collectionPrice less than the given max price.
     """
     try:
-        response = requests.get(f"{JSONTOJAVA_SERVICE}/filter/price", params={"max": max_price})
-        response.raise_for_status()
-        movies = response.json()
-        return f"Movies with price less than {max_price}: {movies}"
-    except requests.RequestException as e:
+        return await stream_rows(
+            "get_movies_by_price_less_than", f"{JSONTOJAVA_SERVICE}/filter/price", f"Movies with price less than {max_price}",
+            MOVIE_FIELDS, offset, limit, params={"max": max_price},
+        )
+    except httpx.HTTPError as e:
         return f"Error fetching movies by price less than {max_price}: {str(e)}"
     
 
-json_to_java_tools = [get_all_movies, get_titles, get_movie_by_track_id, get_movies_by_price_less_than]
\ No newline at end of file
+json_to_java_tools = [get_all_movies, get_titles, get_movie_by_track_id, get_movies_by_track_ids, get_movies_by_price_less_than]
\ No newline at end of file
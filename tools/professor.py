@@ -1,68 +1,95 @@
-import requests
-from langchain.tools import tool
-from config.settings import PROFESSOR_SERVICE
+import httpx
+from langchain_core.tools import tool
+from config.settings import PROFESSOR_SERVICE, WRITE_TOOLS
+from client.backend import backend_get, backend_post
+from client.bulk import parse_ids, fetch_many, outcome, bulk_table
+from client.cache import cached_get_json, response_cache
+from client.enrollment_index import enrollment_index
 
+COURSE_PROFESSOR_FIELDS = {"course": "course", "professor": "professor"}
 
 
 @tool
-def get_professors_with_multiple_courses() -> str:
+async def get_professors_with_multiple_courses() -> str:
     """
     Fetch professors who teach multiple courses.
     """
     try:
-        response = requests.get(f"{PROFESSOR_SERVICE}/multiple-courses")
-        response.raise_for_status()
-        professors = response.json()
+        if await enrollment_index.ready():
+            professors = enrollment_index.professors_with_multiple_courses()
+        else:
+            professors = await cached_get_json("get_professors_with_multiple_courses", f"{PROFESSOR_SERVICE}/multiple-courses", tags=("professor", "course"))
         if not professors:
             return "No professors found with multiple courses."
         names = [p['name'] if isinstance(p, dict) and 'name' in p else str(p) for p in professors]
         return f"Professors with multiple courses: {', '.join(names)}"
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return f"Error fetching professors: {str(e)}"
 
 @tool
-def get_professor_for_course(course_id: int) -> str:
+async def get_professor_for_course(course_id: int) -> str:
     """
     Fetch the professor for a given course ID.
+    For a list of courses, call get_professors_for_courses once with all their IDs.
     """
     try:
-        response = requests.get(f"{PROFESSOR_SERVICE}/courses/{course_id}/professor")
+        response = await backend_get(f"{PROFESSOR_SERVICE}/courses/{course_id}/professor")
         response.raise_for_status()
         professor = response.json()
         return f"Professor for course {course_id}: {professor.get('name', 'Unknown')}"
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return f"Error fetching professor for course {course_id}: {str(e)}"
 
 @tool
-def get_students_by_professor(professor_id: int) -> str:
+async def get_professors_for_courses(course_ids: str) -> str:
+    """
+    Fetch the professors of several courses in one call, given comma-separated
+    course IDs, e.g. course_ids="1,2,3". Use this instead of calling
+    get_professor_for_course once per course.
+    """
+    try:
+        ids = parse_ids(course_ids)
+        results = await fetch_many(
+            "get_professors_for_courses", ids, lambda i: f"{PROFESSOR_SERVICE}/courses/{i}/professor", tags=("professor", "course"),
+        )
+        rows = [{"course": i, "professor": outcome(results[i], lambda p: p.get('name', 'Unknown'))} for i in ids]
+        return bulk_table("get_professors_for_courses", "Professors by course", COURSE_PROFESSOR_FIELDS, rows, ids, "course_ids")
+    except ValueError as e:
+        return f"Invalid course IDs {course_ids!r}: {str(e)}"
+    except httpx.HTTPError as e:
+        return f"Error fetching professors for courses {course_ids}: {str(e)}"
+
+@tool
+async def get_students_by_professor(professor_id: int) -> str:
     """
     Fetch students taught by a specific professor.
     """
     try:
-        response = requests.get(f"{PROFESSOR_SERVICE}/{professor_id}/students")
+        response = await backend_get(f"{PROFESSOR_SERVICE}/{professor_id}/students")
         response.raise_for_status()
         students = response.json()
         if not students:
             return f"No students found for professor {professor_id}."
         names = [s['name'] if isinstance(s, dict) and 'name' in s else str(s) for s in students]
         return f"Students taught by professor {professor_id}: {', '.join(names)}"
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return f"Error fetching students for professor {professor_id}: {str(e)}"
 
 @tool
-def create_professor(name: str) -> str:
+async def create_professor(name: str) -> str:
     """
     Create a new professor with the given name.
     """
     try:
         payload = {"id": None, "name": name}
-        response = requests.post(f"{PROFESSOR_SERVICE}/create", json=payload)
+        response = await backend_post(f"{PROFESSOR_SERVICE}/create", json=payload)
         response.raise_for_status()
         professor = response.json()
+        response_cache.invalidate(*WRITE_TOOLS["create_professor"])
         return f"Professor created: {professor.get('name')} (ID: {professor.get('id')})"
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return f"Error creating professor: {str(e)}"
     
 
 
-professor_tools = [get_professor_for_course, get_professors_with_multiple_courses, get_students_by_professor, create_professor]
\ No newline at end of file
+professor_tools = [get_professor_for_course, get_professors_for_courses, get_professors_with_multiple_courses, get_students_by_professor, create_professor]
\ No newline at end of file
@@ -1,46 +1,41 @@
-import requests
-from langchain.tools import tool
-from config.settings import WEBFLUX_SERVICE
+import httpx
+from langchain_core.tools import tool
+from config.settings import WEBFLUX_SERVICE, RESULT_PAGE_SIZE
+from client.backend import backend_get
+from client.streaming import stream_rows
+
+PRODUCT_FIELDS = {"id": "id", "product": "name", "price": "data.price"}
 
 @tool
-def get_all_products() -> str:
+async def get_all_products(offset: int = 0, limit: int = RESULT_PAGE_SIZE) -> str:
     """
     Fetch all products.
     """
     try:
-        response = requests.get(f"{WEBFLUX_SERVICE}")
-        response.raise_for_status()
-        products = response.json()
-        if not products:
-            return "No products found."
-        names = [p['name'] if isinstance(p, dict) and 'name' in p else str(p) for p in products]
-        return f"All products: {', '.join(names)}"
-    except requests.RequestException as e:
+        return await stream_rows("get_all_products", f"{WEBFLUX_SERVICE}", "All products", PRODUCT_FIELDS, offset, limit, tags=("product",))
+    except httpx.HTTPError as e:
         return f"Error fetching products: {str(e)}"
 
 @tool
-def get_products_below_price(price: float) -> str:
+async def get_products_below_price(price: float, offset: int = 0, limit: int = RESULT_PAGE_SIZE) -> str:
     """
     Fetch products below a certain price.
     """
     try:
-        response = requests.get(f"{WEBFLUX_SERVICE}/filter/price/{price}")
-        response.raise_for_status()
-        products = response.json()
-        if not products:
-            return f"No products found below price {price}."
-        names = [p['name'] if isinstance(p, dict) and 'name' in p else str(p) for p in products]
-        return f"Products below price {price}: {', '.join(names)}"
-    except requests.RequestException as e:
+        return await stream_rows(
+            "get_products_below_price", f"{WEBFLUX_SERVICE}/filter/price/{price}", f"Products below price {price}",
+            PRODUCT_FIELDS, offset, limit,
+        )
+    except httpx.HTTPError as e:
         return f"Error fetching products below price {price}: {str(e)}"
 
 @tool
-def get_products_by_name(name: str) -> str:
+async def get_products_by_name(name: str) -> str:
     """
     Fetch products by name.
     """
     try:
-        response = requests.get(f"{WEBFLUX_SERVICE}/search/{name}")
+        response = await backend_get(f"{WEBFLUX_SERVICE}/search/{name}")
         response.raise_for_status()
         products = response.json()
         if not products:
@@ -60,7 +55,7 @@ def get_products_by_name(name: str) -> str:
             )
         
         return f"Products with name '{name}':\n\n" + "\n".join(details)
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return f"Error fetching products with name '{name}': {str(e)}"
 
     